@@ -25,4 +25,6 @@ from app import *
 
 # Application code
 if __name__ == '__main__':
-    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,retained=RETAINED_VIEW,atlas=ATLAS,
+             profile=PROFILE,overlay=PROFILE_OVERLAY,async_audio=ASYNC_AUDIO,
+             mixer=MIXER,record_input=INPUT_RECORD,play_input=INPUT_PLAYBACK).run()
@@ -13,6 +13,10 @@ question on Piazza.
 from consts import *
 from game2d import *
 from wave import *
+from replay import ReplayRecorder
+import os
+import time
+import random
 
 
 # PRIMARY RULE: Invaders can only access attributes in wave.py via getters/setters
@@ -64,20 +68,31 @@ class Invaders(GameApp):
     # active. It is only None if _state is STATE_INACTIVE.
     #
     # Attribute _text: the currently active message
-    # Invariant: _text is a GLabel object, or None if there is no message to
+    # Invariant: _text is a GText object, or None if there is no message to
     # display. It is onl None if _state is STATE_ACTIVE.
     #
     # You may have new attributes if you wish (you might want an attribute to
     # store any score across multiple waves). But you must document them.
     # LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
     #
-    # Attribute _lastkeys: the number of keys pressed in the last frame
-    # Invariant: _lastkeys is an int that is >=0
-    #
     # Attribute _scoreText: displays the current score
-    # Invariant: _scoreText is a GLabel object, or None if there is no message to
+    # Invariant: _scoreText is a GText object, or None if there is no message to
     # display. It is onl None if _state is STATE_ACTIVE.
     #
+    # Attribute _livesText: displays the current number of lives while active
+    # Invariant: _livesText is a GText object, or None if no game has started
+    #
+    # Attribute _pool: the bolts shared by every wave, so that firing does not
+    # make new bolts once the game is running
+    # Invariant: _pool is a BoltPool object
+    #
+    # Attribute _recorder: records the current wave if REPLAY_FOLDER is set
+    # Invariant: _recorder is a ReplayRecorder for _wave, or None
+    #
+    # Attribute _random: picks the seed of every wave, so that a game with the
+    # same GAME_SEED and the same input is played the same way
+    # Invariant: _random is a random.Random object
+    #
 
     #state = [STATE_INACTIVE, STATE_NEWWAVE, STATE_ACTIVE, STATE_PAUSED,
     # STATE_CONTINUE,STATE_COMPLETE]
@@ -101,8 +116,14 @@ class Invaders(GameApp):
         """
         self._state = STATE_INACTIVE
         self._wave = None
-        self._lastkeys = 0
+        self._text = None
         self._scoreText = None
+        self._livesText = None
+        self._pool = BoltPool()
+        self._recorder = None
+        self._random = random.Random(GAME_SEED)
+        for name in WAVE_SOUNDS:
+            Sound.preload(name,SOUND_VOICES)
 
     def update(self,dt):
         """
@@ -160,8 +181,7 @@ class Invaders(GameApp):
         if (self._state == STATE_NEWWAVE):
             self._newWave(dt)
         elif (self._state == STATE_INACTIVE):
-            self._text = GLabel(text = "Press 'S' to Play", font_size = 64,
-            x = self.width/2, y = self.height/2, font_name = 'Arcade.ttf')
+            self._setMessage("Press 'S' to Play")
             self._becomeActive()
         elif (self._state == STATE_ACTIVE):
             self._activeGame(dt)
@@ -170,11 +190,12 @@ class Invaders(GameApp):
         elif (self._state == STATE_CONTINUE):
             self._continueGame(dt)
         elif (self._state == STATE_COMPLETE):
-            self._text = GLabel(text = "Game Over", font_size = 64,
-            x = self.width/2, y = self.height/2, font_name = 'Arcade.ttf')
+            self._setMessage("Game Over")
+            self._saveReplay()
             self._wave = None
         else:
-            self._text = None
+            self._setText(None)
+            self._hideText(self._scoreText)
             self._scoreText = None
 
     def draw(self):
@@ -190,11 +211,18 @@ class Invaders(GameApp):
         getters for these attributes or you need to add a draw method to
         class Wave.  We suggest the latter.  See the example subcontroller.py
         from class.
+
+        If the view is retained, the messages and the wave are added to the
+        view when they appear instead (see _setText and _showWave), so only
+        the wave is asked to bring its objects up to date.
         """
-        if(not self._text is None):
-            self._text.draw(self.view)
-        if(not self._scoreText is None):
-            self._scoreText.draw(self.view)
+        if(not self.view.retained):
+            if(not self._text is None):
+                self._text.draw(self.view)
+            if(not self._scoreText is None):
+                self._scoreText.draw(self.view)
+            if(not self._livesText is None and self._state == STATE_ACTIVE):
+                self._livesText.draw(self.view)
         if(not self._wave is None):
             if(self._state == STATE_ACTIVE):
                 self._wave.draw(self.view)
@@ -207,9 +235,12 @@ class Invaders(GameApp):
         Parameter dt: The time in seconds since the last call to update.
         Precondition: dt is an int or float
         '''
-        self._text = None
-        self._wave = Wave()
+        self._setText(None)
+        self._wave = Wave(pool=self._pool,
+                          seed=self._random.randrange(2**32))
+        self._startReplay()
         self._state = STATE_ACTIVE
+        self._showWave(True)
 
     def _activeGame(self,dt):
         '''
@@ -233,20 +264,21 @@ class Invaders(GameApp):
         Precondition: dt is an int or float
         '''
         if(self._wave != None):
+            if not self._recorder is None:
+                self._recorder.record(self.input, dt)
             self._wave.update(self.input, dt)
-            self._text = GLabel(text = "Player Lives: " + str(self._wave._getLives()),
-            font_size = 50, x = GAME_WIDTH-(GAME_WIDTH - 200), y = GAME_HEIGHT-50,
-            font_name = 'Arcade.ttf')
-            self._scoreText = GLabel(text = "Score: " + str(self._wave._getScore()),
-            font_size = 50, x = GAME_WIDTH-150, y = GAME_HEIGHT-50,
-            font_name = 'Arcade.ttf')
+            self._updateHud()
             if self._wave._allAlienDead() == True:
                 if self._wave._getLives() > 0:
                     score = self._wave._getScore()
                     lives = self._wave._getLives()
-                    self._wave = Wave()
+                    self._showWave(False)
+                    self._wave._clearBolts()
+                    self._wave = Wave(pool=self._pool,
+                                      seed=self._random.randrange(2**32))
                     self._wave._setScore(score)
                     self._wave._setLives(lives)
+                    self._startReplay()
                     self._state = STATE_PAUSED
                 else:
                     self._state = STATE_COMPLETE
@@ -254,6 +286,8 @@ class Invaders(GameApp):
                 self._state = STATE_PAUSED
             if (self._wave._alienReachDline()):
                 self._state = STATE_COMPLETE
+            if self._state != STATE_ACTIVE:
+                self._showWave(False)
 
     def _pauseGame(self):
         """
@@ -263,18 +297,11 @@ class Invaders(GameApp):
         This is inspired by Walker White's state.py
         """
         if self._wave._getLives() > 0:
-            self._text = GLabel(text = "Press 'C' to Continue", font_size = 64,
-             x = self.width/2, y = self.height/2, font_name = 'Arcade.ttf')
-
-            curr_keys = self.input.key_count
-
-            change = curr_keys > 0
-            change = self.input.is_key_down('c') and self._lastkeys == 0
+            self._setMessage("Press 'C' to Continue")
 
-            if change:
+            if 'c' in self.input.pressed_this_frame:
                 self._state = STATE_CONTINUE
-                self._text = None
-            self._lastkeys= curr_keys
+                self._setText(None)
 
         if self._wave._getLives() == 0:
             self._state = STATE_COMPLETE
@@ -287,14 +314,37 @@ class Invaders(GameApp):
         Parameter dt: The time in seconds since the last call to update.
         Precondition: dt is an int or float
         '''
-        self._wave._setPaused(False)
-        self._wave._setExplodeState(False)
-        x = GAME_WIDTH/2
-        y = SHIP_BOTTOM
-        width = SHIP_WIDTH
-        height = SHIP_HEIGHT
-        self._wave._setShip(Ship(x,y,width,height,source='ship-strip.png',frame=0))
+        self._wave._respawn()
+        if not self._recorder is None:
+            self._recorder.respawn()
         self._state = STATE_ACTIVE
+        self._showWave(True)
+
+    def _startReplay(self):
+        '''
+        Starts recording the current wave, if REPLAY_FOLDER is set
+
+        The recording of the previous wave (if any) is saved first.
+        '''
+        self._saveReplay()
+        if not REPLAY_FOLDER is None:
+            self._recorder = ReplayRecorder(self._wave)
+
+    def _saveReplay(self):
+        '''
+        Saves the recording of the current wave to REPLAY_FOLDER, if any
+
+        The file is named after the current time and the seed of the wave.
+        This may be called after _wave is replaced, so the seed comes from
+        the recorder.
+        '''
+        if not self._recorder is None:
+            if not os.path.isdir(REPLAY_FOLDER):
+                os.makedirs(REPLAY_FOLDER)
+            name = '%s-%d.rpl' % (time.strftime('%Y%m%d-%H%M%S'),
+                                  self._recorder.getSeed())
+            self._recorder.save(os.path.join(REPLAY_FOLDER, name))
+            self._recorder = None
 
     def _becomeActive(self):
         '''
@@ -302,13 +352,95 @@ class Invaders(GameApp):
 
         This is inspired by Walker White's state.py
         '''
-        curr_keys = self.input.key_count
+        if 's' in self.input.pressed_this_frame:
+            self._state = STATE_NEWWAVE
+            self._setText(None)
+
+    def _setMessage(self,text):
+        '''
+        Displays text as the currently active message
 
-        change = curr_keys > 0
-        change = self.input.is_key_down('s') and self._lastkeys == 0
+        A new label is only made if the message has changed, so calling this
+        every frame does not re-render the text.
 
-        if change:
-            self._state = STATE_NEWWAVE
-            self._text = None
+        Parameter text: The message to display
+        Precondition: text is a string
+        '''
+        if self._text is None or self._text.text != text:
+            self._setText(GText(text = text, font_size = 64,
+            x = self.width/2, y = self.height/2, font_name = 'Arcade.ttf'))
+
+    def _setText(self,label):
+        '''
+        Replaces the currently active message with label
+
+        If the view is retained, the old message is removed from the view and
+        the new one is added.
+
+        Parameter label: The new message, or None for no message
+        Precondition: label is a GText object or None
+        '''
+        self._hideText(self._text)
+        self._text = label
+        self._showText(label)
+
+    def _showText(self,label):
+        '''
+        Adds label to the view, if the view is retained
+
+        Parameter label: The label to show
+        Precondition: label is a GText object or None (which does nothing)
+        '''
+        if self.view.retained and not label is None:
+            self.view.add(label, LAYER_TEXT)
+
+    def _hideText(self,label):
+        '''
+        Removes label from the view, if the view is retained
 
-        self._lastkeys= curr_keys
+        Parameter label: The label to hide
+        Precondition: label is a GText object or None (which does nothing)
+        '''
+        if self.view.retained and not label is None:
+            self.view.remove(label)
+
+    def _showWave(self,shown):
+        '''
+        Adds the wave and the lives to the view, or removes them, if the view
+        is retained
+
+        They are only on screen while the game is active, as in draw.  This
+        does nothing if there is no wave.
+
+        Parameter shown: Whether to add them (or else remove them)
+        Precondition: shown is a boolean
+        '''
+        if self.view.retained and not self._wave is None:
+            self._wave._setView(self.view if shown else None)
+            if shown:
+                self._showText(self._livesText)
+            else:
+                self._hideText(self._livesText)
+
+    def _updateHud(self):
+        '''
+        Updates the lives and score labels from the current wave
+
+        The labels are made the first time this is called.  After that, only
+        their text changes, and only when the lives or score change.
+        '''
+        lives = "Player Lives: " + str(self._wave._getLives())
+        score = "Score: " + str(self._wave._getScore())
+        if self._livesText is None:
+            self._livesText = GText(text = lives, font_size = 50,
+            x = GAME_WIDTH-(GAME_WIDTH - 200), y = GAME_HEIGHT-50,
+            font_name = 'Arcade.ttf')
+            self._showText(self._livesText)
+        else:
+            self._livesText.text = lives
+        if self._scoreText is None:
+            self._scoreText = GText(text = score, font_size = 50,
+            x = GAME_WIDTH-150, y = GAME_HEIGHT-50, font_name = 'Arcade.ttf')
+            self._showText(self._scoreText)
+        else:
+            self._scoreText.text = score
@@ -0,0 +1,92 @@
+"""
+Backend selection for the benchmarks
+
+The benchmarks time the Kivy classes of game2d by default, since those are the
+ones a game plays with.  With the option --headless (or GAME2D_HEADLESS=1),
+they time the Kivy-free classes instead, which run without a display.
+
+Kivy needs a window (and so a display) for its textures, so selecting Kivy
+opens one.  The frames of a game are never shown in it: the benchmarks call
+the frame loop of GameApp directly, which times the game and the canvas
+updates, but not the GPU.
+
+This module must be imported, and select called, before game2d is imported.
+"""
+import os
+import sys
+
+# The invaders folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def select(headless=False):
+    """
+    Selects the backend of game2d, and returns True if it is headless
+
+    The backend is headless if headless is True, or if GAME2D_HEADLESS is set
+    (to anything other than the empty string or 0).  Otherwise the Kivy window
+    is opened.  Either way, the resource folders of GameApp are set to those in
+    the invaders folder.
+
+    Parameter headless: Whether to use the headless backend
+    Precondition: headless is a bool
+    """
+    headless = headless or os.environ.get('GAME2D_HEADLESS','') not in ('','0')
+    os.environ['GAME2D_HEADLESS'] = '1' if headless else '0'
+    if not ROOT in sys.path:
+        sys.path.insert(0,ROOT)
+    if not headless:
+        os.environ.setdefault('KIVY_NO_ARGS','1')
+        from kivy.core.window import Window
+
+    import game2d
+    assert game2d.HEADLESS == headless, 'game2d was imported before the backend was selected'
+    for folder in ('Fonts','Sounds','Images'):
+        path = os.path.join(ROOT,folder)
+        setattr(game2d.GameApp,folder.lower(),path)
+        if not headless:
+            import kivy.resources
+            kivy.resources.resource_add_path(path)
+    return headless
+
+
+def play(game, frames):
+    """
+    Plays the given number of frames of a game
+
+    The game is started the first time it is played.  Every frame is 1/fps
+    seconds long, on either backend.
+
+    Parameter game: The game to play
+    Precondition: game is a GameApp that has not been run by Kivy
+
+    Parameter frames: The number of frames
+    Precondition: frames is an int >= 0
+    """
+    import game2d
+    if game2d.HEADLESS:
+        game.run(frames)
+        return
+    if game._view is None:
+        game.build()
+        game.start()
+    dt = 1.0/game.fps
+    for _ in range(frames):
+        game._refresh(dt)
+
+
+def stop(game):
+    """
+    Stops a game that was played with play
+
+    This writes the profile and the input recording of the game, if requested,
+    and closes its mixer.  Unlike GameApp.stop on Kivy, it does not exit Python.
+
+    Parameter game: The game to stop
+    Precondition: game is a GameApp played with play
+    """
+    import game2d
+    if game2d.HEADLESS:
+        game.stop()
+    else:
+        game.on_stop()
@@ -0,0 +1,296 @@
+"""
+Parity test for VecWave
+
+This script checks that VecWave plays by the same rules as Wave, by playing a
+Wave (with ALIEN_ARRAYS on) and a VecWave of one wave side by side with the
+same input, and comparing them after every frame: the score, the lives, the
+ship, whether it is exploding, the alien alive mask, the formation offset and
+every bolt.
+
+The only intended difference between the two is where the random numbers come
+from (random.Random in Wave, NumPy in VecWave).  So both are given the same
+random draws instead: the random numbers of each are replaced by a stand-in
+that hands out the same fire timers and the same column picks, from the same
+seed.  A Wave picks a column with choice, and a VecWave with a fraction of the
+live columns, so the stand-in draws a fraction for both.
+
+An episode ends the same way in both (or after the most frames allowed), and
+then a new Wave is made and the VecWave starts its next episode.  A ship that
+is lost is respawned at the start of the next frame in both.
+
+Run it from the invaders folder:
+
+    python benchmarks/parity.py [--games 5] [--frames 20000] [--seed 0]
+
+The script exits with status 1 at the first frame where the two differ.
+"""
+import os
+import sys
+import random
+import argparse
+
+os.environ.setdefault('GAME2D_HEADLESS','1')
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class Draws(object):
+    """
+    A class to hand out the random draws of a wave
+
+    The fire timers and the column picks come from two separate sequences, so
+    the draws match no matter how a simulator orders them within a frame.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _timers: the random numbers for the fire timers
+    # Invariant: _timers is a random.Random object
+    #
+    # Attribute _picks: the random numbers for the column picks
+    # Invariant: _picks is a random.Random object
+
+    def __init__(self, seed):
+        '''
+        Initializes the draws from the given seed
+
+        Parameter seed: The seed of the draws
+        Precondition: seed is an int
+        '''
+        self._timers = random.Random(seed)
+        self._picks = random.Random(seed+1)
+
+    def timer(self):
+        '''
+        Returns the next fire timer, a number of marches from 1 to BOLT_RATE
+        '''
+        from consts import BOLT_RATE
+        return self._timers.randint(1,BOLT_RATE)
+
+    def pick(self):
+        '''
+        Returns the next column pick, a fraction of the live columns in [0,1)
+        '''
+        return self._picks.random()
+
+
+class WaveDraws(Draws):
+    """
+    A stand-in for the random.Random object of a Wave
+    """
+
+    def randint(self, a, b):
+        '''
+        Returns the next fire timer
+
+        Parameter a: The smallest timer
+        Precondition: a is 1
+
+        Parameter b: The largest timer
+        Precondition: b is BOLT_RATE
+        '''
+        from consts import BOLT_RATE
+        assert (a,b) == (1,BOLT_RATE), 'Wave drew an unexpected range %d..%d' % (a,b)
+        return self.timer()
+
+    def choice(self, seq):
+        '''
+        Returns the item of seq at the next column pick
+
+        Parameter seq: The live columns
+        Precondition: seq is a nonempty list
+        '''
+        return seq[int(self.pick()*len(seq))]
+
+
+class VecDraws(Draws):
+    """
+    A stand-in for the NumPy Generator of a VecWave of one wave
+    """
+
+    def integers(self, low, high, size):
+        '''
+        Returns an array of the next size fire timers
+
+        Parameter low: The smallest timer
+        Precondition: low is 1
+
+        Parameter high: One more than the largest timer
+        Precondition: high is BOLT_RATE+1
+
+        Parameter size: The number of timers
+        Precondition: size is an int >= 0
+        '''
+        import numpy as np
+        from consts import BOLT_RATE
+        assert (low,high) == (1,BOLT_RATE+1), 'VecWave drew an unexpected range'
+        return np.array([self.timer() for _ in range(size)], dtype=int)
+
+    def random(self, size):
+        '''
+        Returns an array of the next size column picks
+
+        Parameter size: The number of picks
+        Precondition: size is an int >= 0
+        '''
+        import numpy as np
+        return np.array([self.pick() for _ in range(size)])
+
+
+def newWave(draws):
+    """
+    Returns a new Wave whose random draws come from the given stand-in
+
+    Wave draws its first fire timer when it is made, so that draw is made
+    again from the stand-in.
+
+    Parameter draws: The random draws
+    Precondition: draws is a WaveDraws object
+    """
+    from wave import Wave
+    from consts import BOLT_RATE
+    wave = Wave(arrays=True,seed=0)
+    wave._random = draws
+    wave._numstepsuntilfire = wave._random.randint(1,BOLT_RATE)
+    return wave
+
+
+def waveState(wave):
+    """
+    Returns the state of a Wave that is compared with a VecWave
+
+    Parameter wave: The wave
+    Precondition: wave is a Wave with ALIEN_ARRAYS on
+    """
+    alive = tuple(alien != None for row in wave._aliens for alien in row)
+    bolts = tuple((bolt.x,bolt.y,bolt._isPlayerBolt()) for bolt in wave._bolts)
+    return {'score': wave._score, 'lives': wave._lives, 'paused': wave._paused,
+            'exploding': not wave._animator is None,
+            'ship': None if wave._ship is None else wave._ship.x,
+            'offset': tuple(wave._arrays.getOffset()), 'alive': alive,
+            'bolts': bolts}
+
+
+def vecState(vec):
+    """
+    Returns the state of the first wave of a VecWave, in the form of waveState
+
+    Parameter vec: The simulator
+    Precondition: vec is a VecWave
+    """
+    count = int(vec._nbolts[0])
+    bolts = tuple((float(vec._boltx[0,i]),float(vec._bolty[0,i]),bool(vec._boltp[0,i]))
+                  for i in range(count))
+    paused = bool(vec._paused[0])
+    return {'score': int(vec._score[0]), 'lives': int(vec._lives[0]), 'paused': paused,
+            'exploding': bool(vec._animating[0]),
+            'ship': None if paused else float(vec._shipx[0]),
+            'offset': (float(vec._dx[0]),float(vec._dy[0])),
+            'alive': tuple(bool(a) for a in vec._alive[0].flat), 'bolts': bolts}
+
+
+def waveDone(wave):
+    """
+    Returns whether the episode of a Wave is over, as a VecWave decides it
+
+    Parameter wave: The wave
+    Precondition: wave is a Wave
+    """
+    return (wave._allAlienDead() or wave._alienReachDline() or
+            (wave._paused and wave._lives == 0))
+
+
+def compare(expected, actual, where):
+    """
+    Checks that two states are the same
+
+    An AssertionError names the first part that differs.
+
+    Parameter expected: The state of the Wave
+    Precondition: expected is a dictionary made by waveState
+
+    Parameter actual: The state of the VecWave
+    Precondition: actual is a dictionary made by vecState
+
+    Parameter where: The frame, for the error message
+    Precondition: where is a string
+    """
+    for key in expected:
+        assert expected[key] == actual[key], '%s: %s is %r in Wave but %r in VecWave' % \
+            (where,key,expected[key],actual[key])
+
+
+def playGames(games, frames, seed):
+    """
+    Plays the given number of episodes side by side, and returns the frames
+    played
+
+    An AssertionError is raised at the first frame where the two differ.
+
+    Parameter games: The number of episodes
+    Precondition: games is an int > 0
+
+    Parameter frames: The most frames per episode
+    Precondition: frames is an int > 0
+
+    Parameter seed: The seed that picks the input and the draws
+    Precondition: seed is an int
+    """
+    from replay import ReplayInput
+    from vecwave import VecWave
+    rng = random.Random(seed)
+    vec = VecWave(1)
+    vec._rng = VecDraws(seed)
+    vec.reset()
+    draws = WaveDraws(seed)
+    wave = newWave(draws)
+    played = 0
+    for game in range(games):
+        compare(waveState(wave),vecState(vec),'game %d start' % game)
+        action = 0
+        for frame in range(frames):
+            if rng.random() < 0.05:
+                action = rng.randrange(len(VecWave.ACTIONS))
+            if wave._paused and wave._lives > 0:
+                wave._respawn()
+            wave.update(ReplayInput(VecWave.ACTIONS[action]),vec._dt)
+            observations, rewards, dones, info = vec.step([action])
+            played += 1
+            where = 'game %d frame %d' % (game,frame)
+            if dones[0]:
+                assert waveDone(wave), '%s: VecWave ended, but Wave did not' % where
+                assert (wave._score,wave._lives) == (info['score'][0],info['lives'][0]), \
+                    '%s: Wave ended with score %d and %d lives, VecWave with %d and %d' % \
+                    (where,wave._score,wave._lives,info['score'][0],info['lives'][0])
+                break
+            assert not waveDone(wave), '%s: Wave ended, but VecWave did not' % where
+            compare(waveState(wave),vecState(vec),where)
+        else:
+            # The episode ran out of frames, so the VecWave starts the next one
+            vec.reset()
+        print('game %d: %d frames, score %d, %d lives' %
+              (game,frame+1,wave._score,wave._lives))
+        wave = newWave(draws)
+    return played
+
+
+def main():
+    """
+    Runs the parity test with the options on the command line
+    """
+    parser = argparse.ArgumentParser(description='Check that VecWave plays like Wave')
+    parser.add_argument('--games', type=int, default=5, help='the number of episodes')
+    parser.add_argument('--frames', type=int, default=20000, help='the most frames per episode')
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the input and draws')
+    options = parser.parse_args()
+    # consts.py reads numbers from the command line, so hide these options
+    sys.argv = sys.argv[:1]
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    try:
+        played = playGames(options.games,options.frames,options.seed)
+    except AssertionError as error:
+        print(error)
+        sys.exit(1)
+    print('%d games passed (%d frames)' % (options.games,played))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""
+Snapshot round-trip test for Wave
+
+This script checks that Wave._restore brings back everything that
+Wave._snapshot saves, by playing a wave past a snapshot twice and comparing
+the snapshots along the way.  The snapshot is taken in the middle of an
+explosion of the ship, since that is the hardest state to restore: the
+explosion is a coroutine, which _restore has to rebuild from the time it has
+been running.
+
+For each arrays setting (ALIEN_ARRAYS), the script:
+
+    * plays a seeded wave with random input until the ship has been
+      exploding for a few frames, and takes a snapshot
+    * plays the wave on for some frames, taking a snapshot after each one
+    * restores the first snapshot, in the same wave and in a new wave with a
+      different seed, and checks that each of them takes exactly the same
+      snapshots with the same input
+
+A ship that is lost is respawned at once, as Invaders does when the player
+continues, so the frames after the snapshot cover the end of the explosion,
+the respawn and the rest of the wave.
+
+Run it from the invaders folder:
+
+    python benchmarks/roundtrip.py [--seed 1] [--frames 600]
+
+The script exits with status 1 if a check fails.
+"""
+import os
+import sys
+import random
+import argparse
+
+os.environ.setdefault('GAME2D_HEADLESS','1')
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# The keys that move the ship and fire
+MOVES = (('left',),('right',),('up',),('left','up'),('right','up'),())
+
+# The frames the ship explodes for before the snapshot
+EXPLODING = 10
+
+# The most frames to wait for the ship to be hit
+MAX_WAIT = 50000
+
+
+def randomInputs(rng, frames):
+    """
+    Returns a list of random input, one ReplayInput per frame
+
+    The ship holds each move for a random number of frames.
+
+    Parameter rng: The random numbers to use
+    Precondition: rng is a random.Random object
+
+    Parameter frames: The number of frames
+    Precondition: frames is an int >= 0
+    """
+    from replay import ReplayInput
+    inputs = []
+    while len(inputs) < frames:
+        move = ReplayInput(rng.choice(MOVES))
+        inputs.extend([move]*rng.randint(1,40))
+    return inputs[:frames]
+
+
+def playFrame(wave, input):
+    """
+    Plays one frame of a wave, respawning the ship first if it was lost
+
+    Parameter wave: The wave to play
+    Precondition: wave is a Wave object
+
+    Parameter input: The input of the frame
+    Precondition: input is a ReplayInput
+    """
+    if wave._paused and wave._lives > 0:
+        wave._respawn()
+    wave.update(input,1/60)
+
+
+def explode(wave, rng):
+    """
+    Plays a wave until its ship has been exploding for EXPLODING frames
+
+    An AssertionError is raised if the ship is not hit within MAX_WAIT frames.
+
+    Parameter wave: The wave to play
+    Precondition: wave is a Wave object with a ship
+
+    Parameter rng: The random numbers for the input
+    Precondition: rng is a random.Random object
+    """
+    inputs = randomInputs(rng,MAX_WAIT)
+    exploding = 0
+    for input in inputs:
+        playFrame(wave,input)
+        if not wave._animator is None:
+            exploding += 1
+            if exploding == EXPLODING:
+                return
+    raise AssertionError('the ship was not hit in %d frames' % MAX_WAIT)
+
+
+def follow(wave, inputs):
+    """
+    Returns the snapshots of a wave after each of the given frames
+
+    Parameter wave: The wave to play
+    Precondition: wave is a Wave object
+
+    Parameter inputs: The input of each frame
+    Precondition: inputs is a list of ReplayInput objects
+    """
+    snapshots = []
+    for input in inputs:
+        playFrame(wave,input)
+        snapshots.append(wave._snapshot())
+    return snapshots
+
+
+def compare(expected, actual, where):
+    """
+    Checks that two lists of snapshots are the same
+
+    An AssertionError names the first frame where they differ.
+
+    Parameter expected: The snapshots of the first playthrough
+    Precondition: expected is a list of bytes objects
+
+    Parameter actual: The snapshots after restoring
+    Precondition: actual is a list of bytes objects as long as expected
+
+    Parameter where: The wave that was restored, for the error message
+    Precondition: where is a string
+    """
+    for frame, (first, second) in enumerate(zip(expected,actual)):
+        assert first == second, '%s: frame %d after the snapshot differs' % (where,frame)
+
+
+def roundTrip(arrays, seed, frames):
+    """
+    Runs the round trip for one arrays setting
+
+    An AssertionError is raised as soon as a check fails.
+
+    Parameter arrays: Whether the alien positions are stored in arrays
+    Precondition: arrays is a boolean
+
+    Parameter seed: The seed of the wave and of its input
+    Precondition: seed is an int
+
+    Parameter frames: The frames to play after the snapshot
+    Precondition: frames is an int > 0
+    """
+    from wave import Wave
+    rng = random.Random(seed)
+    wave = Wave(arrays=arrays,seed=seed)
+    explode(wave,rng)
+    start = wave._snapshot()
+    inputs = randomInputs(rng,frames)
+    expected = follow(wave,inputs)
+
+    wave._restore(start)
+    assert wave._snapshot() == start, 'restoring in the same wave changed the snapshot'
+    compare(expected,follow(wave,inputs),'same wave')
+
+    other = Wave(arrays=arrays,seed=seed+1)
+    other._restore(start)
+    assert other._snapshot() == start, 'restoring in a new wave changed the snapshot'
+    compare(expected,follow(other,inputs),'new wave')
+
+
+def main():
+    """
+    Runs the round trip with the options on the command line
+    """
+    parser = argparse.ArgumentParser(description='Check that wave snapshots restore exactly')
+    parser.add_argument('--seed', type=int, default=1, help='the seed of the wave')
+    parser.add_argument('--frames', type=int, default=600,
+                        help='the frames to compare after the snapshot')
+    options = parser.parse_args()
+    # consts.py reads numbers from the command line, so hide these options
+    sys.argv = sys.argv[:1]
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    for arrays in (False,True):
+        try:
+            roundTrip(arrays,options.seed,options.frames)
+        except AssertionError as error:
+            print('arrays=%s failed: %s' % (arrays,error))
+            sys.exit(1)
+        print('arrays=%s: %d frames matched' % (arrays,options.frames))
+    print('round trip passed')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark for the game2d property setters
+
+This script times the setters that game2d validates, once with strict
+validation and once with fast validation, and prints the cost of a single set
+(in nanoseconds) for each.  Both backends are timed, in labelled columns: the
+Kivy classes (which a game plays with) and the headless ones.  The Kivy
+classes need a window, so use --headless to time only the headless classes
+on a machine without a display.
+
+Run it from the invaders folder:
+
+    python benchmarks/setters.py [--number 100000] [--headless]
+"""
+import os
+import sys
+import timeit
+import argparse
+
+import backends
+
+
+# The setters to time, as (label, statement)
+SETTERS = (
+    ('x',         'obj.x = 10.0'),
+    ('y',         'obj.y = 10.0'),
+    ('width',     'obj.width = 10.0'),
+    ('scale',     'obj.scale = 1.0'),
+    ('angle',     'obj.angle = 0.0'),
+    ('fillcolor', "obj.fillcolor = 'red'"),
+    ('frame',     'sprite.frame = 1'),
+)
+
+
+def classes(headless):
+    """
+    Returns the classes GRectangle and GSprite of a backend, as a pair
+
+    The headless classes do not depend on Kivy, so they can be timed in the
+    same process as the Kivy ones.
+
+    Parameter headless: Whether to return the headless classes
+    Precondition: headless is a bool
+    """
+    if headless:
+        from game2d.headless import GRectangle, GSprite
+    else:
+        from game2d.grectangle import GRectangle
+        from game2d.gsprite import GSprite
+    return (GRectangle, GSprite)
+
+
+def measure(statement, number, headless):
+    """
+    Returns the cost in nanoseconds of a single execution of statement
+
+    Parameter statement: The statement to time
+    Precondition: statement is a string with valid Python code
+
+    Parameter number: The number of times to run the statement
+    Precondition: number is an int > 0
+
+    Parameter headless: Whether to time the headless classes
+    Precondition: headless is a bool
+    """
+    GRectangle, GSprite = classes(headless)
+    env = {'obj': GRectangle(x=0,y=0,width=10,height=10),
+           'sprite': GSprite(x=0,y=0,width=10,height=10,source='ship-strip.png',format=(2,4))}
+    best = min(timeit.repeat(statement,globals=env,number=number,repeat=5))
+    return best/number*1e9
+
+
+def main():
+    """
+    Prints the cost of each setter in strict and fast mode, for each backend
+    """
+    parser = argparse.ArgumentParser(description='Time the game2d property setters')
+    parser.add_argument('--number', type=int, default=100000,
+                        help='the times to run each setter per repeat')
+    parser.add_argument('--headless', action='store_true',
+                        help='only time the headless classes (no display needed)')
+    options = parser.parse_args()
+    only = backends.select(options.headless)
+
+    import game2d
+    names = ('headless',) if only else ('kivy','headless')
+    header = '%-10s' % 'setter'
+    for name in names:
+        header += ' %15s %15s %8s' % (name+' strict',name+' fast','saving')
+    print(header)
+    for label, statement in SETTERS:
+        line = '%-10s' % label
+        for name in names:
+            game2d.set_validation('strict')
+            strict = measure(statement,options.number,name == 'headless')
+            game2d.set_validation('fast')
+            fast = measure(statement,options.number,name == 'headless')
+            line += ' %15.1f %15.1f %7.0f%%' % (strict,fast,100*(strict-fast)/strict)
+        print(line)
+    game2d.set_validation('strict')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+Soak test for Alien Invaders
+
+This script plays many complete games of Invaders without a window, with random
+input, and checks the state machine of Invaders after every frame:
+
+    * every change of state is one that Invaders allows
+    * there is a wave exactly when the state needs one (it is cleared one
+      frame after the game is over)
+    * the lives stay in range, and the score never goes down
+
+The input of each game is an InputRecording (see game2d/recording.py) made from
+the seed of the game, and the waves are seeded from the same seed (GAME_SEED),
+so a game is played the same way every time.  Once every game is over, the
+script checks that the games went through every state from STATE_INACTIVE to
+STATE_CONTINUE.
+
+Run it from the invaders folder:
+
+    python benchmarks/soak.py [--games 10] [--frames 20000] [--seed 0]
+                              [--verify] [--save failed.inp]
+
+With --verify, every game is played a second time, from its recording after
+saving and loading it, and must end the same way.  With --save, the input of a
+game that fails a check is written to the given file; play it back with the
+keyword play_input of Invaders (or INPUT_PLAYBACK in consts.py) and the same
+GAME_SEED.
+"""
+import os
+import sys
+import random
+import argparse
+
+os.environ.setdefault('GAME2D_HEADLESS','1')
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# The keys that move the ship and fire
+MOVES = (('left',),('right',),('up',),('left','up'),('right','up'),())
+
+# The keys that are tapped to start the game or continue it
+TAPS = ('s','c')
+
+
+def randomRecording(rng, frames):
+    """
+    Returns an InputRecording of random input for the given number of frames
+
+    The ship holds each move for a random number of frames.  At the start of
+    some moves, 's' or 'c' is tapped (pressed and released within a frame), or
+    held down for the whole move.
+
+    Parameter rng: The random numbers to use
+    Precondition: rng is a random.Random object
+
+    Parameter frames: The number of frames
+    Precondition: frames is an int >= 0
+    """
+    from game2d import InputRecording
+    recording = InputRecording()
+    while len(recording) < frames:
+        held = set(rng.choice(MOVES))
+        taps = ()
+        if rng.random() < 0.2:
+            if rng.random() < 0.5:
+                taps = (rng.choice(TAPS),)
+            else:
+                held.add(rng.choice(TAPS))
+        length = min(rng.randint(1,40),frames-len(recording))
+        events = [(kind,key) for key in taps for kind in ('key_down','key_up')]
+        recording.append(held,events)
+        for _ in range(length-1):
+            recording.append(held)
+    return recording
+
+
+def allowedStates(state):
+    """
+    Returns the states that Invaders may be in one frame after state
+
+    Parameter state: The state of the game
+    Precondition: state is one of the STATE constants in consts.py
+    """
+    from consts import (STATE_INACTIVE, STATE_NEWWAVE, STATE_ACTIVE,
+                        STATE_PAUSED, STATE_CONTINUE, STATE_COMPLETE)
+    return {STATE_INACTIVE: (STATE_INACTIVE,STATE_NEWWAVE),
+            STATE_NEWWAVE:  (STATE_ACTIVE,),
+            STATE_ACTIVE:   (STATE_ACTIVE,STATE_PAUSED,STATE_COMPLETE),
+            STATE_PAUSED:   (STATE_PAUSED,STATE_CONTINUE,STATE_COMPLETE),
+            STATE_CONTINUE: (STATE_ACTIVE,STATE_PAUSED,STATE_COMPLETE),
+            STATE_COMPLETE: (STATE_COMPLETE,)}[state]
+
+
+def playGame(recording, seed, frames):
+    """
+    Returns the result of a game of Invaders played with the given input
+
+    The result is a dictionary with the keys 'states' (the set of states the
+    game went through), 'frames', 'score' and 'lives'.  An AssertionError is
+    raised as soon as a check fails.
+
+    Parameter recording: The input of the game
+    Precondition: recording is an InputRecording
+
+    Parameter seed: The seed of the game (GAME_SEED)
+    Precondition: seed is an int
+
+    Parameter frames: The most frames to play
+    Precondition: frames is an int > 0
+    """
+    import app
+    from rollout import configure
+    from consts import (GAME_WIDTH, GAME_HEIGHT, SHIP_LIVES, STATE_INACTIVE,
+                        STATE_NEWWAVE, STATE_COMPLETE)
+    configure({'GAME_SEED': seed})
+    game = app.Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,play_input=recording)
+    states = set()
+    last = None
+    score = 0
+    lives = SHIP_LIVES
+    for frame in range(frames):
+        game.run(1)
+        state = game._state
+        states.add(state)
+        where = 'frame %d' % frame
+        assert last is None or state in allowedStates(last), \
+            '%s: state %d after state %d' % (where,state,last)
+        # The wave is only cleared by the first update in STATE_COMPLETE
+        waveless = (state in (STATE_INACTIVE,STATE_NEWWAVE) or
+                    state == last == STATE_COMPLETE)
+        assert (game._wave is None) == waveless, \
+            '%s: state %d with wave %r' % (where,state,game._wave)
+        if not game._wave is None:
+            assert 0 <= game._wave._getLives() <= SHIP_LIVES, \
+                '%s: %d lives' % (where,game._wave._getLives())
+            assert game._wave._getScore() >= score, \
+                '%s: score went down to %d' % (where,game._wave._getScore())
+            score = game._wave._getScore()
+            lives = game._wave._getLives()
+        if state == last == STATE_COMPLETE:
+            break
+        last = state
+    game.stop()
+    configure(None)
+    return {'states': states, 'frames': frame+1, 'score': score, 'lives': lives}
+
+
+def main():
+    """
+    Runs the soak test with the options on the command line
+    """
+    parser = argparse.ArgumentParser(description='Play many games with random input')
+    parser.add_argument('--games', type=int, default=10, help='the number of games')
+    parser.add_argument('--frames', type=int, default=20000, help='the most frames per game')
+    parser.add_argument('--seed', type=int, default=0, help='the seed that picks the games')
+    parser.add_argument('--verify', action='store_true',
+                        help='play every game again from its saved recording')
+    parser.add_argument('--save', help='save the input of a failed game to this file')
+    options = parser.parse_args()
+    # consts.py reads numbers from the command line, so hide these options
+    sys.argv = sys.argv[:1]
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from game2d import InputRecording
+    from consts import (STATE_INACTIVE, STATE_NEWWAVE, STATE_ACTIVE,
+                        STATE_PAUSED, STATE_CONTINUE)
+    rng = random.Random(options.seed)
+    visited = set()
+    for number in range(options.games):
+        seed = rng.randrange(2**32)
+        recording = randomRecording(random.Random(seed),options.frames)
+        try:
+            result = playGame(recording,seed,options.frames)
+            if options.verify:
+                again = playGame(InputRecording.decode(recording.encode()),seed,options.frames)
+                assert again == result, 'the game played differently the second time'
+        except AssertionError as error:
+            print('game %d (seed %d) failed: %s' % (number,seed,error))
+            if not options.save is None:
+                recording.save(options.save)
+                print('input saved to %s (set GAME_SEED = %d)' % (options.save,seed))
+            sys.exit(1)
+        visited |= result['states']
+        print('game %d (seed %d): %d frames, score %d, %d lives, states %s' %
+              (number,seed,result['frames'],result['score'],result['lives'],
+               sorted(result['states'])))
+
+    missing = {STATE_INACTIVE,STATE_NEWWAVE,STATE_ACTIVE,STATE_PAUSED,STATE_CONTINUE}-visited
+    if missing:
+        print('the games never reached the states %s' % sorted(missing))
+        sys.exit(1)
+    print('%d games passed' % options.games)
+
+
+if __name__ == '__main__':
+    main()
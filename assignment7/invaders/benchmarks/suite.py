@@ -0,0 +1,329 @@
+"""
+Benchmark suite for Alien Invaders and game2d
+
+This script times the hot paths of the game and of game2d, and can save the
+results as JSON so that a later version can be compared against them:
+
+    wave.update[RxC]     one frame of Wave.update with R rows of C aliens
+    wave.acollision[N]   one call of Wave._acollision with N player bolts
+    invaders.frame       one frame of a game of Invaders, played from a recording
+    set.ATTR, get.ATTR   setting or getting a GObject attribute
+    new.GSprite          making a GSprite (the ship filmstrip)
+    new.GLabel           making a GLabel
+    texture.cold/warm    GameApp.load_texture without and with the cache
+
+Every result is the best time of a single operation over several repeats, in
+seconds.  By default the suite times the Kivy classes, which a game plays with
+(see backends.py; this opens a window).  With --headless, it times the
+Kivy-free classes instead, which run without a display.  Headless games have
+no textures, so the texture benchmarks are left out there, and the suite says
+so.
+
+Run it from the invaders folder:
+
+    python benchmarks/suite.py [--output new.json] [--compare old.json] [--headless]
+
+With --compare, any benchmark that is slower than before by more than the
+threshold (10% by default) is reported as a regression, and the script exits
+with status 1.  Results are only compared with results of the same backend.
+"""
+import os
+import sys
+import json
+import time
+import random
+import timeit
+import platform
+import argparse
+
+import backends
+
+
+# The formation sizes for wave.update, up to the largest allowed by consts.py
+WAVE_SIZES = ((3,8),(5,12),(8,12),(10,15))
+
+# The numbers of player bolts for wave.acollision
+BOLT_COUNTS = (1,8,32,128)
+
+# The attributes for set.ATTR and get.ATTR, with the value to set
+ATTRIBUTES = (('x',10.0),('y',10.0),('width',10.0),('scale',1.0),
+              ('angle',0.0),('fillcolor','red'))
+
+# The benchmark functions, in the order they are run
+BENCHMARKS = []
+
+
+def benchmark(func):
+    """
+    Adds a function to the suite, and returns it
+
+    A benchmark function takes the number of repeats, and yields a
+    (name, seconds) pair for every result.
+
+    Parameter func: The benchmark function
+    Precondition: func is a generator function as described above
+    """
+    BENCHMARKS.append(func)
+    return func
+
+
+def best(statement, env, number, repeat):
+    """
+    Returns the best time in seconds of a single execution of statement
+
+    Parameter statement: The statement to time
+    Precondition: statement is a string with valid Python code
+
+    Parameter env: The globals for the statement
+    Precondition: env is a dictionary
+
+    Parameter number: The number of times to run the statement per repeat
+    Precondition: number is an int > 0
+
+    Parameter repeat: The number of repeats
+    Precondition: repeat is an int > 0
+    """
+    return min(timeit.repeat(statement,globals=env,number=number,repeat=repeat))/number
+
+
+@benchmark
+def wave_update(repeat):
+    """
+    Yields the time of one frame of Wave.update for each size in WAVE_SIZES
+
+    Each repeat restores the same starting snapshot, and plays 300 frames of
+    a ship that sweeps back and forth while firing.
+
+    Parameter repeat: The number of repeats
+    Precondition: repeat is an int > 0
+    """
+    from rollout import configure
+    from replay import ReplayInput
+    frames = 300
+    inputs = [ReplayInput(('left','up'))]*60+[ReplayInput(('right','up'))]*60
+    for rows, cols in WAVE_SIZES:
+        configure({'ALIEN_ROWS': rows, 'ALIENS_IN_ROW': cols})
+        from wave import Wave
+        wave = Wave(seed=1)
+        start = wave._snapshot()
+        times = []
+        for _ in range(repeat):
+            wave._restore(start)
+            clock = time.perf_counter()
+            for frame in range(frames):
+                wave.update(inputs[frame % len(inputs)],1/60)
+            times.append((time.perf_counter()-clock)/frames)
+        yield ('wave.update[%dx%d]' % (rows,cols), min(times))
+    configure(None)
+
+
+@benchmark
+def wave_acollision(repeat):
+    """
+    Yields the time of one call of Wave._acollision for each count in
+    BOLT_COUNTS
+
+    The bolts are spread at random over the formation, in the gaps between
+    the columns of aliens.  So every bolt is checked against its neighbors,
+    but none of them hit, and the wave is the same for every call.
+
+    Parameter repeat: The number of repeats
+    Precondition: repeat is an int > 0
+    """
+    from wave import Wave
+    from consts import (GAME_HEIGHT, ALIEN_CEILING, ALIEN_WIDTH, ALIEN_HEIGHT,
+                        ALIEN_H_SEP, ALIEN_V_SEP, ALIEN_ROWS, ALIENS_IN_ROW)
+    left = 2*ALIEN_H_SEP+ALIEN_WIDTH+(ALIEN_WIDTH+ALIEN_H_SEP)/2
+    top = GAME_HEIGHT-ALIEN_CEILING
+    bottom = top-(ALIEN_ROWS-1)*(ALIEN_HEIGHT+ALIEN_V_SEP)
+    for count in BOLT_COUNTS:
+        wave = Wave(seed=1)
+        rng = random.Random(count)
+        for _ in range(count):
+            x = left+rng.randrange(ALIENS_IN_ROW-1)*(ALIEN_WIDTH+ALIEN_H_SEP)
+            y = rng.uniform(bottom,top)
+            wave._bolts.append(wave._getPool().acquire(x,y,True))
+        score = wave._getScore()
+        env = {'wave': wave}
+        seconds = best('wave._acollision()',env,1000,repeat)
+        assert wave._getScore() == score, 'a bolt hit an alien'
+        yield ('wave.acollision[%d]' % count, seconds)
+
+
+@benchmark
+def invaders_frame(repeat):
+    """
+    Yields the time of one frame of a whole game of Invaders
+
+    Each repeat starts a new game with the same seed, and plays it with the
+    same random input (see soak.py) for 2000 frames, so every repeat plays
+    exactly the same game.  A frame is one pass of the frame loop of GameApp:
+    the update and draw of the game, and the canvas updates on Kivy.
+
+    Parameter repeat: The number of repeats
+    Precondition: repeat is an int > 0
+    """
+    import app
+    from soak import randomRecording
+    from rollout import configure
+    from consts import GAME_WIDTH, GAME_HEIGHT, STATE_COMPLETE
+    frames = 2000
+    recording = randomRecording(random.Random(1),frames)
+    configure({'GAME_SEED': 1})
+    times = []
+    for _ in range(repeat):
+        game = app.Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,play_input=recording)
+        backends.play(game,0)
+        clock = time.perf_counter()
+        backends.play(game,frames)
+        times.append((time.perf_counter()-clock)/frames)
+        assert game._state != STATE_COMPLETE, 'the game ended early'
+        backends.stop(game)
+    configure(None)
+    yield ('invaders.frame', min(times))
+
+
+@benchmark
+def gobject_attributes(repeat):
+    """
+    Yields the time to set and to get each attribute in ATTRIBUTES
+
+    Parameter repeat: The number of repeats
+    Precondition: repeat is an int > 0
+    """
+    from game2d import GRectangle
+    env = {'obj': GRectangle(x=0,y=0,width=10,height=10)}
+    for name, value in ATTRIBUTES:
+        yield ('set.'+name, best('obj.%s = %r' % (name,value),env,100000,repeat))
+        yield ('get.'+name, best('obj.%s' % name,env,100000,repeat))
+
+
+@benchmark
+def construction(repeat):
+    """
+    Yields the time to make a GSprite and a GLabel
+
+    Parameter repeat: The number of repeats
+    Precondition: repeat is an int > 0
+    """
+    import game2d
+    env = {'game2d': game2d}
+    yield ('new.GSprite', best("game2d.GSprite(x=0,y=0,width=44,height=44,"
+                               "source='ship-strip.png',format=(2,4))",env,1000,repeat))
+    yield ('new.GLabel', best("game2d.GLabel(text='Score: 100',font_size=24,"
+                              "font_name='Arcade.ttf')",env,1000,repeat))
+
+
+@benchmark
+def textures(repeat):
+    """
+    Yields the time of GameApp.load_texture with an empty and a full cache
+
+    This yields nothing when headless, as there are no textures (main says
+    so when it prints the results).
+
+    Parameter repeat: The number of repeats
+    Precondition: repeat is an int > 0
+    """
+    import game2d
+    if game2d.HEADLESS:
+        return
+    env = {'GameApp': game2d.GameApp}
+    yield ('texture.cold', best("GameApp.unload_texture('alien1.png'); "
+                                "GameApp.load_texture('alien1.png')",env,20,repeat))
+    yield ('texture.warm', best("GameApp.load_texture('alien1.png')",env,10000,repeat))
+
+
+def compare(results, old, threshold):
+    """
+    Prints each result next to an older one, and returns the regressions
+
+    A regression is a benchmark that is slower than before by more than the
+    threshold (as a fraction).
+
+    Parameter results: The new results
+    Precondition: results is a dictionary mapping names to seconds
+
+    Parameter old: The old results
+    Precondition: old is a dictionary mapping names to seconds
+
+    Parameter threshold: The largest slowdown that is not a regression
+    Precondition: threshold is a float >= 0
+    """
+    regressions = []
+    print('%-24s %12s %12s %8s' % ('benchmark','old us','new us','change'))
+    for name in results:
+        if not name in old or old[name] <= 0:
+            print('%-24s %12s %12.3f' % (name,'-',results[name]*1e6))
+            continue
+        change = results[name]/old[name]-1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print('%-24s %12.3f %12.3f %+7.1f%%%s' %
+              (name,old[name]*1e6,results[name]*1e6,100*change,flag))
+    return regressions
+
+
+def main():
+    """
+    Runs the suite with the options on the command line
+    """
+    parser = argparse.ArgumentParser(description='Time the hot paths of the game')
+    parser.add_argument('--output', help='save the results to this JSON file')
+    parser.add_argument('--compare', help='compare with the results in this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='the slowdown (as a fraction) reported as a regression')
+    parser.add_argument('--repeat', type=int, default=5, help='the repeats of each benchmark')
+    parser.add_argument('--headless', action='store_true',
+                        help='time the headless classes (no display needed)')
+    options = parser.parse_args()
+    # consts.py reads numbers from the command line, so hide these options
+    sys.argv = sys.argv[:1]
+    os.chdir(backends.ROOT)
+    headless = backends.select(options.headless)
+
+    old = None
+    if not options.compare is None:
+        with open(options.compare) as file:
+            data = json.load(file)
+        if data['meta'].get('headless',True) != headless:
+            measured = 'headless' if data['meta'].get('headless',True) else 'Kivy'
+            print('%s was measured on the %s backend; use the same backend to compare' %
+                  (options.compare,measured))
+            sys.exit(2)
+        old = data['results']
+
+    import game2d
+    print('backend: %s' % ('headless' if headless else 'kivy'))
+    if headless:
+        print('texture.cold and texture.warm are skipped: headless games have no textures')
+    results = {}
+    for func in BENCHMARKS:
+        for name, seconds in func(options.repeat):
+            results[name] = seconds
+            if options.compare is None:
+                print('%-24s %12.3f us' % (name,seconds*1e6))
+
+    regressions = []
+    if not old is None:
+        regressions = compare(results,old,options.threshold)
+
+    if not options.output is None:
+        data = {'meta': {'python': platform.python_version(),
+                         'machine': platform.machine(),
+                         'platform': platform.platform(),
+                         'headless': game2d.HEADLESS,
+                         'validation': game2d.get_validation(),
+                         'date': time.strftime('%Y-%m-%d %H:%M:%S')},
+                'results': results}
+        with open(options.output,'w') as file:
+            json.dump(data,file,indent=2)
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,7 +9,6 @@ allows all modules to access them.
 # Sanjana Kasetti sk2465, Rani Datta rd447
 # 12/9/2021
 """
-import introcs
 import sys
 
 ### WINDOW CONSTANTS (all coordinates are in pixels) ###
@@ -126,3 +125,66 @@ except:
     pass # Use original value
 
 ### ADD MORE CONSTANTS (PROPERLY COMMENTED) AS NECESSARY ###
+
+# whether Wave stores the alien positions in NumPy arrays (requires numpy)
+ALIEN_ARRAYS = False
+
+# whether Wave draws the aliens and the bolts as one GSpriteBatch each (the
+# alien images must share a texture, so the game must be built with an atlas)
+SPRITE_BATCH = False
+
+# whether the game packs its images into one texture atlas when it starts (see
+# game2d/atlas.py), so that the images can share a GSpriteBatch
+ATLAS = False
+
+# whether the game view is retained (see GView in game2d/gview.py): Invaders
+# and Wave add each object to the view when it appears and remove it when it
+# disappears, instead of drawing every object every frame
+RETAINED_VIEW = False
+
+# the layers of a retained view, from the bottom up, in the order that
+# Invaders.draw and Wave.draw draw the objects
+LAYER_TEXT = 0
+LAYER_ALIENS = 1
+LAYER_SHIP = 2
+LAYER_DLINE = 3
+LAYER_BOLTS = 4
+
+# the folder where Invaders saves a replay of every wave (see replay.py), or
+# None to not record replays
+REPLAY_FOLDER = None
+
+# whether to profile the time of each frame: False, True, or the name of a .csv
+# or .json file to write the statistics to when the game closes
+PROFILE = False
+
+# whether to show the frame time statistics on screen (this also profiles)
+PROFILE_OVERLAY = False
+
+# the sound files played by Wave, which Invaders loads when the game starts
+WAVE_SOUNDS = ('blast3.wav','pew1.wav','pop1.wav','blast2.wav')
+
+# the number of copies of each sound that can play at the same time
+SOUND_VOICES = 4
+
+# whether the sounds are played on a separate thread, so that a slow audio
+# backend does not delay the frame
+ASYNC_AUDIO = False
+
+# whether to mix the sounds in software (see game2d/mixer.py): False to play them
+# with Kivy, True to mix them and play the mix on the sound card (this needs the
+# package sounddevice; a headless game discards the mix), or the name of a .wav
+# file to write the mix to
+MIXER = False
+
+# the seed that picks the seed of every wave in a game, or None for a different
+# game every time (set it to play back an input recording exactly)
+GAME_SEED = None
+
+# the file to record the input of every frame to (see game2d/recording.py), or
+# None to not record the input; recording or playing back the input makes the
+# game update in fixed steps of 1/60 of a second, so that it plays back exactly
+INPUT_RECORD = None
+
+# the input recording to play back in place of the keyboard, or None
+INPUT_PLAYBACK = None
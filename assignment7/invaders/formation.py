@@ -0,0 +1,313 @@
+"""
+Formation tracking module for Alien Invaders
+
+This module contains a bookkeeping class that Wave uses to answer questions
+about the shape of the alien formation (which columns are the left and right
+edges, which row is the bottom, whether every alien is dead) without walking
+the whole 2d list of aliens.
+
+The tracker only knows about (row,col) positions.  It does not store the
+aliens themselves, so it does not need anything other than consts.py.
+
+This module also has an optional structure-of-arrays representation of the
+alien positions, which Wave uses when ALIEN_ARRAYS is True.  That class needs
+NumPy, but it is only imported when the class is used.
+"""
+from consts import *
+
+
+class Formation(object):
+    """
+    A class to track the live aliens in a rectangular formation.
+
+    The formation keeps a count of the live aliens in every row and in every
+    column, together with the indices of the leftmost and rightmost occupied
+    columns and the bottommost occupied row.  Rows are numbered from the top,
+    as in Wave, so the bottom row has the largest index.
+
+    Killing an alien is O(1) amortized.  The edge indices only ever move
+    inwards, so over the life of a wave each of them is advanced at most
+    once per row or column.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _rowcount: the number of live aliens in each row
+    # Invariant: _rowcount is a list of ints >= 0, one for each row
+    #
+    # Attribute _colcount: the number of live aliens in each column
+    # Invariant: _colcount is a list of ints >= 0, one for each column
+    #
+    # Attribute _live: the number of live aliens in the formation
+    # Invariant: _live is an int >= 0 and equal to sum(_rowcount)
+    #
+    # Attribute _left: the leftmost column with a live alien
+    # Invariant: _left is an int, and _colcount[_left] > 0 unless _live is 0
+    #
+    # Attribute _right: the rightmost column with a live alien
+    # Invariant: _right is an int, and _colcount[_right] > 0 unless _live is 0
+    #
+    # Attribute _bottom: the bottommost row with a live alien
+    # Invariant: _bottom is an int, and _rowcount[_bottom] > 0 unless _live is 0
+
+    # GETTERS
+    def getLeft(self):
+        '''
+        Returns the index of the leftmost column with a live alien, or None
+        '''
+        return None if self._live == 0 else self._left
+
+    def getRight(self):
+        '''
+        Returns the index of the rightmost column with a live alien, or None
+        '''
+        return None if self._live == 0 else self._right
+
+    def getBottom(self):
+        '''
+        Returns the index of the bottommost row with a live alien, or None
+        '''
+        return None if self._live == 0 else self._bottom
+
+    def getLive(self):
+        '''
+        Returns the number of live aliens in the formation
+        '''
+        return self._live
+
+    def getColumns(self):
+        '''
+        Returns a list of the columns with at least one live alien, in order
+        '''
+        return [col for col in range(self._left, self._right+1)
+                if self._colcount[col] > 0]
+
+    # INITIALIZER
+    def __init__(self, rows, cols):
+        '''
+        Initializes a full formation with every alien alive
+
+        Parameter rows: The number of rows in the formation
+        Precondition: rows is an int > 0
+
+        Parameter cols: The number of aliens in each row
+        Precondition: cols is an int > 0
+        '''
+        assert type(rows) == int and rows > 0
+        assert type(cols) == int and cols > 0
+        self._rowcount = [cols]*rows
+        self._colcount = [rows]*cols
+        self._live = rows*cols
+        self._left = 0
+        self._right = cols-1
+        self._bottom = rows-1
+
+    # PUBLIC METHODS
+    def isEmpty(self):
+        '''
+        Returns True if every alien in the formation is dead
+        '''
+        return self._live == 0
+
+    def kill(self, row, col):
+        '''
+        Records the death of the alien at (row,col)
+
+        Parameter row: The row of the dead alien
+        Precondition: row is a valid row index with a live alien
+
+        Parameter col: The column of the dead alien
+        Precondition: col is a valid column index with a live alien
+        '''
+        assert self._rowcount[row] > 0 and self._colcount[col] > 0
+        self._rowcount[row] -= 1
+        self._colcount[col] -= 1
+        self._live -= 1
+        if self._live == 0:
+            return
+        while self._colcount[self._left] == 0:
+            self._left += 1
+        while self._colcount[self._right] == 0:
+            self._right -= 1
+        while self._rowcount[self._bottom] == 0:
+            self._bottom -= 1
+
+
+class FormationArrays(object):
+    """
+    A class to store the alien positions as NumPy arrays.
+
+    This is a structure-of-arrays version of the alien formation.  Every alien
+    has a base position, recorded when the wave is created, and a flag saying
+    whether it is alive.  All aliens march together, so their current position
+    is the base position plus a single formation offset.  Marching the whole
+    formation is then one update to the offset, instead of a property set on
+    every Alien object.
+
+    The Alien objects are only brought up to date when they are needed: by
+    calling sync before drawing, or syncAlien for a single alien.
+
+    This class requires NumPy.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _x: the base horizontal position of each alien
+    # Invariant: _x is a 2d NumPy array of floats, one per (row,col)
+    #
+    # Attribute _y: the base vertical position of each alien
+    # Invariant: _y is a 2d NumPy array of floats with the same shape as _x
+    #
+    # Attribute _alive: whether each alien is still alive
+    # Invariant: _alive is a 2d NumPy array of bools with the same shape as _x
+    #
+    # Attribute _dx: the horizontal offset of the formation from its base
+    # Invariant: _dx is a float
+    #
+    # Attribute _dy: the vertical offset of the formation from its base
+    # Invariant: _dy is a float
+    #
+    # Attribute _synced: the offset the last time every alien was synced
+    # Invariant: _synced is a pair of floats, or None if no sync is valid
+
+    # GETTERS
+    def getOffset(self):
+        '''
+        Returns the (dx,dy) offset of the formation from its base position
+        '''
+        return (self._dx, self._dy)
+
+    def getPosition(self, row, col):
+        '''
+        Returns the current (x,y) position of the alien at (row,col)
+
+        Parameter row: The row of the alien
+        Precondition: row is a valid row index
+
+        Parameter col: The column of the alien
+        Precondition: col is a valid column index
+        '''
+        return (float(self._x[row,col])+self._dx, float(self._y[row,col])+self._dy)
+
+    def isAlive(self, row, col):
+        '''
+        Returns True if the alien at (row,col) is alive
+        '''
+        return bool(self._alive[row,col])
+
+    def getBase(self, row, col):
+        '''
+        Returns the base (x,y) position of the alien at (row,col)
+
+        Parameter row: The row of the alien
+        Precondition: row is a valid row index
+
+        Parameter col: The column of the alien
+        Precondition: col is a valid column index
+        '''
+        return (float(self._x[row,col]), float(self._y[row,col]))
+
+    # INITIALIZER
+    def __init__(self, aliens):
+        '''
+        Initializes the arrays from the current positions of aliens
+
+        Parameter aliens: The formation of aliens
+        Precondition: aliens is a rectangular 2d list of Alien objects or None
+        '''
+        import numpy as np
+        rows = len(aliens)
+        cols = len(aliens[0]) if rows > 0 else 0
+        self._x = np.zeros((rows,cols), dtype=float)
+        self._y = np.zeros((rows,cols), dtype=float)
+        self._alive = np.zeros((rows,cols), dtype=bool)
+        for row in range(rows):
+            for col in range(cols):
+                if aliens[row][col] != None:
+                    self._x[row,col] = aliens[row][col].x
+                    self._y[row,col] = aliens[row][col].y
+                    self._alive[row,col] = True
+        self._dx = 0.0
+        self._dy = 0.0
+        self._synced = (0.0, 0.0)
+
+    # PUBLIC METHODS
+    def shift(self, dx, dy):
+        '''
+        Moves the whole formation by (dx,dy)
+
+        Parameter dx: The horizontal distance to move
+        Precondition: dx is an int or float
+
+        Parameter dy: The vertical distance to move
+        Precondition: dy is an int or float
+        '''
+        self._dx += dx
+        self._dy += dy
+
+    def kill(self, row, col):
+        '''
+        Marks the alien at (row,col) as dead
+
+        Parameter row: The row of the dead alien
+        Precondition: row is a valid row index
+
+        Parameter col: The column of the dead alien
+        Precondition: col is a valid column index
+        '''
+        self._alive[row,col] = False
+
+    def restore(self, alive, dx, dy):
+        '''
+        Replaces the live aliens and the offset of the formation
+
+        The base positions do not change.  The next call to sync moves every
+        live alien, even if the offset is the same as before.
+
+        Parameter alive: Whether each alien is alive
+        Precondition: alive is a rectangular 2d list of bools with one entry
+        per (row,col)
+
+        Parameter dx: The horizontal offset of the formation from its base
+        Precondition: dx is an int or float
+
+        Parameter dy: The vertical offset of the formation from its base
+        Precondition: dy is an int or float
+        '''
+        self._alive[:] = alive
+        self._dx = float(dx)
+        self._dy = float(dy)
+        self._synced = None
+
+    def syncAlien(self, aliens, row, col):
+        '''
+        Moves the Alien object at (row,col) to its current position
+
+        Parameter aliens: The formation of aliens
+        Precondition: aliens is the 2d list these arrays were made from
+
+        Parameter row: The row of the alien
+        Precondition: row is a valid row index with a live alien
+
+        Parameter col: The column of the alien
+        Precondition: col is a valid column index with a live alien
+        '''
+        alien = aliens[row][col]
+        alien.x, alien.y = self.getPosition(row, col)
+
+    def sync(self, aliens):
+        '''
+        Moves every live Alien object to its current position
+
+        This does nothing if the formation has not moved since the last sync.
+
+        Parameter aliens: The formation of aliens
+        Precondition: aliens is the 2d list these arrays were made from
+        '''
+        import numpy as np
+        if self._synced == (self._dx, self._dy):
+            return
+        xs = (self._x + self._dx).tolist()
+        ys = (self._y + self._dy).tolist()
+        rows, cols = np.nonzero(self._alive)
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            alien = aliens[row][col]
+            alien.x = xs[row][col]
+            alien.y = ys[row][col]
+        self._synced = (self._dx, self._dy)
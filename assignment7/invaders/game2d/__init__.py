@@ -4,13 +4,41 @@ A module to support simple 2D game development.
 This module is a simple wrapper around Kivy interfaces to make 2D game development
 simpler for students in CS 1110.
 
+If the environment variable ``GAME2D_HEADLESS`` is set (to anything other than the
+empty string or ``0``), the classes are replaced by the Kivy-free versions in module
+:mod:`headless`.  The flag ``HEADLESS`` records which backend was chosen.
+
+The functions :func:`set_validation` and :func:`get_validation` control whether the
+property setters validate their arguments (see module :mod:`validate`).  The function
+:func:`section` and the decorator :func:`profiled` time named sections of code, when the
+game is profiled (see module :mod:`profiler`).  The class :class:`InputRecording` stores
+the input of a game, so that it can be played back (see module :mod:`recording`).
+
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from .gobject import GObject, GScene
-from .grectangle import GRectangle, GEllipse, GImage, GLabel
-from .gsprite import GSprite
-from .gpath import GPath, GTriangle, GPolygon
-from .gview import GInput, GView
-from .sound import Sound, SoundLibrary
-from .app import GameApp
\ No newline at end of file
+from os import environ as _environ
+
+HEADLESS = _environ.get('GAME2D_HEADLESS','') not in ('','0')
+
+from .validate import get_validation, set_validation
+from .profiler import Profiler, get_profiler, section, profiled
+from .recording import InputRecording, load_input
+
+if HEADLESS:
+    from .headless import GObject, GScene
+    from .headless import GRectangle, GEllipse, GImage, GLabel, GText
+    from .headless import GSprite, GSpriteBatch
+    from .headless import GPath, GTriangle, GPolygon
+    from .headless import GInput, GView
+    from .headless import Sound, SoundLibrary
+    from .headless import GameApp
+else:
+    from .gobject import GObject, GScene
+    from .grectangle import GRectangle, GEllipse, GImage, GLabel, GText
+    from .gsprite import GSprite
+    from .gbatch import GSpriteBatch
+    from .gpath import GPath, GTriangle, GPolygon
+    from .gview import GInput, GView
+    from .sound import Sound, SoundLibrary
+    from .app import GameApp
@@ -20,7 +20,10 @@ import numpy as np
 
 import os.path
 
-class GameApp(kivy.app.App):
+from .loop import GameLoop
+from .dispatch import set_async
+
+class GameApp(kivy.app.App,GameLoop):
     """
     A controller class for a simple game application.
     
@@ -38,10 +41,31 @@ class GameApp(kivy.app.App):
     
     :meth:`draw`: This method draws all of the objects to the screen.  The only 
     thing you should have in this method are calls to ``self.view.draw()``.
+    
+    By default, :meth:`update` is called once per frame with the actual time since the
+    last frame.  If the game is created with the keyword ``step``, it instead uses a
+    fixed time step: every frame, :meth:`update` is called zero or more times with 
+    exactly ``step`` seconds, and the attribute :attr:`alpha` tells :meth:`draw` how 
+    far the game is between the last update and the next one.
+    
+    If the game is created with the keyword ``profile``, the time of each frame is 
+    measured (see :attr:`profiler`).  If it is created with the keyword ``async_audio``,
+    sounds are played on a separate thread (see module :mod:`dispatch`), and if it is 
+    created with the keyword ``mixer``, they are mixed in software (see module 
+    :mod:`mixer`).
+    
+    The keywords, the properties other than ``fps``, and the frame loop itself are 
+    shared with the headless backend through :class:`loop.GameLoop`.
     """
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
     
+    # Class attribute for the texture atlas (if any) backing the texture cache
+    ATLAS = None
+    
+    # Class attribute for whether the keyword ``mixer=True`` plays on the audio device
+    AUDIO_DEVICE = True
+    
     
     # MUTABLE ATTRIBUTES
     @property
@@ -66,49 +90,6 @@ class GameApp(kivy.app.App):
         Clock.schedule_interval(self._refresh,1.0/self._fps)
     
     
-    # IMMUTABLE PROPERTIES
-    @property
-    def width(self):
-        """
-        The window width
-        
-        **Invariant**: Must be an int or float > 0.
-        """
-        return self._gwidth
-    
-    @property
-    def height(self):
-        """
-        The window height
-        
-        **Invariant**: Must be an int or float > 0.
-        """
-        return self._gheight
-    
-    @property
-    def view(self):
-        """
-        The game view.
-        
-        Use the `draw` method  in this attribute to display any :class:`GObject` instance 
-        on the screen.  See the class :class:`GView` for more information.
-        
-        **Invariant**: Must be instance of :class:`GView`.
-        """
-        return self._view
-    
-    @property
-    def input(self):
-        """
-        The game input handler.
-        
-        Use this attribute to get information about the mouse and keyboard.  See the
-        class :class:`GInput` for more information.
-        
-        **Invariant**: Must be instance of :class:`GInput`
-        """
-        return self._input
-    
     # CLASS METHODS
     @classmethod
     def is_image(cls,name):
@@ -198,12 +179,16 @@ class GameApp(kivy.app.App):
         
         The ``name`` should refer to the file in in the texture cache.  If the texture
         is in the cache, it will return the cached texture before removing it.  Otherwise, 
-        it will returning None.
+        it will returning None.  Any sprite frames sliced from this texture are also 
+        removed from the cache in :class:`GSprite`.
         
         :param name: The file name
         :type name:  ``str``
         """
         assert type(name) == str, '%s is not a valid texture name' % repr(name)
+        from .gsprite import GSprite
+        for key in [k for k in GSprite.FRAME_CACHE if k[0] == name]:
+            del GSprite.FRAME_CACHE[key]
         if name in cls.TEXTURE_CACHE:
             texture = cls.TEXTURE_CACHE[name]
             del cls.TEXTURE_CACHE[name]
@@ -211,6 +196,41 @@ class GameApp(kivy.app.App):
         
         return None
     
+    @classmethod
+    def build_atlas(cls,names=None,width=2048):
+        """
+        Returns: The atlas texture holding the given images
+        
+        This method packs the images into a single texture, and puts a region of that 
+        texture in the texture cache for each image.  Afterwards, :meth:`load_texture` 
+        returns these regions, so every :class:`GImage` and :class:`GSprite` made from 
+        these images draws from the same texture.  This reduces the number of texture 
+        switches when drawing a scene.
+        
+        If ``names`` is None, every image in the **Images** folder is packed.  Images
+        that do not fit in the atlas are loaded separately as before.
+        
+        This method must be called after the game window is created.  It is called for
+        you (before `start`) if the game is created with the keyword ``atlas``.
+        
+        :param names: The file names to pack (or None)
+        :type names:  ``list`` of ``str`` or None
+        
+        :param width: The width of the atlas texture
+        :type width:  ``int`` > 0
+        """
+        from .atlas import build_atlas
+        if names is None:
+            names = sorted(os.listdir(cls.images))
+        names = [name for name in names if cls.is_image(name)]
+        for name in names:
+            cls.unload_texture(name)
+        
+        atlas, regions = build_atlas(names,width)
+        cls.TEXTURE_CACHE.update(regions)
+        cls.ATLAS = atlas
+        return atlas
+    
     # BUILT-IN METHODS
     def __init__(self,**keywords):
         """
@@ -226,28 +246,53 @@ class GameApp(kivy.app.App):
         The game window will not show until you start the game. To start the game, use 
         the method ``run()``.
         
+        If the keyword ``retained`` is True, the view is retained: it is not cleared 
+        every frame.  Instead, the game adds each object to the view (in a layer) when it
+        appears and removes it when it disappears, so only those objects change the 
+        canvas.  See :class:`GView` for more information.
+        
+        To use a fixed time step, provide the keyword ``step`` (the step length in
+        seconds).  The keyword ``max_steps`` (default 5) is the most updates that will 
+        be run in a single frame when the game falls behind; any further time is dropped.
+        
+        If the keyword ``atlas`` is True, all of the images are packed into a single 
+        texture when the game starts.  See :meth:`build_atlas` for more information.
+        
+        If the keyword ``profile`` is True, the time of every frame is profiled (see 
+        :attr:`profiler`).  If it is a file name, the statistics are also written to that 
+        file (as JSON if it ends in ``.json``, or CSV otherwise) when the game stops.  If
+        the keyword ``overlay`` is True, the game is profiled and the statistics are 
+        shown in the top left corner of the window.
+        
+        If the keyword ``async_audio`` is True, :class:`Sound` objects are played on a 
+        separate audio thread.  The game only records the sounds played in each frame, 
+        and hands them to that thread at the end of the frame.
+        
+        If the keyword ``mixer`` is given, :class:`Sound` objects are mixed in software by
+        a :class:`mixer.Mixer`, which decodes every file in the **Sounds** folder when the
+        game is created.  The value is either a mixer (with any sink), True (for a mixer 
+        that plays on the audio device, which needs the package ``sounddevice``) or the 
+        name of a WAV file to write the audio to.
+        
+        If the keyword ``record_input`` is a file name, the input of every frame is 
+        recorded, and written to that file when the game stops.  If the keyword 
+        ``play_input`` is given (a file name or an :class:`InputRecording`), that 
+        recording is played back in place of the keyboard and mouse.  Either way, the 
+        game uses a fixed time step (of ``1/fps`` seconds, unless ``step`` is given), so 
+        that the recording plays back exactly.  See module :mod:`recording` for more 
+        information.
+        
         **You will never call the constructor or run yourself**.  That is handled for 
         you in the provided code.
         
         :param keywords: dictionary of keyword arguments 
         :type keywords:  keys are attribute names
         """
-        w = keywords.pop('width', 0.0)
-        h = keywords.pop('height', 0.0)
-        f = keywords.pop('fps', 60.0)
-
-        assert type(w) in [int,float], 'width %s is not a number' % repr(w)
-        assert type(h) in [int,float], 'height %s is not a number' % repr(h)
-        assert type(f) in [int,float], 'fps %s is not a number' % repr(value)
-        assert f > 0, 'fps %s is not positive' % repr(value)
-
-        self._gwidth = w
-        self._gheight = h
-        self._fps = f
+        self._configure(keywords)
+        set_async(self._async_audio)
         
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
-        self._setpaths()
         
         # Tell Kivy to build the application
         kivy.app.App.__init__(self,**keywords)
@@ -264,8 +309,10 @@ class GameApp(kivy.app.App):
         from .gview import GInput, GView
         self._view = GView()
         self._view.size_hint = (1,1)
+        self._view.retained = self._retained
         self._input = GInput()
         self._input._register(self._view)
+        self._start_input()
         return self.view
     
     def run(self):
@@ -289,6 +336,16 @@ class GameApp(kivy.app.App):
         kivy.app.App.stop(self)
         sys.exit(0)
     
+    def on_stop(self):
+        """
+        Writes the profile statistics and the input recording to files, if requested, and
+        stops the audio thread and the mixer.
+        
+        This is a Kivy reserved method.  It is called when the window closes.  It should 
+        **never** be overridden.
+        """
+        self._shutdown()
+    
     def start(self):
         """
         Initializes the game state, creating a new game.
@@ -334,27 +391,25 @@ class GameApp(kivy.app.App):
         Bootstraps the clock scheduler for the game..
         
         This method is a callback-proxy for method `start`.  It handles important issues 
-        behind the scenes, particularly with setting the FPS
+        behind the scenes, particularly with setting the FPS and building the atlas.
         """
         if (self.fps < 60):
             Clock.schedule_interval(self._refresh,1.0/self.fps)
         else:
             Clock.schedule_interval(self._refresh,0)
+        if self._atlas:
+            self.build_atlas()
         self.start()
     
-    def _refresh(self,dt):
+    def _new_text(self,**keywords):
         """
-        Processes a single animation frame.
-        
-        This method a callback-proxy for the methods `update` and `draw`.  It handles
-        important issues behind the scenes, particularly with clearing the window.
+        Returns a new :class:`GText` made with the given keywords.
         
-        :param dt: time in seconds since last update
-        :type dt:  ``int`` or ``float``
+        :param keywords: dictionary of keyword arguments 
+        :type keywords:  keys are attribute names
         """
-        self.view.clear()
-        self.update(dt)
-        self.draw()
+        from .grectangle import GText
+        return GText(**keywords)
     
     def _setpaths(self):
         """
@@ -0,0 +1,110 @@
+"""
+Texture atlas support for 2D games.
+
+This module packs many small images into a single large texture (an atlas).  Every image
+is then drawn from a region of the same texture, so drawing a scene full of different
+images does not need to switch textures between them.
+
+The packing itself is done by :func:`pack`, which does not depend on Kivy.  The function
+:func:`build_atlas` loads the images and copies them into the atlas texture.  It must be
+called once the graphics window exists (see the ``atlas`` keyword of :class:`GameApp`).
+
+Kivy does not rebind a texture that is already bound, so objects drawn one after the
+other from the same atlas share a single texture bind.
+"""
+
+
+def pack(sizes,width,padding=2):
+    """
+    Returns: the positions of the given rectangles packed into a strip of the given width
+
+    The packing uses simple shelves: the rectangles are sorted from tallest to shortest,
+    and placed left to right in rows.  A new row is started whenever the current one is
+    full.  The result is a pair ``(positions, height)``, where ``positions`` is a list of
+    (x,y) pairs (one for each size, in the original order) and ``height`` is the total
+    height used.  Any rectangle wider than ``width`` is given the position None.
+
+    :param sizes: the (width,height) of each rectangle
+    :type sizes:  ``list`` of pairs of ``int``
+
+    :param width: the width of the strip
+    :type width:  ``int`` > 0
+
+    :param padding: the empty space to leave around each rectangle
+    :type padding:  ``int`` >= 0
+    """
+    assert type(width) == int and width > 0, '%s is not a valid width' % repr(width)
+    assert type(padding) == int and padding >= 0, '%s is not a valid padding' % repr(padding)
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1],-sizes[i][0]))
+    positions = [None]*len(sizes)
+
+    x = padding
+    y = padding
+    shelf = 0
+    for i in order:
+        w, h = sizes[i]
+        if w+2*padding > width:
+            continue
+        if x+w+padding > width:
+            x = padding
+            y += shelf+padding
+            shelf = 0
+        positions[i] = (x,y)
+        x += w+padding
+        shelf = max(shelf,h)
+
+    return (positions, y+shelf+padding)
+
+
+def build_atlas(names,width=2048,padding=2):
+    """
+    Returns: a pair ``(texture, regions)`` for an atlas containing the given images
+
+    The value ``regions`` is a dictionary mapping each file name to its region in the
+    atlas ``texture``.  Each region has the same size and orientation as the texture that
+    :meth:`GameApp.load_texture` would load for that file, so it can be used in its place.
+    Images that cannot be loaded, or do not fit in the atlas width, are left out.
+
+    This function must be called after the graphics window is created.
+
+    :param names: the files to pack (in the **Images** folder)
+    :type names:  ``list`` of ``str``
+
+    :param width: the width of the atlas texture
+    :type width:  ``int`` > 0
+
+    :param padding: the empty space to leave around each image
+    :type padding:  ``int`` >= 0
+    """
+    from kivy.core.image import Image
+    from kivy.graphics.texture import Texture
+
+    images = []
+    for name in names:
+        try:
+            texture = Image(name).texture
+        except:
+            texture = None
+        if not texture is None:
+            images.append((name,texture))
+
+    sizes = [(t.width,t.height) for (n,t) in images]
+    positions, height = pack(sizes,width,padding)
+    height = max(height,1)
+
+    atlas = Texture.create(size=(width,height),colorfmt='rgba')
+    atlas.blit_buffer(bytes(width*height*4),colorfmt='rgba',bufferfmt='ubyte')
+
+    regions = {}
+    for (name,texture), pos in zip(images,positions):
+        if pos is None:
+            continue
+        # The pixels are in the order stored on the GPU, so keep the same orientation
+        atlas.blit_buffer(texture.pixels,pos=pos,size=texture.size,
+                          colorfmt='rgba',bufferfmt='ubyte')
+        region = atlas.get_region(pos[0],pos[1],texture.width,texture.height)
+        if texture.uvsize[1] < 0:
+            region.flip_vertical()
+        regions[name] = region
+
+    return (atlas, regions)
@@ -0,0 +1,147 @@
+"""
+The audio thread for 2D game sounds.
+
+By default, :meth:`Sound.play` and :meth:`Sound.stop` call the audio backend at once,
+in the middle of the animation frame.  After ``set_async(True)``, they only record a
+request instead.  At the end of every frame, :func:`flush_sounds` hands the requests
+of that frame to a separate audio thread, which makes the backend calls.  Requests
+that repeat within a single frame (such as two bolts fired at once) are only made
+once.  :class:`GameApp` does all of this if it is created with the keyword
+``async_audio``, and it calls :func:`flush_sounds` at the end of every frame on every
+backend.
+
+This module does not depend on Kivy, so it is shared by the headless backend.
+"""
+import logging
+import threading
+from collections import deque
+
+# The dispatcher for the audio thread, if audio is asynchronous
+_DISPATCHER = None
+
+
+def get_async():
+    """
+    Returns: True if sounds are played on the audio thread; False otherwise
+    """
+    return not _DISPATCHER is None
+
+
+def set_async(value):
+    """
+    Sets whether sounds are played on a separate audio thread.
+
+    Turning this on starts the audio thread.  Turning it off plays any requests that
+    are still waiting, and then stops the thread.
+
+    :param value: Whether to play sounds on the audio thread
+    :type value:  ``bool``
+    """
+    global _DISPATCHER
+    assert type(value) == bool, '%s is not a bool' % repr(value)
+    if value and _DISPATCHER is None:
+        _DISPATCHER = _Dispatcher()
+    elif not value and not _DISPATCHER is None:
+        dispatcher = _DISPATCHER
+        _DISPATCHER = None
+        dispatcher.close()
+
+
+def get_dispatcher():
+    """
+    Returns: the dispatcher of the audio thread, or None if audio is not asynchronous
+    """
+    return _DISPATCHER
+
+
+def flush_sounds():
+    """
+    Hands the sound requests of this frame to the audio thread.
+
+    This should be called once at the end of every frame.  It does nothing if audio is
+    not asynchronous.
+    """
+    if not _DISPATCHER is None:
+        _DISPATCHER.flush()
+
+
+# #mark -
+class _Dispatcher(object):
+    """
+    A thread that plays the sound requests of each frame.
+
+    The game thread adds requests to a batch for the current frame with :meth:`request`.
+    The batch is a dictionary keyed by sound and action, so a repeated request is only
+    kept once.  :meth:`flush` appends the batch to a queue and wakes the audio thread.
+    Only the game thread touches the batch, and appending to and popping from a deque
+    are atomic, so making a request never waits on a lock.  The voices themselves are
+    guarded by :attr:`Sound.LOCK`, which the game thread only holds to read or change
+    the state of a sound.
+    """
+
+    def __init__(self):
+        """
+        Creates a new dispatcher and starts its audio thread.
+        """
+        self._batch = {}
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._running = True
+        self._thread = threading.Thread(target=self._run,name='game2d-audio',daemon=True)
+        self._thread.start()
+
+    def request(self,sound,action,loop=False):
+        """
+        Adds a request to the batch for this frame.
+
+        A stop cancels any play of the same sound earlier in the frame.
+
+        :param sound: The sound to play or stop
+        :type sound:  :class:`Sound`
+
+        :param action: The action to take
+        :type action:  ``'play'`` or ``'stop'``
+
+        :param loop: Whether or not to loop the sound (if played)
+        :type loop:  ``bool``
+        """
+        if action == 'stop':
+            self._batch.pop((sound,'play'),None)
+        self._batch[(sound,action)] = loop
+
+    def flush(self):
+        """
+        Hands the batch for this frame to the audio thread.
+        """
+        if self._batch:
+            self._queue.append(self._batch)
+            self._batch = {}
+            self._wake.set()
+
+    def close(self):
+        """
+        Plays any requests that are still waiting, and stops the audio thread.
+        """
+        self.flush()
+        self._running = False
+        self._wake.set()
+        self._thread.join(1.0)
+
+    def _run(self):
+        """
+        Plays every batch in the queue, waiting for more until the dispatcher is closed.
+        """
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while self._queue:
+                for (sound, action), loop in self._queue.popleft().items():
+                    try:
+                        if action == 'play':
+                            sound._play(loop)
+                        else:
+                            sound._stop()
+                    except Exception:
+                        logging.getLogger(__name__).exception('cannot %s %s' % (action,repr(sound.source)))
+            if not self._running:
+                return
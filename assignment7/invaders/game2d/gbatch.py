@@ -0,0 +1,233 @@
+"""
+A module to support batched drawing of many similar rectangles.
+
+Every :class:`GImage` or :class:`GRectangle` is drawn with its own group of canvas
+instructions (a matrix push, three transforms, a color, the rectangle, and a matrix pop).
+This is fine for a few objects, but the cost adds up when there are hundreds of them.
+This module provides :class:`GSpriteBatch`, which draws any number of axis-aligned
+rectangles that share a color and a texture as a single Kivy ``Mesh``.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject
+from .app import GameApp
+import numpy as np
+
+
+# #mark -
+class GSpriteBatch(GObject):
+    """
+    A class representing a batch of rectangles drawn with a single instruction.
+
+    The rectangles (quads) in a batch are given by the arrays of their centers and sizes,
+    using :meth:`set_quads`.  Alternatively, :meth:`set_objects` copies the position and
+    size of a list of :class:`GRectangle` objects (such as :class:`GImage` or
+    :class:`GSprite` objects).  The vertex data is rebuilt every time one of these methods
+    is called, so they should be called once per animation frame before drawing.
+
+    Every quad in a batch is drawn with the same texture and the same ``fillcolor``.  If
+    the texture is None, the quads are solid rectangles.  Each quad may use a different
+    region of the texture, so images in the same texture atlas (see
+    :meth:`GameApp.build_atlas`) can share a batch.
+
+    The attributes ``x``, ``y``, ``angle`` and ``scale`` of the batch transform all of
+    the quads at once.  The transforms of the individual objects passed to
+    :meth:`set_objects` are ignored, except for their position and size.  In particular,
+    rotated objects are drawn unrotated.
+
+    A single batch can hold at most :attr:`MAX_QUADS` quads.
+    """
+    # The most quads in a batch (OpenGL ES 2 allows at most 65535 indices)
+    MAX_QUADS = 65535//6
+
+    # MUTABLE PROPERTIES
+    @property
+    def texture(self):
+        """
+        The texture shared by the quads in this batch.
+
+        If the texture is a region of a larger texture (such as an atlas), the batch
+        can draw any region of the larger texture.
+
+        **invariant**. Value is a Kivy ``Texture`` or None.
+        """
+        return self._texture
+
+    @texture.setter
+    def texture(self,value):
+        self._texture = value
+        if self._mesh:
+            self._mesh.texture = value
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def count(self):
+        """
+        The number of quads in this batch.
+
+        **invariant**. Value is an int >= 0.
+        """
+        return self._count
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty sprite batch.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes. For example, to make a
+        batch for images in the texture of ``alien1.png``, use the constructor::
+
+            GSpriteBatch(source='alien1.png')
+
+        This class supports the all same keywords as :class:`GObject`, plus the keywords
+        ``source`` (an image file whose texture is used by the batch) and ``texture``.
+        If neither is given, the batch takes the texture of the first object passed to
+        :meth:`set_objects`.  The ``fillcolor`` tints the quads, and defaults to white.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._mesh = None
+        self._count = 0
+        self._vertices = np.zeros(0,dtype=np.float32)
+        self._indices = np.zeros(0,dtype=np.uint16)
+        if 'source' in keywords:
+            assert GameApp.is_image(keywords['source']), '%s is not an image file' % repr(keywords['source'])
+            self.texture = GameApp.load_texture(keywords['source'])
+        else:
+            self.texture = keywords['texture'] if 'texture' in keywords else None
+        GObject.__init__(self,**keywords)
+        self._reset()
+        self._defined = True
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,center=(%s,%s),count=%s]' % (s,repr(self.x),repr(self.y),repr(self.count))
+
+
+    # PUBLIC METHODS
+    def clear(self):
+        """
+        Removes every quad from this batch.
+        """
+        self.set_quads((),(),0,0)
+
+    def set_quads(self,x,y,width,height,coords=None):
+        """
+        Replaces the quads in this batch.
+
+        The values ``x`` and ``y`` are the centers of the quads.  The values ``width``
+        and ``height`` may be single numbers (shared by every quad) or one number per
+        quad.  The value ``coords`` gives the texture coordinates of each quad, as the
+        8 numbers of a Kivy ``tex_coords`` (bottom left, bottom right, top right and
+        top left).  It may be a single list of 8 numbers (shared by every quad), one
+        list per quad, or None to use the whole texture.
+
+        :param x: the horizontal centers of the quads
+        :type x:  sequence of ``int`` or ``float``
+
+        :param y: the vertical centers of the quads
+        :type y:  sequence of ``int`` or ``float`` (same length as ``x``)
+
+        :param width: the widths of the quads
+        :type width:  ``int``, ``float`` or a sequence of them
+
+        :param height: the heights of the quads
+        :type height:  ``int``, ``float`` or a sequence of them
+
+        :param coords: the texture coordinates of the quads
+        :type coords:  sequence of 8 numbers, a sequence of these, or None
+        """
+        x = np.asarray(x,dtype=np.float32).reshape(-1)
+        y = np.asarray(y,dtype=np.float32).reshape(-1)
+        count = len(x)
+        assert len(y) == count, 'x and y have different lengths'
+        assert count <= self.MAX_QUADS, '%s quads is too many for one batch' % count
+
+        if coords is None:
+            coords = self.texture.tex_coords if self.texture else (0,0,1,0,1,1,0,1)
+        coords = np.asarray(coords,dtype=np.float32).reshape(-1,4,2)
+
+        w = np.asarray(width,dtype=np.float32)/2.0
+        h = np.asarray(height,dtype=np.float32)/2.0
+        vertices = np.empty((count,4,4),dtype=np.float32)
+        vertices[:,0,0] = x-w
+        vertices[:,0,1] = y-h
+        vertices[:,1,0] = x+w
+        vertices[:,1,1] = y-h
+        vertices[:,2,0] = x+w
+        vertices[:,2,1] = y+h
+        vertices[:,3,0] = x-w
+        vertices[:,3,1] = y+h
+        vertices[:,:,2:] = coords
+
+        if count != self._count:
+            base = np.arange(count,dtype=np.uint16)*4
+            self._indices = (base[:,None]+np.array([0,1,2,2,3,0],dtype=np.uint16)).reshape(-1)
+            self._mesh.indices = self._indices
+        self._vertices = vertices.reshape(-1)
+        self._mesh.vertices = self._vertices
+        self._count = count
+
+    def set_objects(self,objects):
+        """
+        Replaces the quads in this batch with the given objects.
+
+        Each quad has the position and size of the corresponding object.  If the object
+        has a texture (like a :class:`GImage` or :class:`GSprite`), the quad uses the same
+        texture region.  These textures must all be regions of the texture of this batch.
+        If the batch does not have a texture yet, it uses the texture of the first object.
+
+        :param objects: the objects to copy
+        :type objects:  sequence of :class:`GRectangle`
+        """
+        count = len(objects)
+        x = np.empty(count,dtype=np.float32)
+        y = np.empty(count,dtype=np.float32)
+        w = np.empty(count,dtype=np.float32)
+        h = np.empty(count,dtype=np.float32)
+        coords = None
+        for pos in range(count):
+            obj = objects[pos]
+            x[pos] = obj.x
+            y[pos] = obj.y
+            w[pos] = obj.width
+            h[pos] = obj.height
+            texture = getattr(obj,'_texture',None)
+            if texture is None:
+                continue
+            if self.texture is None:
+                self.texture = texture
+            assert texture.id == self.texture.id, \
+                '%s does not share the texture of this batch' % repr(obj)
+            if coords is None:
+                coords = np.empty((count,8),dtype=np.float32)
+                coords[:] = self.texture.tex_coords
+            coords[pos] = texture.tex_coords
+        self.set_quads(x,y,w,h,coords)
+
+
+    # HIDDEN METHODS
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        self._mesh = Mesh(vertices=self._vertices,indices=self._indices,
+                          mode='triangles',texture=self.texture)
+        if not self._fillcolor is None:
+            self._cache.add(self._fillcolor)
+        else:
+            self._cache.add(Color(1,1,1))
+        self._cache.add(self._mesh)
+        self._cache.add(PopMatrix())
@@ -0,0 +1,551 @@
+"""
+The geometry shared by the graphics objects of every backend.
+
+This module provides :class:`Shape`, the base class of both the Kivy :class:`GObject`
+and the headless one.  A shape has a position, a size, a scale and an angle, and this
+class computes everything that depends only on them: the edges, the bounding box,
+containment, intersection and the local coordinates of a point.  It does not import
+Kivy, and it never draws anything.
+
+A shape keeps its position, angle and scale in three transform objects, which are
+made by the subclass.  The Kivy objects use the Kivy instructions ``Translate``,
+``Rotate`` and ``Scale``, so that the values drawn are the values stored.  The headless
+objects use :class:`Transform` in their place.
+"""
+import math
+
+from . import validate
+
+
+def is_num_tuple(t,size):
+    """
+    Checks whether a value is a sequence of numbers.
+
+    If the sequence is not of the given size, it also returns False.
+
+    :return: True if t is a sequence of numbers; False otherwise
+    :rtype:  ``bool``
+
+    :param t: The value to test
+    :type t:  any
+
+    :param size: The size of the sequence
+    :type size:  ``int`` >= 0
+    """
+    try:
+        return len(t) == size and all(type(z) in [int, float] for z in t)
+    except:
+        return False
+
+
+def as_pair(point):
+    """
+    Returns a point as a pair of numbers.
+
+    The point may be any object with the attributes ``x`` and ``y`` (such as a
+    ``Point2`` from either backend), or a pair of numbers.
+
+    :param point: the point to convert
+    :type point:  ``Point2`` or a pair of numbers
+
+    :return: The coordinates of the point
+    :rtype:  ``tuple``
+    """
+    try:
+        point = (point.x,point.y)
+    except AttributeError:
+        pass
+    assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
+    return point
+
+
+class Transform(object):
+    """
+    A plain translation, rotation or scale.
+
+    This class stands in for the Kivy instructions ``Translate``, ``Rotate`` and
+    ``Scale``, using the same attribute names.  It only stores the values.
+    """
+    __slots__ = ('x','y','angle')
+
+    def __init__(self,x=0.0,y=0.0,angle=0.0):
+        """
+        Creates a new transform
+
+        :param x: the horizontal translation or scale
+        :type x:  ``float``
+
+        :param y: the vertical translation or scale
+        :type y:  ``float``
+
+        :param angle: the angle of rotation in degrees
+        :type angle:  ``float``
+        """
+        self.x = x
+        self.y = y
+        self.angle = angle
+
+
+# #mark -
+
+class Shape(object):
+    """
+    The position, size and orientation of a graphics object.
+
+    You should never make a `Shape` directly.  Subclasses must implement the method
+    :meth:`_transforms`, and may implement :meth:`_reset`, which is called after the
+    size changes once the attribute ``_defined`` is True.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def x(self):
+        """
+        The horizontal coordinate of the object center.
+
+        **invariant**: Value must be an ``int`` or ``float``
+        """
+        return self._trans.x
+
+    @x.setter
+    def x(self,value):
+        if validate.STRICT:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self._trans.x = float(value)
+        self._mtrue = False
+        self._aabb = None
+
+    @property
+    def y(self):
+        """
+        The vertical coordinate of the object center.
+
+        **invariant**: Value must be an ``int`` or ``float``
+        """
+        return self._trans.y
+
+    @y.setter
+    def y(self,value):
+        if validate.STRICT:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self._trans.y = float(value)
+        self._mtrue = False
+        self._aabb = None
+
+    @property
+    def width(self):
+        """
+        The horizontal width of this shape.
+
+        Positive values go to the right.
+
+        **invariant**: Value must be an ``int`` or ``float`` > 0
+        """
+        return self._width
+
+    @width.setter
+    def width(self,value):
+        if validate.STRICT:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+            assert value > 0, '%s is not positive' % repr(value)
+        self._width = float(value)
+        self._aabb = None
+        if self._defined:
+            self._reset()
+
+    @property
+    def height(self):
+        """
+        The vertical height of this shape.
+
+        Positive values go up.
+
+        **invariant**: Value must be an ``int`` or ``float`` > 0
+        """
+        return self._height
+
+    @height.setter
+    def height(self,value):
+        if validate.STRICT:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+            assert value > 0, '%s is not positive' % repr(value)
+        self._height = float(value)
+        self._aabb = None
+        if self._defined:
+            self._reset()
+
+    @property
+    def scale(self):
+        """
+        The scaling factor of this shape.
+
+        The scale is a fast way to cause a shape to grow or shrink in size. Essentially,
+        the object will multiple the width and height by the scale.  So a scale less than
+        1 will shrink the object, while a scale greater than 1 will enlarge the object.
+
+        The scale may either be a single number, or a pair of two numbers.  If it is
+        a single number, it will scale the width and height by the same amount. If it is
+        a pair, it will scale the width by the first value, and the height by the second.
+
+        **invariant**: Value must be either a number (``int`` or ``float``) or a pair of numbers.
+        """
+        return (self._scale.x,self._scale.y)
+
+    @scale.setter
+    def scale(self,value):
+        if validate.STRICT:
+            assert type(value) in [int,float] or is_num_tuple(value,2), \
+                    '%s is not a valid scaling factor' % repr(value)
+        if type(value) in [int,float]:
+            self._scale.x = float(value)
+            self._scale.y = float(value)
+        else:
+            self._scale.x = float(value[0])
+            self._scale.y = float(value[1])
+        self._mtrue = False
+        self._rtrue = False
+        self._aabb = None
+
+    @property
+    def angle(self):
+        """
+        The angle of rotation about the center.
+
+        The angle is measured in degrees (not radians) counter-clockwise.
+
+        **invariant**: Value must be an ``int`` or ``float``
+        """
+        return self._rotate.angle
+
+    @angle.setter
+    def angle(self,value):
+        if validate.STRICT:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+        # Same tolerance as numpy.allclose
+        diff = abs(self._rotate.angle-value) <= 1e-8+1e-5*abs(value)
+        self._rotate.angle = float(value)
+        if not diff:
+            self._mtrue = False
+            self._rtrue = False
+            self._aabb = None
+
+    @property
+    def name(self):
+        """
+        The name of this object.
+
+        This value is for debugging purposes only.  If you name an object, the name
+        will appear when you convert the object to a string.  This will allow you to
+        tell which object is which in your watches.
+
+        **invariant**: Value must be a ``str`` or ``None``
+        """
+        return self._name
+
+    @name.setter
+    def name(self,value):
+        assert value is None or type(value) == str, '%s is not a valid name' % repr(value)
+        self._name = value
+
+    # DERIVED PROPERTIES
+    @property
+    def left(self):
+        """
+        The left edge of this shape.
+
+        The value depends on the current angle of rotation. If rotation is 0, it is
+        ``x-width/2``.  Otherwise, it is the left-most value of the bounding box.
+
+        Changing this value will shift the center of the object so that the left
+        edge matches the new value.
+
+        **Warning**: Accessing this value on a rotated object may slow down your framerate.
+
+        **invariant**: Value must be an ``int`` or ``float``.
+        """
+        if self._rotate.angle == 0.0:
+            return self.x-self.width/2.0
+
+        return min(p[0] for p in self._corners())
+
+    @left.setter
+    def left(self,value):
+        if validate.STRICT:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+        diff = value-self.left
+        self.x += diff
+
+    @property
+    def right(self):
+        """
+        The right edge of this shape.
+
+        The value depends on the current angle of rotation. If rotation is 0, it is
+        ``x+width/2``.  Otherwise, it is the right-most value of the bounding box.
+
+        Changing this value will shift the center of the object so that the right
+        edge matches the new value.
+
+        **Warning**: Accessing this value on a rotated object may slow down your framerate.
+
+        **invariant**: Value must be an ``int`` or ``float``.
+        """
+        if self._rotate.angle == 0.0:
+            return self.x+self.width/2.0
+
+        return max(p[0] for p in self._corners())
+
+    @right.setter
+    def right(self,value):
+        if validate.STRICT:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+        diff = value-self.right
+        self.x += diff
+
+    @property
+    def top(self):
+        """
+        The vertical coordinate of the top edge.
+
+        The value depends on the current angle of rotation. If rotation is 0, it is
+        ``y+height/2``.  Otherwise, it is the top-most value of the bounding box.
+
+        Changing this value will shift the center of the object so that the top
+        edge matches the new value.
+
+        **Warning**: Accessing this value on a rotated object may slow down your framerate.
+
+        **invariant**: Value must be an ``int`` or ``float``.
+        """
+        if self._rotate.angle == 0.0:
+            return self.y+self.height/2.0
+
+        return max(p[1] for p in self._corners())
+
+    @top.setter
+    def top(self,value):
+        if validate.STRICT:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+        diff = value-self.top
+        self.y += diff
+
+    @property
+    def bottom(self):
+        """
+        The vertical coordinate of the bottom edge.
+
+        The value depends on the current angle of rotation. If rotation is 0, it is
+        ``y-height/2``.  Otherwise, it is the bottom-most value of the bounding box.
+
+        Changing this value will shift the center of the object so that the bottom
+        edge matches the new value.
+
+        **Warning**: Accessing this value on a rotated object may slow down your framerate.
+
+        **invariant**: Value must be an ``int`` or ``float``.
+        """
+        if self._rotate.angle == 0.0:
+            return self.y-self.height/2.0
+
+        return min(p[1] for p in self._corners())
+
+    @bottom.setter
+    def bottom(self,value):
+        if validate.STRICT:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+        diff = value-self.bottom
+        self.y += diff
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Initializes the position, size, angle and name of this shape.
+
+        The keywords are the attributes of this class.  Other keywords are ignored,
+        so that subclasses can pass all of theirs.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._aabb = None
+        self._mtrue = False
+        self._rtrue = False
+        self._trig = None
+        self._trans, self._rotate, self._scale = self._transforms()
+
+        # Size first (it is immutable in some subclasses)
+        try:
+            self.width  = keywords['width']  if 'width'  in keywords else 1
+            self.height = keywords['height'] if 'height' in keywords else 1
+        except AttributeError:
+            pass
+
+        # Then angle
+        if 'angle' in keywords:
+            self.angle = keywords['angle']
+
+        # Finally, (relative) position
+        if 'x' in keywords:
+            self.x = keywords['x']
+        elif 'left' in keywords:
+            self.left = keywords['left']
+        elif 'right' in keywords:
+            self.right = keywords['right']
+
+        if 'y' in keywords:
+            self.y = keywords['y']
+        elif 'bottom' in keywords:
+            self.bottom = keywords['bottom']
+        elif 'top' in keywords:
+            self.top = keywords['top']
+
+        # Add a name for debugging
+        self.name = keywords['name'] if 'name' in keywords else None
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,center=(%s,%s),width=%s,height=%s,angle=%s]' \
+                % (s,repr(self.x),repr(self.y),repr(self.width),repr(self.height),repr(self.angle))
+
+    def __repr__(self):
+        """
+        :return: An unambiguous string representation of this object.
+        :rtype:  ``str``
+        """
+        return str(self.__class__)+str(self)
+
+    # PUBLIC METHODS
+    def contains(self,point):
+        """
+        Checks whether this shape contains the point
+
+        By default, this method just checks the bounding box of the shape.  As with
+        :meth:`intersects`, the box includes the scale and rotation of the shape.
+
+        **Warning**: Using this method on a rotated or scaled object may slow down your
+        framerate.
+
+        :param point: the point to check
+        :type point: ``Point2`` or a pair of numbers
+
+        :return: True if the shape contains this point
+        :rtype:  ``bool``
+        """
+        px, py = as_pair(point)
+        if self._rotate.angle != 0.0 or self._scale.x != 1.0 or self._scale.y != 1.0:
+            px, py = self._local(px,py)
+            return abs(px) < self.width/2.0 and abs(py) < self.height/2.0
+
+        return abs(px-self.x) < self.width/2.0 and abs(py-self.y) < self.height/2.0
+
+    def intersects(self,other):
+        """
+        Checks whether the bounding box of this shape overlaps that of ``other``
+
+        The bounding boxes are axis-aligned, and include the scale and rotation of
+        each shape, as :meth:`contains` does.  They are cached, and only recomputed
+        after the position, size, scale or angle changes, so this method is much
+        faster than testing the corners of one shape with :meth:`contains`.  Boxes
+        that only share an edge do not overlap.
+
+        :param other: the shape to check
+        :type other: :class:`Shape`
+
+        :return: True if the bounding boxes of the two shapes overlap
+        :rtype:  ``bool``
+        """
+        assert isinstance(other,Shape), '%s is not a GObject' % repr(other)
+        l0, b0, r0, t0 = self._aabb or self._build_aabb()
+        l1, b1, r1, t1 = other._aabb or other._build_aabb()
+        return l0 < r1 and l1 < r0 and b0 < t1 and b1 < t0
+
+    # HIDDEN METHODS
+    def _transforms(self):
+        """
+        Returns the translation, rotation and scale of a new shape.
+
+        The translation must start at the origin, the rotation at angle 0, and the
+        scale at 1 in both directions.
+
+        :return: The transforms as a tuple (translate,rotate,scale)
+        :rtype:  ``tuple``
+        """
+        raise NotImplementedError('%s does not make its transforms' % repr(self.__class__))
+
+    def _reset(self):
+        """
+        Resets the drawing cache (there is none by default).
+        """
+        pass
+
+    def _build_rotation(self):
+        """
+        Builds the (cached) cosine and sine of the angle after a settings change.
+
+        They are only rebuilt when the angle or scale changes, so moving a rotated
+        shape does not recompute them.
+        """
+        r = math.radians(self._rotate.angle)
+        self._trig = (math.cos(r),math.sin(r))
+        self._rtrue = True
+
+    def _local(self,x,y):
+        """
+        Returns the point (x,y) in the unscaled, unrotated frame of this shape.
+
+        :return: The point in local coordinates as a tuple (x,y)
+        :rtype:  ``tuple``
+        """
+        x -= self._trans.x
+        y -= self._trans.y
+        if self._rotate.angle != 0.0:
+            if not self._rtrue:
+                self._build_rotation()
+            c, s = self._trig
+            # Rotate back by the angle
+            x, y = x*c+y*s, y*c-x*s
+        return (x/self._scale.x,y/self._scale.y)
+
+    def _build_aabb(self):
+        """
+        Builds the (cached) axis-aligned bounding box after a settings change.
+
+        :return: The bounding box as a tuple (left,bottom,right,top)
+        :rtype:  ``tuple``
+        """
+        x = self._trans.x
+        y = self._trans.y
+        w = abs(self.width*self._scale.x)/2.0
+        h = abs(self.height*self._scale.y)/2.0
+        if self._rotate.angle != 0.0:
+            if not self._rtrue:
+                self._build_rotation()
+            c = abs(self._trig[0])
+            s = abs(self._trig[1])
+            w, h = w*c+h*s, w*s+h*c
+        self._aabb = (x-w,y-h,x+w,y+h)
+        return self._aabb
+
+    def _corners(self):
+        """
+        Returns the four corners of this shape after rotation and scaling.
+
+        :return: The corners as a list of (x,y) tuples
+        :rtype:  ``list``
+        """
+        if not self._rtrue:
+            self._build_rotation()
+        c, s = self._trig
+        w = self.width*self._scale.x/2.0
+        h = self.height*self._scale.y/2.0
+        x = self._trans.x
+        y = self._trans.y
+        return [(x+dx*c-dy*s,y+dx*s+dy*c) for (dx,dy) in ((-w,-h),(w,-h),(w,h),(-w,h))]
@@ -13,6 +13,9 @@ from kivy.graphics.instructions import *
 from introcs.geom import Point2, Matrix
 import introcs
 
+from .geometry import Shape, is_num_tuple
+from . import validate
+
 def is_color(c):
     """
     Checks whether a value represents a color.
@@ -38,28 +41,6 @@ def is_color(c):
     return type(c) == str and (introcs.is_tkcolor(c) or introcs.is_webcolor(c))
 
 
-def is_num_tuple(t,size):
-    """
-    Checks whether a value is a sequence of numbers.
-
-    If the sequence is not of the given size, it also returns False.
-
-    :return: True if t is a sequence of numbers; False otherwise
-    :rtype:  ``bool``
-
-    :param t: The value to test
-    :type t:  any
-
-    :param size: The size of the sequence
-    :type size:  ``int`` >= 0
-    """
-    try:
-        from functools import reduce
-        return len(t) == size and reduce(lambda x, y: x and y, map(lambda z: type(z) in [int, float], t))
-    except:
-        return False
-
-
 def is_gobject_list(g):
     """
     Checks whether a value is a a sequence of :class:`GObject`
@@ -79,7 +60,7 @@ def is_gobject_list(g):
 
 # #mark -
 
-class GObject(object):
+class GObject(Shape):
     """
     An class representing a basic graphics object.
 
@@ -89,127 +70,12 @@ class GObject(object):
     You should never make a `GObject` directly.  Instead, you should use one of the
     subclasses: :class:`GRectangle`, :class:`GEllipse`, :class:`GImage`, :class:`GLabel`,
     :class:`GTriangle`, :class:`GPolygon`, or :class:`GPath`.
+
+    The position, size, angle and name, and everything computed from them, are
+    inherited from :class:`Shape`.  This class adds the colors and the Kivy drawing.
     """
 
     # MUTABLE PROPERTIES
-    @property
-    def x(self):
-        """
-        The horizontal coordinate of the object center.
-
-        **invariant**: Value must be an ``int`` or ``float``
-        """
-        return self._trans.x
-
-    @x.setter
-    def x(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        self._trans.x = float(value)
-        self._mtrue = False
-
-    @property
-    def y(self):
-        """
-        The vertical coordinate of the object center.
-
-        **invariant**: Value must be an ``int`` or ``float``
-        """
-        return self._trans.y
-
-    @y.setter
-    def y(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        self._trans.y = float(value)
-        self._mtrue = False
-
-    @property
-    def width(self):
-        """
-        The horizontal width of this shape.
-
-        Positive values go to the right.
-
-        **invariant**: Value must be an ``int`` or ``float`` > 0
-        """
-        return self._width
-
-    @width.setter
-    def width(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        assert value > 0, '%s is not positive' % repr(value)
-        self._width = float(value)
-        if self._defined:
-            self._reset()
-
-    @property
-    def height(self):
-        """
-        The vertical height of this shape.
-
-        Positive values go up.
-
-        **invariant**: Value must be an ``int`` or ``float`` > 0
-        """
-        return self._height
-
-    @height.setter
-    def height(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        assert value > 0, '%s is not positive' % repr(value)
-        self._height = float(value)
-        if self._defined:
-            self._reset()
-
-    @property
-    def scale(self):
-        """
-        The scaling factor of this shape.
-
-        The scale is a fast way to cause a shape to grow or shrink in size. Essentially,
-        the object will multiple the width and height by the scale.  So a scale less than
-        1 will shrink the object, while a scale greater than 1 will enlarge the object.
-
-        The scale may either be a single number, or a pair of two numbers.  If it is
-        a single number, it will scale the width and height by the same amount. If it is
-        a pair, it will scale the width by the first value, and the height by the second.
-
-        **invariant**: Value must be either a number (``int`` or ``float``) or a pair of numbers.
-        """
-        return (self._scale.x,self._scale.y)
-
-    @scale.setter
-    def scale(self,value):
-        # Do some checking here
-        assert type(value) in [int,float] or is_num_tuple(value,2), \
-                '%s is not a valid scaling factor' % repr(value)
-        if type(value) in [int,float]:
-            self._scale.x = float(value)
-            self._scale.y = float(value)
-        else:
-            self._scale.x = float(value[0])
-            self._scale.y = float(value[1])
-        self._mtrue = False
-
-    @property
-    def angle(self):
-        """
-        The angle of rotation about the center.
-
-        The angle is measured in degrees (not radians) counter-clockwise.
-
-        **invariant**: Value must be an ``int`` or ``float``
-        """
-        return self._rotate.angle
-
-    @angle.setter
-    def angle(self,value):
-        import numpy as np
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        diff = np.allclose([self._rotate.angle],[value])
-        self._rotate.angle = float(value)
-        if not diff:
-            self._mtrue = False
-
     @property
     def linecolor(self):
         """
@@ -232,7 +98,8 @@ class GObject(object):
     @linecolor.setter
     def linecolor(self,value):
         import introcs
-        assert value is None or is_color(value), '%s is not a valid color' % repr(value)
+        if validate.STRICT:
+            assert value is None or is_color(value), '%s is not a valid color' % repr(value)
         if type(value) in [tuple, list] and len(value) == 3:
             value = list(value)+[1.0]
         elif type(value) in [introcs.RGB, introcs.HSV]:
@@ -270,7 +137,8 @@ class GObject(object):
     @fillcolor.setter
     def fillcolor(self,value):
         import introcs
-        assert value is None or is_color(value), '%s is not a valid color' % repr(value)
+        if validate.STRICT:
+            assert value is None or is_color(value), '%s is not a valid color' % repr(value)
         if type(value) in [tuple, list] and len(value) == 3:
             value = list(value)+[1.0]
         elif type(value) in [introcs.RGB, introcs.HSV]:
@@ -285,148 +153,6 @@ class GObject(object):
         if self._defined:
             self._reset()
 
-    @property
-    def name(self):
-        """
-        The name of this object.
-
-        This value is for debugging purposes only.  If you name an object, the name
-        will appear when you convert the object to a string.  This will allow you to
-        tell which object is which in your watches.
-
-        **invariant**: Value must be a ``str`` or ``None``
-        """
-        return self._name
-
-    @name.setter
-    def name(self,value):
-        assert value is None or type(value) == str, '%s is not a valid name' % repr(value)
-        self._name = value
-
-    # DERIVED PROPERTIES
-    @property
-    def left(self):
-        """
-        The left edge of this shape.
-
-        The value depends on the current angle of rotation. If rotation is 0, it is
-        ``x-width/2``.  Otherwise, it is the left-most value of the bounding box.
-
-        Changing this value will shift the center of the object so that the left
-        edge matches the new value.
-
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-
-        **invariant**: Value must be an ``int`` or ``float``.
-        """
-        if self._rotate.angle == 0.0:
-            return self.x-self.width/2.0
-
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return min(p0,p1,p2,p3)
-
-    @left.setter
-    def left(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        diff = value-self.left
-        self.x += diff
-
-    @property
-    def right(self):
-        """
-        The right edge of this shape.
-
-        The value depends on the current angle of rotation. If rotation is 0, it is
-        ``x+width/2``.  Otherwise, it is the right-most value of the bounding box.
-
-        Changing this value will shift the center of the object so that the right
-        edge matches the new value.
-
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-
-        **invariant**: Value must be an ``int`` or ``float``.
-        """
-        if self._rotate.angle == 0.0:
-            return self.x+self.width/2.0
-
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return max(p0,p1,p2,p3)
-
-    @right.setter
-    def right(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        diff = value-self.right
-        self.x += diff
-
-    @property
-    def top(self):
-        """
-        The vertical coordinate of the top edge.
-
-        The value depends on the current angle of rotation. If rotation is 0, it is
-        ``y+height/2``.  Otherwise, it is the top-most value of the bounding box.
-
-        Changing this value will shift the center of the object so that the top
-        edge matches the new value.
-
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-
-        **invariant**: Value must be an ``int`` or ``float``.
-        """
-        if self._rotate.angle == 0.0:
-            return self.y+self.height/2.0
-
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return max(p0,p1,p2,p3)
-
-    @top.setter
-    def top(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        diff = value-self.top
-        self.y += diff
-
-    @property
-    def bottom(self):
-        """
-        The vertical coordinate of the bottom edge.
-
-
-        The value depends on the current angle of rotation. If rotation is 0, it is
-        ``y-height/2``.  Otherwise, it is the bottom-most value of the bounding box.
-
-        Changing this value will shift the center of the object so that the bottom
-        edge matches the new value.
-
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-
-        **invariant**: Value must be an ``int`` or ``float``.
-        """
-        if self._rotate.angle == 0.0:
-            return self.y-self.height/2.0
-
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return min(p0,p1,p2,p3)
-
-
-    @bottom.setter
-    def bottom(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        diff = value-self.bottom
-        self.y += diff
-
-
     # IMMUTABLE PROPERTIES
     @property
     def matrix(self):
@@ -434,11 +160,12 @@ class GObject(object):
         The transformation matrix for this object
 
         This value is constructed dynamically as needed.  It should only be used
-        internally in this package
+        internally in this package.  Moving the object only updates the translation;
+        the rotation and scale are only recomputed after the angle or scale changes.
 
         **invariant**: Either a :class:`Matrix` or ``None``
         """
-        if not self._mtrue or self._matrix is None:
+        if not self._mtrue:
             self._build_matrix()
         return self._matrix
 
@@ -452,11 +179,10 @@ class GObject(object):
 
         **invariant**: Either a :class:`Matrix` or ``None``
         """
-        if not self._mtrue or self._matrix is None:
+        if not self._mtrue:
             self._build_matrix()
         return self._invrse
 
-
     # BUILT-IN METHODS
     def __init__(self,**keywords):
         """
@@ -478,92 +204,19 @@ class GObject(object):
         :param keywords: dictionary of keyword arguments
         :type keywords:  keys are attribute names
         """
-        # Set the properties.
-        self._defined = False
-
-        # Create the Kivy transforms for position and size
-        self._trans  = Translate(0,0,0)
-        self._rotate = Rotate(angle=0,axis=(0,0,1))
-        self._scale  = Scale(1,1,1)
+        self._matrix = None
+        self._invrse = None
+        self._cache = None
 
-        # Now update these with the keywords; size first
-        try:
-            self.width  = keywords['width']  if 'width'  in keywords else 1
-            self.height = keywords['height'] if 'height' in keywords else 1
-        except:
-            pass
-
-        # Then angle
-        if 'angle' in keywords:
-            self.angle = keywords['angle']
-
-        # Finally, (relative) position
-        if 'x' in keywords:
-            self.x = keywords['x']
-        elif 'left' in keywords:
-            self.left = keywords['left']
-        elif 'right' in keywords:
-            self.right = keywords['right']
-
-        if 'y' in keywords:
-            self.y = keywords['y']
-        elif 'bottom' in keywords:
-            self.bottom = keywords['bottom']
-        elif 'top' in keywords:
-            self.top = keywords['top']
+        # Position, size and name
+        Shape.__init__(self,**keywords)
 
         # Top it off with color
         self.fillcolor = keywords['fillcolor'] if 'fillcolor' in keywords else None
         self.linecolor = keywords['linecolor'] if 'linecolor' in keywords else None
 
-        # Add a name for debugging
-        self.name = keywords['name'] if 'name' in keywords else None
-
-    def __str__(self):
-        """
-        :return: A readable string representation of this object.
-        :rtype:  ``str``
-        """
-        if self.name is None:
-            s = '['
-        else:
-            s = '[name=%s,' % self.name
-        return '%s,center=(%s,%s),width=%s,height=%s,angle=%s]' \
-                % (s,repr(self.x),repr(self.y),repr(self.height),repr(self.width),repr(self.angle))
-
-    def __repr__(self):
-        """
-        :return: An unambiguous string representation of this object.
-        :rtype:  ``str``
-        """
-        return str(self.__class__)+str(self)
-
 
     # PUBLIC METHODS
-    def contains(self,point):
-        """
-        Checks whether this shape contains the point
-
-        By default, this method just checks the bounding box of the shape.
-
-        **Warning**: Using this method on a rotated object may slow down your framerate.
-
-        :param point: the point to check
-        :type point: :class:`Point2` or a pair of numbers
-
-        :return: True if the shape contains this point
-        :rtype:  ``bool``
-        """
-        import numpy as np
-        if isinstance(point,Point2):
-            point = (point.x,point.y)
-        assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
-
-        if self._rotate.angle != 0.0:
-            point = self.matrix.inverse()._transform(point[0],point[1])
-
-        return abs(point[0]-self.x) < self.width/2.0 and abs(point[1]-self.y) < self.height/2.0
-
     def transform(self,point):
         """
         Transforms the point to the local coordinate system
@@ -583,8 +236,8 @@ class GObject(object):
             return self.inverse.transform(point)
         else:
             assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
-            p = self.inverse._transform(point[0],point[2])
-            return Point2(p[0],p[1])
+            px, py, pz = self.inverse._transform(point[0],point[1])
+            return Point2(px,py)
 
     def draw(self, view):
         """
@@ -601,28 +254,65 @@ class GObject(object):
             raise IOError('Cannot draw %s since it was not initialized properly' % repr(self))
 
     # HIDDEN METHODS
+    def _transforms(self):
+        """
+        Returns the Kivy transforms for position, angle and scale.
+
+        :return: The transforms as a tuple (translate,rotate,scale)
+        :rtype:  ``tuple``
+        """
+        return (Translate(0,0,0), Rotate(angle=0,axis=(0,0,1)), Scale(1,1,1))
+
     def _reset(self):
         """
         Resets the drawing cache.
+
+        The cache is emptied in place, so that a view (or scene) that holds it draws
+        the new contents.
         """
-        self._cache = InstructionGroup()
+        if self._cache is None:
+            self._cache = InstructionGroup()
+        else:
+            self._cache.clear()
         self._cache.add(PushMatrix())
         self._cache.add(self._trans)
         self._cache.add(self._rotate)
         self._cache.add(self._scale)
 
-    def _build_matrix(self):
+    def _build_rotation(self):
         """
-        Builds the transform matrices after a settings change.
+        Builds the rotation and scale part of the transform matrices (and its inverse)
+        after a settings change.
+
+        The matrices are made here, and only their translation is updated afterwards.
         """
-        self._matrix = Matrix()
-        self._matrix.translate(self._trans.x,self._trans.y)
+        Shape._build_rotation(self)
+        # Matrix operations premultiply, so build these right to left
+        self._matrix = Matrix.CreateScale(self._scale.x,self._scale.y)
         self._matrix.rotate(self._rotate.angle)
-        self._matrix.scale(self._scale.x,self._scale.y)
-        self._invrse = Matrix()
+        self._invrse = Matrix.CreateRotation(-self._rotate.angle)
         self._invrse.scale(1.0/self._scale.x,1.0/self._scale.y)
-        self._invrse.rotate(-self._rotate.angle)
-        self._invrse.translate(-self._trans.x,-self._trans.y)
+        self._mtrue = False
+
+    def _build_matrix(self):
+        """
+        Builds the transform matrices after a settings change.
+
+        The rotation and scale part of each matrix is only rebuilt when the angle or
+        scale changes.  Otherwise only the translation column of each matrix is
+        written in place, so moving an object makes no new matrices.
+        """
+        if not self._rtrue:
+            self._build_rotation()
+        x = self._trans.x
+        y = self._trans.y
+        # The matrix translates after the rotation and scale, so its column is (x,y)
+        self._matrix._data[0,3] = x
+        self._matrix._data[1,3] = y
+        # The inverse translates first, so its column is (-x,-y) rotated and scaled back
+        c, s = self._trig
+        self._invrse._data[0,3] = -(x*c+y*s)/self._scale.x
+        self._invrse._data[1,3] = -(y*c-x*s)/self._scale.y
         self._mtrue = True
 
 
@@ -757,6 +447,20 @@ class GScene(GObject):
 
 
     # HIDDEN METHODS
+    def _build_aabb(self):
+        """
+        Builds the axis-aligned bounding box of this scene.
+
+        The size of a scene depends on its children, which may move at any time, so
+        this box is never cached.
+
+        :return: The bounding box as a tuple (left,bottom,right,top)
+        :rtype:  ``tuple``
+        """
+        box = GObject._build_aabb(self)
+        self._aabb = None
+        return box
+
     def _reset(self):
         """
         Resets the drawing cache
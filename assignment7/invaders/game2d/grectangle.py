@@ -12,8 +12,11 @@ from kivy.graphics import *
 from kivy.graphics.instructions import *
 from kivy.uix.label import Label
 from kivy.uix.image import Image
+from collections import OrderedDict
 from .gobject import GObject
+from .geometry import as_pair
 from .app import GameApp
+from . import validate
 
 class GRectangle(GObject):
     """
@@ -137,28 +140,19 @@ class GEllipse(GRectangle):
         Checks whether this shape contains the point
         
         This method is better than simple rectangle inclusion.  It checks that the point 
-        is within the proper radius as well.
+        is within the proper radius as well.  The ellipse includes the scale and rotation 
+        of the shape.
         
-        **Warning**: Using this method on a rotated object may slow down your framerate.
+        **Warning**: Using this method on a rotated or scaled object may slow down your 
+        framerate.
         
         :param point: the point to check
-        :type point: :class:`GPoint`` or a pair of numbers
+        :type point: :class:`Point2` or a pair of numbers
         """
-        if isinstance(point,GPoint):
-            point = (point.x,point.y)
-        assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
-        
+        px, py = self._local(*as_pair(point))
         rx = self.width/2.0
         ry = self.height/2.0
-        if self._rotate.angle == 0.0:
-            dx = (point[0]-self.x)*(point[0]-self.x)/(rx*rx)
-            dy = (point[1]-self.y)*(point[1]-self.y)/(ry*ry)
-        else:
-            p = self.matrix.inverse()._transform(point[0],point[1])
-            dx = p[0]*p[0]/(rx*rx)
-            dy = p[1]*p[1]/(ry*ry)
-        
-        return (dx+dy) <= 1.0
+        return (px*px/(rx*rx)+py*py/(ry*ry)) <= 1.0
     
     
     # HIDDEN METHODS
@@ -425,9 +419,11 @@ class GLabel(GRectangle):
     
     @x.setter
     def x(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        if validate.STRICT:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._trans.x = float(value)
         self._mtrue = False
+        self._aabb = None
         self._hanchor = 'center'
         self._ha = value
     
@@ -441,9 +437,11 @@ class GLabel(GRectangle):
     
     @y.setter
     def y(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        if validate.STRICT:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._trans.y = float(value)
         self._mtrue = False
+        self._aabb = None
         self._vanchor = 'center'
         self._hv = value
     
@@ -465,15 +463,12 @@ class GLabel(GRectangle):
         if self._rotate.angle == 0.0:
             return self.x-self.width/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return min(p0,p1,p2,p3)
+        return min(p[0] for p in self._corners())
     
     @left.setter
     def left(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        if validate.STRICT:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         diff = value-self.left
         self.x += diff
         self._hanchor = 'left'
@@ -497,15 +492,12 @@ class GLabel(GRectangle):
         if self._rotate.angle == 0.0:
             return self.x+self.width/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return max(p0,p1,p2,p3)
+        return max(p[0] for p in self._corners())
     
     @right.setter
     def right(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        if validate.STRICT:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         diff = value-self.right
         self.x += diff
         self._hanchor = 'right'
@@ -529,15 +521,12 @@ class GLabel(GRectangle):
         if self._rotate.angle == 0.0:
             return self.y+self.height/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return max(p0,p1,p2,p3)
+        return max(p[1] for p in self._corners())
     
     @top.setter
     def top(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        if validate.STRICT:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         diff = value-self.top
         self.y += diff
         self._vanchor = 'top'
@@ -560,16 +549,13 @@ class GLabel(GRectangle):
         if self._rotate.angle == 0.0:
             return self.y-self.height/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return min(p0,p1,p2,p3)
+        return min(p[1] for p in self._corners())
     
     
     @bottom.setter
     def bottom(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        if validate.STRICT:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         diff = value-self.bottom
         self.y += diff
         self._vanchor = 'bottom'
@@ -661,6 +647,8 @@ class GLabel(GRectangle):
             self._trans.y = self._hv-self.height/2.0
         elif self._vanchor == 'bottom':
             self._trans.y = self._hv+self.height/2.0
+        self._mtrue = False
+        self._aabb = None
         
         # Reset the label anchor.
         if self.halign == 'left':
@@ -691,3 +679,241 @@ class GLabel(GRectangle):
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
+
+
+# #mark -
+class GText(GRectangle):
+    """
+    A class representing a lightweight, single-style text label.
+    
+    This class is a faster alternative to :class:`GLabel` for text that is redrawn every
+    frame but rarely changes, such as a score display.  A :class:`GLabel` wraps a Kivy 
+    widget, and creating one (or changing its text) rasterizes a new texture.  A 
+    ``GText`` instead draws a single textured rectangle, and looks up the texture in the
+    class-wide cache :attr:`TEXTURE_CACHE`, keyed by the text, font name, font size and
+    boldness.  Assigning the same text again does nothing at all, and switching back to
+    a string that was displayed earlier reuses the old texture.  Once the cache holds
+    :attr:`CACHE_LIMIT` textures, the least recently used texture is dropped.
+    
+    The text is always centered on (x,y), and the `width` and `height` of this label 
+    are those of the text.  As with :class:`GLabel`, the `linecolor` is the color of the
+    text and the `fillcolor` (if any) is the background color.
+    """
+    # Class attribute for sharing rendered text (to avoid re-rasterizing), least
+    # recently used first
+    TEXTURE_CACHE = OrderedDict()
+    # The most textures to cache
+    CACHE_LIMIT = 256
+    
+    # MUTABLE PROPERTIES
+    @property
+    def text(self):
+        """
+        The text for this label.
+        
+        **Invariant**: Must be a string"""
+        return self._text
+    
+    @text.setter
+    def text(self,value):
+        assert type(value) == str, 'value %s is not a string' % repr(value)
+        if value == self._text:
+            return
+        self._text = value
+        if self._defined:
+            self._retexture()
+    
+    @property
+    def font_size(self):
+        """
+        The size of the text font in points.
+        
+        **Invariant**: Must be a positive number (int or float)"""
+        return self._fsize
+    
+    @font_size.setter
+    def font_size(self,value):
+        assert type(value) in [int,float] and value > 0, 'value %s is not a valid size' % repr(value)
+        self._fsize = value
+        if self._defined:
+            self._retexture()
+    
+    @property
+    def font_name(self):
+        """
+        The file name for the .ttf file to use as a font
+        
+        If this value is None, the default Kivy font is used.
+        
+        **Invariant**: Must be None or a string referring to a .ttf file in folder Fonts"""
+        return self._fname
+    
+    @font_name.setter
+    def font_name(self,value):
+        assert value is None or GameApp.is_font(value), 'value %s is not a font name' % repr(value)
+        self._fname = value
+        if self._defined:
+            self._retexture()
+    
+    @property
+    def bold(self):
+        """
+        A boolean indicating whether or not the text should be bold.
+        
+        This value only works on the default Kivy font.
+        
+        **Invariant**: Must be a boolean"""
+        return self._bold
+    
+    @bold.setter
+    def bold(self,value):
+        assert type(value) == bool, repr(value)+' is not a bool'
+        self._bold = value
+        if self._defined:
+            self._retexture()
+    
+    
+    # CLASS METHODS
+    @classmethod
+    def render(cls,text,font_name=None,font_size=15,bold=False):
+        """
+        Returns: The texture for the given text, rasterizing it only if necessary
+        
+        :param text: The text to render
+        :type text:  ``str``
+        
+        :param font_name: The .ttf file for the font, or None for the default font
+        :type font_name:  ``str`` or None
+        
+        :param font_size: The font size in points
+        :type font_size:  ``int`` or ``float``
+        
+        :param bold: Whether the text is bold
+        :type bold:  ``bool``
+        """
+        key = (text,font_name,font_size,bold)
+        if key in cls.TEXTURE_CACHE:
+            cls.TEXTURE_CACHE.move_to_end(key)
+            return cls.TEXTURE_CACHE[key]
+        
+        from kivy.core.text import Label as CoreLabel
+        settings = {'text':text, 'font_size':font_size, 'bold':bold}
+        if not font_name is None:
+            settings['font_name'] = font_name
+        label = CoreLabel(**settings)
+        label.refresh()
+        
+        while len(cls.TEXTURE_CACHE) >= cls.CACHE_LIMIT:
+            cls.TEXTURE_CACHE.popitem(last=False)
+        cls.TEXTURE_CACHE[key] = label.texture
+        return label.texture
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new text label.
+        
+        To use the constructor for this class, you should provide it with a list of 
+        keyword arguments that initialize various attributes.  For example, to create a 
+        label containing the word 'Hello', use the constructor call::
+            
+            GText(text='Hello',font_name='Arcade.ttf',font_size=50)
+        
+        This class supports the all same keywords as :class:`GRectangle`, as well as 
+        ``text``, ``font_name``, ``font_size`` and ``bold``.
+        """
+        self._defined = False
+        self._text  = ''
+        self._fsize = 15
+        self._fname = None
+        self._bold  = False
+        self._bounds = None
+        self._fill   = None
+        self._line   = None
+        self._texture = None
+        
+        self.text = keywords['text'] if 'text' in keywords else ''
+        self.font_size = keywords['font_size'] if 'font_size' in keywords else 15
+        self.font_name = keywords['font_name'] if 'font_name' in keywords else None
+        self.bold = keywords['bold'] if 'bold' in keywords else False
+        if not 'linecolor' in keywords:
+            keywords = dict(keywords)
+            keywords['linecolor'] = (0,0,0,1)
+        GRectangle.__init__(self,**keywords)
+    
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,text=%s,center=(%s,%s),angle=%s]' \
+                % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
+    
+    
+    # HIDDEN METHODS
+    def _resize(self):
+        """
+        Looks up the texture for the current text and resizes this label to fit it.
+        """
+        self._texture = GText.render(self._text,self._fname,self._fsize,self._bold)
+        if self._texture is None:
+            size = (1,1)
+        else:
+            size = (max(self._texture.width,1),max(self._texture.height,1))
+        
+        defined = self._defined
+        self._defined = False
+        self.width  = size[0]
+        self.height = size[1]
+        self._defined = defined
+    
+    def _retexture(self):
+        """
+        Updates the existing drawing cache in place after the text changes.
+        """
+        self._resize()
+        x = -self.width/2.0
+        y = -self.height/2.0
+        self._bounds.texture = self._texture
+        self._bounds.pos  = (x,y)
+        self._bounds.size = (self.width,self.height)
+        if not self._fill is None:
+            self._fill.pos  = (x,y)
+            self._fill.size = (self.width,self.height)
+        if not self._line is None:
+            self._line.rectangle = (x,y,self.width,self.height)
+    
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        self._resize()
+        GObject._reset(self)
+        x = -self.width/2.0
+        y = -self.height/2.0
+        
+        self._fill = None
+        if not self._fillcolor is None:
+            self._fill = Rectangle(pos=(x,y), size=(self.width,self.height))
+            self._cache.add(self._fillcolor)
+            self._cache.add(self._fill)
+        
+        self._bounds = Rectangle(pos=(x,y), size=(self.width,self.height), texture=self._texture)
+        if not self._linecolor is None:
+            self._cache.add(self._linecolor)
+        else:
+            self._cache.add(Color(0,0,0,1))
+        self._cache.add(self._bounds)
+        
+        self._line = None
+        if not self._linecolor is None and self.linewidth > 0:
+            self._line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
+            self._cache.add(self._linecolor)
+            self._cache.add(self._line)
+        
+        self._cache.add(PopMatrix())
@@ -13,6 +13,7 @@ from kivy.graphics import *
 from kivy.graphics.instructions import *
 from .grectangle import GRectangle, GObject
 from .app import GameApp
+from . import validate
 
 # #mark -
 class GSprite(GRectangle):
@@ -33,7 +34,13 @@ class GSprite(GRectangle):
     
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
+    
+    The frames of a filmstrip are only sliced once per process.  The texture regions are
+    stored in the class attribute :attr:`FRAME_CACHE`, keyed by source file and grid size,
+    and are shared by every sprite that uses the same filmstrip.
     """
+    # Class attribute for sharing sliced frames (to reduce memory footprint)
+    FRAME_CACHE = {}
     
     # MUTABLE PROPERTIES
     @property
@@ -72,8 +79,9 @@ class GSprite(GRectangle):
     
     @frame.setter
     def frame(self,value):
-        assert type(value) == int, '%s is not an int' % repr(value)
-        assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
+        if validate.STRICT:
+            assert type(value) == int, '%s is not an int' % repr(value)
+            assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
         self._frame = value
         if self._bounds:
             self._texture = self._images[self._frame]
@@ -103,7 +111,7 @@ class GSprite(GRectangle):
         self.source  = keywords['source'] if 'source' in keywords else None
         self._setFormat(keywords['format'] if 'format' in keywords else (1,1))
         self._frame  = 0
-        self._images = [None]*self.count
+        self._images = None
         self._bounds = None
         self._texture = None
         GRectangle.__init__(self,**keywords)
@@ -130,21 +138,7 @@ class GSprite(GRectangle):
         x = -self.width/2.0
         y = -self.height/2.0
         
-        texture = GameApp.load_texture(self.source)
-        if texture:
-            width  = texture.width/self._format[1]
-            height = texture.height/self._format[0]
-            
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += width
-        else:
-            print('Failed to load',repr(self.source))
-        
+        self._images = GSprite._slice(self.source,self._format)
         self._texture = self._images[self._frame]
         self._bounds = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
         if not self._fillcolor is None:
@@ -159,4 +153,42 @@ class GSprite(GRectangle):
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
-
+    
+    @classmethod
+    def _slice(cls,source,format):
+        """
+        Returns: The tuple of frames for the given filmstrip, slicing it if necessary
+        
+        The frames are cached in :attr:`FRAME_CACHE`.  If the texture cannot be loaded,
+        the result is a tuple of None values, and it is not cached.
+        
+        Parameter source: The source file for the filmstrip
+        Precondition: source is a string refering to a valid file
+        
+        Parameter format: The filmstrip grid size
+        Precondition: format is a 2-element tuple of ints > 0
+        """
+        key = (source,format)
+        if key in cls.FRAME_CACHE:
+            return cls.FRAME_CACHE[key]
+        
+        texture = GameApp.load_texture(source)
+        if not texture:
+            print('Failed to load',repr(source))
+            return (None,)*(format[0]*format[1])
+        
+        images = [None]*(format[0]*format[1])
+        width  = texture.width/format[1]
+        height = texture.height/format[0]
+        
+        ty = 0
+        for row in range(format[0]):
+            tx = 0
+            for col in range(format[1]):
+                images[row*format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
+                tx += width
+            ty += width
+        
+        images = tuple(images)
+        cls.FRAME_CACHE[key] = images
+        return images
@@ -13,11 +13,12 @@ from kivy.graphics import *
 from kivy.graphics.instructions import *
 from kivy.uix.floatlayout import FloatLayout
 from kivy.metrics import dp
-
 from introcs.geom import Point2
 
+from .inputstate import InputState
+
 
-class GInput(object):
+class GInput(InputState):
     """
     A class representing an input handler
 
@@ -25,106 +26,26 @@ class GInput(object):
     to the user.  To access mouse information, simply access the attribute ``touch``.
     To access keyboard information, use the method :meth:`is_key_down`.
 
+    The handler also keeps every key and touch event (with the time it happened) that 
+    arrives between two frames.  At the start of each frame, these events are turned 
+    into the sets :attr:`pressed_this_frame` and :attr:`released_this_frame`.  Use them 
+    to react to a key press once, instead of comparing :attr:`key_count` with that of 
+    the last frame.  A tap that is shorter than a frame is in both sets, even though 
+    :meth:`is_key_down` never sees it.
+
+    The input of every frame may be recorded with :meth:`start_recording`, and a 
+    recording may be played back in place of the keyboard and mouse with :meth:`play`
+    (see module :mod:`recording`).
+
+    The state, the events and the recordings are all kept by :class:`InputState`; this 
+    class only hooks it up to the Kivy keyboard and mouse.
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly hook it up to the keyboard and mouse.  Instead,
     you should only use the one provided in the `input` attribute of :class:`GameApp`.
     See the documentation of that class for more information.
     """
 
-    # MUTABLE ATTRIBUTES
-    @property
-    def touch_enabled(self):
-        """
-        Whether the touch (mouse) interface is currently enabled.
-
-        Setting this value to False will disable all mouse clicks or drags. The value is
-        True by default.
-
-        **Invariant**: Must be a bool
-        """
-        return self._touch_enabled
-
-    @touch_enabled.setter
-    def touch_enabled(self,value):
-        assert type(value) == bool, 'value %s is not a bool' % repr(value)
-        if value and not self._touch_enabled:
-            self._enable_touch()
-        elif not value and self._touch_enabled:
-            self._disable_touch()
-        self._touch_enabled = value
-
-    @property
-    def keyboard_enabled(self):
-        """
-        Whether the keyboard interface is currently enabled.
-
-        Setting this value to False will disable all key presses. The value is
-        True by default.
-
-        **Invariant**: Must be a bool
-        """
-        return self._keyboard_enabled
-
-    @keyboard_enabled.setter
-    def keyboard_enabled(self,value):
-        assert type(value) == bool, 'value %s is not a bool' % repr(value)
-        if value and not self._keyboard_enabled:
-            self._enable_keyboard()
-        elif not value and self._keyboard_enabled:
-            self._disable_keyboard()
-        self._keyboard_enabled = value
-
-
-    # IMMUTABLE ATTRIBUTES
-    @property
-    def touch(self):
-        """
-        The current (x,y) coordinate of the mouse, if pressed.
-
-        This method only returns coordinates if the mouse button is pressed. If the mouse
-        button is not pressed it returns None. The origin (0,0) corresponds to the bottom
-        left corner of the application window.
-
-        There is currently no way to get the location of the mouse when the button is not
-        pressed.  This a limitation of Kivy.
-
-        **Immutable**: This value cannot be altered.
-
-        **Invariant**: Must be either a :class:`Point2` or None (if there is no touch).
-        """
-        if self._touch is None:
-            return None
-
-        return Point2(self._touch.x/dp(1),self._touch.y/dp(1))
-
-    @property
-    def key_count(self):
-        """
-        The number of keys currently held down.
-
-        This attribute is a quick way to check whether the user has pressed any keys.
-
-        **Immutable**: This value cannot be altered.
-
-        **Invariant**: Must be an int > 0."""
-        return self._keycount
-
-    @property
-    def keys(self):
-        """
-        The list of keys that are currently held down.
-
-        Using this attribute is much slower than the method :meth:`is_key_down`.  You
-        should use that method when you want to test a specific key. This attribute is
-        primarily for debugging.
-
-        **Immutable**: This value cannot be altered.
-
-        **Invariant**: Must be a list of strings (possibly empty)
-        """
-        return tuple(k for (k,v) in self._keystate.items() if v)
-
-
     # BUILT-IN METHODS
     def __init__(self):
         """
@@ -135,58 +56,18 @@ class GInput(object):
         methods.  You should only use  use the object provided in the ``input`` attribute
         of :class:`GameApp`. See the documentation of that class for more information.
         """
+        InputState.__init__(self)
         self._view  = None
-        self._touch = None
         self._keyboard = None
 
-        self._touch_enabled = True
-        self._keyboard_enabled = True
-
-        self._keystate = {}
-        self._keycount = 0
-
-
-    # PUBLIC METHODS
-    def is_key_down(self,key):
-        """
-        Checks wether the key is currently held down.
-
-        The key is a string describing the key pressed.  For example, to determine
-        whether the right-arrow key is pressed, use the method call::
-
-            input.is_key_down('right')
-
-        Similarly the method call::
-
-            input.is_key_down('w')
-
-        will indicate whether the W key is pressed.
-
-        For a complete list of key names, see the
-        `Kivy documentation <http://kivy.org/docs/_modules/kivy/core/window.html>`_.
-
-        :param key: the key to test
-        :type key:  ``str``
 
-        :return: True if ``key`` is currently held down
-        :rtype:  ``bool``
-        """
-        return key in self._keystate and self._keystate[key]
-
-    def is_touch_down(self):
+    # HIDDEN METHODS
+    def _point(self,x,y):
         """
-        Checks wether the mouse is currently held down.
-
-        If this method returns True, the attribute `touch` is guaranteed to not be
-        None.
-
-        :return: True if the mouse is currently held down; False otherwise
-        :rtype:  ``bool``
+        Returns the point (x,y) as a :class:`Point2`
         """
-        return not self._touch is None
-
+        return Point2(x,y)
 
-    # HIDDEN METHODS
     def _register(self,view):
         """
         Registers the view with this input handler; activating it.
@@ -222,7 +103,7 @@ class GInput(object):
         self._view.unbind(on_touch_down=self._capture_touch)
         self._view.unbind(on_touch_move=self._capture_touch)
         self._view.unbind(on_touch_up=self._release_touch)
-        self._touch = None
+        InputState._disable_touch(self)
 
     def _enable_keyboard(self):
         """
@@ -244,8 +125,7 @@ class GInput(object):
         self._keyboard.unbind(on_key_down=self._capture_key)
         self._keyboard.unbind(on_key_up=self._release_key)
         self._keyboard = None
-        self._keystate = {}
-        self._keycount = 0
+        InputState._disable_keyboard(self)
 
     def _capture_key(self, keyboard, keycode, text, modifiers):
         """
@@ -263,11 +143,8 @@ class GInput(object):
         :param modifiers: the modifiers associated with the press
         :type modifiers:  list of key codes
         """
-        k = keycode[1]
-        # Need to handle the case where a release was dropped
-        if not k in self._keystate or not self._keystate[k]:
-            self._keycount += 1
-        self._keystate[k] = True
+        if self._playback is None:
+            self._key_down(keycode[1])
         return True
 
     def _release_key(self, keyboard, keycode):
@@ -280,8 +157,8 @@ class GInput(object):
         :param keycode: the key released as a pair of int (keycode) and a name
         :type keycode:  (``int``, ``str``)
         """
-        self._keystate[keycode[1]] = False
-        self._keycount -= 1
+        if self._playback is None:
+            self._key_up(keycode[1])
         return True
 
     def _capture_touch(self,view,touch):
@@ -294,8 +171,8 @@ class GInput(object):
         :param touch: the information about the mouse press
         :type touch:  ``kivy.input.motionevent.TouchEvent``
         """
-        self._touch = touch
-        #self._touch.grab(self)
+        if self._playback is None:
+            self._touch_down(touch.x/dp(1),touch.y/dp(1))
 
     def _release_touch(self,view,touch):
         """
@@ -307,7 +184,8 @@ class GInput(object):
         :param touch: the information about the mouse release
         :type touch:  ``kivy.input.motionevent.TouchEvent``
         """
-        self._touch = None
+        if self._playback is None:
+            self._touch_up()
 
 
 # #mark -
@@ -319,6 +197,19 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every
     animation frame, as the game is constantly clearing the window.
 
+    If the view is ``retained``, the window is not cleared every frame.  Instead, the
+    game adds an object with :meth:`add` when it appears, and removes it with
+    :meth:`remove` when it disappears.  In between, the object stays on the canvas, and
+    moving it only changes its existing transform.  So the game does not draw anything
+    each frame, and the canvas is only changed for the objects that appear or disappear.
+    An object that is drawn with :meth:`draw` in a retained view is added the first time,
+    and also stays until it is removed.
+
+    The objects in a view are kept in layers, which are drawn from the lowest number to
+    the highest.  Within a layer, the objects are drawn in the order they were added.
+    So a retained game keeps the drawing order of its objects by adding each one to the
+    layer of its kind, no matter when it appears.
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
     only use the one provided in the `view` attribute of :class:`GameApp`.
@@ -340,7 +231,24 @@ class GView(FloatLayout):
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
-        self._contents = set()
+        self._layers = {}
+        self._contents = {}
+        self._retained = False
+
+    # MUTABLE ATTRIBUTES
+    @property
+    def retained(self):
+        """
+        Whether this view keeps its contents from one animation frame to the next.
+
+        **Invariant**: Must be a bool
+        """
+        return self._retained
+
+    @retained.setter
+    def retained(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._retained = value
 
 
     # PUBLIC METHODS
@@ -351,24 +259,79 @@ class GView(FloatLayout):
         You should never call this method, since you do not understand raw Kivy graphics
         commands.  Instead, you should use the `draw` method in :class:`GObject` instead.
 
+        The command is drawn in layer 0.  Drawing a command that is already in the view
+        does nothing.
+
         :param cmd: the command to draw
         :type cmd:  A Kivy graphics command
         """
         if not cmd in self._contents:
-            self._frame.add(cmd)
-            self._contents.add(cmd)
+            self._place(cmd,0)
+
+    def add(self,obj,layer=0):
+        """
+        Adds the given object to a layer of this view.
+
+        The object is drawn on top of the objects already in that layer, and under
+        every object in a higher layer.  It stays in the view until it is removed (or
+        the view is cleared), even if it is not drawn again.  Adding an object that is
+        already in the view does nothing.
+
+        :param obj: the object to add
+        :type obj:  :class:`GObject`
+
+        :param layer: the layer to add it to
+        :type layer:  ``int``
+        """
+        assert type(layer) == int, 'layer %s is not an int' % repr(layer)
+        if not obj._cache in self._contents:
+            self._place(obj._cache,layer)
+
+    def remove(self,obj):
+        """
+        Removes the given object from this view.
+
+        This does nothing if the object is not in the view.
+
+        :param obj: the object to remove
+        :type obj:  :class:`GObject`
+        """
+        group = self._contents.pop(obj._cache,None)
+        if not group is None:
+            group.remove(obj._cache)
 
     def clear(self):
         """
         Clears the contents of the view.
 
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame, unless the view is retained.  That way, you are not drawing images on
+        top of one another.
         """
         self._frame.clear()
+        self._layers.clear()
         self._contents.clear()
 
     # HIDDEN METHODS
+    def _place(self,cmd,layer):
+        """
+        Adds the given command to the top of a layer, making the layer if necessary.
+
+        :param cmd: the command to add
+        :type cmd:  A Kivy graphics command
+
+        :param layer: the layer to add it to
+        :type layer:  ``int``
+        """
+        group = self._layers.get(layer)
+        if group is None:
+            group = InstructionGroup()
+            below = len([other for other in self._layers if other < layer])
+            self._frame.insert(below,group)
+            self._layers[layer] = group
+        group.add(cmd)
+        self._contents[cmd] = group
+
     def _reset(self,obj=None,value=None):
         """
         Resets the view canvas in response to a resizing event
@@ -0,0 +1,1164 @@
+"""
+A headless backend for 2D game support.
+
+This module provides stand-ins for every class in this package that do not use Kivy
+(or any other graphics or audio library).  The drawables keep track of their position,
+size and other attributes, so that game logic such as collision detection works as
+normal, but drawing them does nothing.  Sounds are silent (unless they are mixed by a
+:class:`mixer.Mixer`), and the input handler is controlled by a script instead of the
+keyboard and mouse.
+
+Only the rendering and audio primitives are replaced.  The drawables inherit their
+position, size, containment and bounding boxes from :class:`geometry.Shape`, and the
+input handler inherits its state, events and recordings from
+:class:`inputstate.InputState`, and the game application runs the frame loop of
+:class:`loop.GameLoop`, exactly as the Kivy classes do.
+
+This backend is used in place of the Kivy one when the environment variable
+``GAME2D_HEADLESS`` is set (to anything other than the empty string or ``0``) before
+the package is imported.  This makes it possible to run game logic on machines without
+a display, or to run it much faster than the display clock.
+"""
+import os.path
+
+from .geometry import Shape, Transform, as_pair, is_num_tuple
+from .inputstate import InputState
+from .loop import GameLoop
+from .mixer import get_mixer
+from .recording import InputRecording
+from . import validate
+
+
+class Point2(object):
+    """
+    A minimal 2d point, used in place of the one in ``introcs``.
+    """
+
+    def __init__(self,x=0,y=0):
+        """
+        Creates a new point at (x,y)
+
+        :param x: the horizontal coordinate
+        :type x:  ``int`` or ``float``
+
+        :param y: the vertical coordinate
+        :type y:  ``int`` or ``float``
+        """
+        self.x = x
+        self.y = y
+
+    def __repr__(self):
+        """
+        :return: An unambiguous string representation of this point.
+        :rtype:  ``str``
+        """
+        return 'Point2(%s,%s)' % (repr(self.x),repr(self.y))
+
+
+# #mark -
+
+class GObject(Shape):
+    """
+    A headless version of the basic graphics object.
+
+    This class has the same attributes as the Kivy version, but it never creates any
+    graphics instructions.  Colors are stored exactly as they are given.  The position,
+    size, angle and name are inherited from :class:`Shape`, with a :class:`Transform`
+    in place of each Kivy transform.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def linecolor(self):
+        """
+        The object line color, exactly as it was assigned.
+
+        **invariant**: Value must be ``None`` or a color value.
+        """
+        return self._linecolor
+
+    @linecolor.setter
+    def linecolor(self,value):
+        self._linecolor = value
+
+    @property
+    def fillcolor(self):
+        """
+        The object fill color, exactly as it was assigned.
+
+        **invariant**: Value must be ``None`` or a color value.
+        """
+        return self._fillcolor
+
+    @fillcolor.setter
+    def fillcolor(self,value):
+        self._fillcolor = value
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new GObject.
+
+        This constructor accepts the same keywords as the Kivy version.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        Shape.__init__(self,**keywords)
+        self.fillcolor = keywords['fillcolor'] if 'fillcolor' in keywords else None
+        self.linecolor = keywords['linecolor'] if 'linecolor' in keywords else None
+
+    # PUBLIC METHODS
+    def transform(self,point):
+        """
+        Transforms the point to the local coordinate system
+
+        :param point: the point to transform
+        :type point: :class:`Point2` or a pair of numbers
+
+        :return: The point transformed to local coordinate system
+        :rtype:  :class:`Point2`
+        """
+        p = self._local(*as_pair(point))
+        return Point2(p[0],p[1])
+
+    def draw(self, view):
+        """
+        Draws this shape in the provide view.
+
+        Nothing is rendered; the view simply records the object.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        view.draw(self)
+
+    # HIDDEN METHODS
+    def _transforms(self):
+        """
+        Returns plain transforms for position, angle and scale.
+
+        :return: The transforms as a tuple (translate,rotate,scale)
+        :rtype:  ``tuple``
+        """
+        return (Transform(), Transform(), Transform(1.0,1.0))
+
+
+class GScene(GObject):
+    """
+    A headless version of a scene graph node.
+    """
+
+    @property
+    def children(self):
+        """
+        The list of objects stored in this scene.
+
+        **invariant**: Value must be a list or tuple of :class:`GObject` (possibly empty)
+        """
+        return tuple(self._children)
+
+    @children.setter
+    def children(self,value):
+        assert all(isinstance(z,GObject) for z in value), \
+                '%s is not a list of valid objects' % repr(value)
+        self._children = list(value)
+
+    def __init__(self,**keywords):
+        """
+        Creates a new scene graph node.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.children = keywords['children'] if 'children' in keywords else []
+        GObject.__init__(self,**keywords)
+
+
+class GRectangle(GObject):
+    """
+    A headless version of a (potentially) solid rectangle.
+    """
+
+    @property
+    def linewidth(self):
+        """
+        The width of the exterior line of this shape.
+
+        **invariant**: Value must be an ``int`` or ``float`` >= 0.
+        """
+        return self._linewidth
+
+    @linewidth.setter
+    def linewidth(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        assert value >= 0, '%s is negative' % repr(value)
+        self._linewidth = value
+
+    def __init__(self,**keywords):
+        """
+        Creates a new solid rectangle
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
+        GObject.__init__(self,**keywords)
+
+
+class GEllipse(GRectangle):
+    """
+    A headless version of a solid ellipse.
+    """
+
+    def contains(self,point):
+        """
+        Checks whether this shape contains the point
+
+        :param point: the point to check
+        :type point: :class:`Point2` or a pair of numbers
+        """
+        rx = self.width/2.0
+        ry = self.height/2.0
+        p = self._local(*as_pair(point))
+        return (p[0]*p[0]/(rx*rx)+p[1]*p[1]/(ry*ry)) <= 1.0
+
+
+class GImage(GRectangle):
+    """
+    A headless version of a rectangular image.
+
+    The image file is never loaded, so ``source`` may be any string.
+    """
+
+    @property
+    def source(self):
+        """
+        The source file for this image.
+
+        **invariant**. Value be a string or None.
+        """
+        return self._source
+
+    @source.setter
+    def source(self,value):
+        assert value is None or type(value) == str, '%s is not an image file' % repr(value)
+        self._source = value
+
+    def __init__(self,**keywords):
+        """
+        Creates a new rectangle image.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.source = keywords['source'] if 'source' in keywords else None
+        GRectangle.__init__(self,**keywords)
+
+
+class GLabel(GRectangle):
+    """
+    A headless version of an (uneditable) text label.
+
+    The text is never rendered, so the label keeps whatever size it is given.
+    """
+
+    @property
+    def text(self):
+        """
+        The text for this label.
+
+        **Invariant**: Must be a string"""
+        return self._text
+
+    @text.setter
+    def text(self,value):
+        assert type(value) == str, 'value %s is not a string' % repr(value)
+        self._text = value
+
+    @property
+    def font_size(self):
+        """
+        The size of the text font in points.
+
+        **Invariant**: Must be a positive number (int or float)"""
+        return self._fsize
+
+    @font_size.setter
+    def font_size(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        self._fsize = value
+
+    @property
+    def font_name(self):
+        """
+        The file name for the .ttf file to use as a font
+
+        **Invariant**: Must be a string or None"""
+        return self._fname
+
+    @font_name.setter
+    def font_name(self,value):
+        assert value is None or type(value) == str, 'value %s is not a font name' % repr(value)
+        self._fname = value
+
+    @property
+    def bold(self):
+        """
+        A boolean indicating whether or not the text should be bold.
+
+        **Invariant**: Must be a boolean"""
+        return self._bold
+
+    @bold.setter
+    def bold(self,value):
+        assert type(value) == bool, repr(value)+' is not a bool'
+        self._bold = value
+
+    @property
+    def halign(self):
+        """
+        The horizontal alignment for this label.
+
+        **Invariant**: Must be one of 'left', 'right', or 'center'"""
+        return self._halign
+
+    @halign.setter
+    def halign(self,value):
+        assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
+        self._halign = value
+
+    @property
+    def valign(self):
+        """
+        The vertical alignment for this label.
+
+        **Invariant**: Must be one of 'top', 'bottom', or 'middle'"""
+        return self._valign
+
+    @valign.setter
+    def valign(self,value):
+        assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % repr(value)
+        self._valign = value
+
+    def __init__(self,**keywords):
+        """
+        Creates a new text label.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.text = keywords['text'] if 'text' in keywords else ''
+        self.font_size = keywords['font_size'] if 'font_size' in keywords else 15
+        self.font_name = keywords['font_name'] if 'font_name' in keywords else None
+        self.bold = keywords['bold'] if 'bold' in keywords else False
+        self.halign = keywords['halign'] if 'halign' in keywords else 'center'
+        self.valign = keywords['valign'] if 'valign' in keywords else 'middle'
+        GRectangle.__init__(self,**keywords)
+        if not self.linecolor:
+            self.linecolor = (0,0,0,1)
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,text=%s,center=(%s,%s),angle=%s]' \
+                % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
+
+
+class GText(GLabel):
+    """
+    A headless version of a cached text label.
+
+    Nothing is rasterized, so the texture cache is always empty.
+    """
+    # Class attribute for sharing rendered text (always empty when headless)
+    TEXTURE_CACHE = {}
+    # The most textures to cache
+    CACHE_LIMIT = 256
+
+    @classmethod
+    def render(cls,text,font_name=None,font_size=15,bold=False):
+        """
+        Returns: None, as there are no textures when headless
+        """
+        return None
+
+
+class GSprite(GRectangle):
+    """
+    A headless version of a filmstrip for animating.
+    """
+
+    @property
+    def source(self):
+        """
+        The source file for this image.
+
+        **invariant**. Value is a string or None.
+        """
+        return self._source
+
+    @source.setter
+    def source(self,value):
+        assert value is None or type(value) == str, '%s is not an image file' % repr(value)
+        self._source = value
+
+    @property
+    def count(self):
+        """
+        The number of frames in this filmstrip
+
+        **invariant**. Value is an int > 0.
+        """
+        return self._format[0]*self._format[1]
+
+    @property
+    def frame(self):
+        """
+        The current animation frame of this filmstrip
+
+        **invariant**. Value is an int 0..count-1.
+        """
+        return self._frame
+
+    @frame.setter
+    def frame(self,value):
+        if validate.STRICT:
+            assert type(value) == int, '%s is not an int' % repr(value)
+            assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
+        self._frame = value
+
+    def __init__(self,**keywords):
+        """
+        Creates a new sprite
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.source = keywords['source'] if 'source' in keywords else None
+        value = keywords['format'] if 'format' in keywords else (1,1)
+        assert type(value) == tuple and len(value) == 2, '%s does is not a tuple pair' % repr(value)
+        assert type(value[0]) == int and type(value[1]) == int, '%s does not have int values' % repr(value)
+        assert value[0] > 0 and value[1] > 0, '%s does not have valid values' % repr(value)
+        self._format = value
+        self._frame = 0
+        GRectangle.__init__(self,**keywords)
+        if 'frame' in keywords:
+            self.frame = keywords['frame']
+
+
+class GSpriteBatch(GObject):
+    """
+    A headless version of a batch of rectangles drawn with a single instruction.
+
+    The batch only records the number of quads.
+    """
+    # The most quads in a batch
+    MAX_QUADS = 65535//6
+
+    @property
+    def texture(self):
+        """
+        The texture shared by the quads in this batch (always None when headless).
+        """
+        return None
+
+    @texture.setter
+    def texture(self,value):
+        pass
+
+    @property
+    def count(self):
+        """
+        The number of quads in this batch.
+
+        **invariant**. Value is an int >= 0.
+        """
+        return self._count
+
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty sprite batch.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._count = 0
+        GObject.__init__(self,**keywords)
+
+    def clear(self):
+        """
+        Removes every quad from this batch.
+        """
+        self._count = 0
+
+    def set_quads(self,x,y,width,height,coords=None):
+        """
+        Replaces the quads in this batch.
+
+        :param x: the horizontal centers of the quads
+        :type x:  sequence of ``int`` or ``float``
+
+        :param y: the vertical centers of the quads
+        :type y:  sequence of ``int`` or ``float`` (same length as ``x``)
+        """
+        assert len(x) == len(y), 'x and y have different lengths'
+        assert len(x) <= self.MAX_QUADS, '%s quads is too many for one batch' % len(x)
+        self._count = len(x)
+
+    def set_objects(self,objects):
+        """
+        Replaces the quads in this batch with the given objects.
+
+        :param objects: the objects to copy
+        :type objects:  sequence of :class:`GRectangle`
+        """
+        assert len(objects) <= self.MAX_QUADS, '%s quads is too many for one batch' % len(objects)
+        self._count = len(objects)
+
+
+class GPath(GObject):
+    """
+    A headless version of a path (a sequence of line segments).
+    """
+
+    @property
+    def points(self):
+        """
+        The sequence of points that make up this line.
+
+        **invariant**: Value must be a tuple of numbers of even length.
+        """
+        return self._points
+
+    @points.setter
+    def points(self,value):
+        assert len(value) % 2 == 0 and is_num_tuple(value,len(value)), \
+                '%s is not a valid list of points' % repr(value)
+        self._points = tuple(value)
+
+    @property
+    def linewidth(self):
+        """
+        The width of this path.
+
+        **invariant**: Value must be an ``int`` or ``float`` >= 0.
+        """
+        return self._linewidth
+
+    @linewidth.setter
+    def linewidth(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        assert value >= 0, '%s is negative' % repr(value)
+        self._linewidth = value
+
+    def __init__(self,**keywords):
+        """
+        Creates a new sequence of line segments.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.points = keywords['points'] if 'points' in keywords else (0,0,10,10)
+        self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 1.0
+        GObject.__init__(self,**keywords)
+
+
+class GTriangle(GPath):
+    """
+    A headless version of a solid triangle.
+    """
+    pass
+
+
+class GPolygon(GPath):
+    """
+    A headless version of a solid polygon.
+    """
+    pass
+
+
+# #mark -
+
+class GInput(InputState):
+    """
+    A headless input handler controlled by a script.
+
+    The keys that are held down are set directly with :meth:`press` and :meth:`release`,
+    or all at once with :meth:`set_keys`.  Alternatively, the handler may be given a
+    script: a sequence with one entry per animation frame, where each entry is the
+    collection of key names held down during that frame.  The method :meth:`advance`
+    moves to the next entry.  Once the script runs out, no keys are held down.  The
+    script may also be an :class:`InputRecording`, which is played back with :meth:`play`.
+
+    The state, the events and the recordings are kept by :class:`InputState`, exactly
+    as with the Kivy version; this class only adds the methods that set them.
+    """
+
+    def __init__(self,script=None):
+        """
+        Creates a new input handler
+
+        :param script: the keys held down in each frame, or a recording (optional)
+        :type script:  iterable of collections of ``str``, or :class:`InputRecording`
+        """
+        InputState.__init__(self)
+        self._script = None
+        if isinstance(script,InputRecording):
+            self.play(script)
+        elif not script is None:
+            self._script = iter(script)
+
+    def press(self,key):
+        """
+        Holds down the given key.
+
+        :param key: the key to press
+        :type key:  ``str``
+        """
+        self._key_down(key)
+
+    def release(self,key):
+        """
+        Releases the given key.
+
+        :param key: the key to release
+        :type key:  ``str``
+        """
+        self._key_up(key)
+
+    def set_keys(self,keys):
+        """
+        Sets the keys held down to exactly those in ``keys``.
+
+        :param keys: the keys to hold down
+        :type keys:  collection of ``str``
+        """
+        self._set_keys(keys)
+
+    def set_touch(self,point):
+        """
+        Sets the position of the mouse, or releases it if ``point`` is None.
+
+        :param point: the mouse position
+        :type point:  :class:`Point2`, a pair of numbers, or None
+        """
+        if point is None:
+            self._touch_up()
+        else:
+            self._touch_down(*as_pair(point))
+
+    def advance(self):
+        """
+        Moves the script to the next frame.
+
+        This does nothing if the handler does not have a script.
+
+        :return: False if the script has run out; True otherwise
+        :rtype:  ``bool``
+        """
+        if self._script is None:
+            return True
+        try:
+            self.set_keys(next(self._script))
+            return True
+        except StopIteration:
+            self._script = None
+            self.set_keys(())
+            return False
+
+    def _point(self,x,y):
+        """
+        Returns the point (x,y) as a :class:`Point2`
+        """
+        return Point2(x,y)
+
+
+class GView(object):
+    """
+    A headless drawing window.
+
+    Nothing is rendered.  The view only remembers which objects are on screen, which is
+    useful for checking what a game would display.  As with the Kivy version, a
+    ``retained`` view is not cleared every frame, so an object stays in it from the
+    time it is added until it is removed, and the objects are kept in layers.  The
+    order of :attr:`contents` is the order the Kivy version draws them in.
+    """
+
+    @property
+    def retained(self):
+        """
+        Whether this view keeps its contents from one animation frame to the next.
+
+        **Invariant**: Must be a bool
+        """
+        return self._retained
+
+    @retained.setter
+    def retained(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._retained = value
+
+    @property
+    def contents(self):
+        """
+        The objects currently on screen, from the lowest layer to the highest, and in
+        the order they were added within a layer.
+
+        **Invariant**: Must be a tuple (possibly empty)
+        """
+        return tuple(obj for layer in sorted(self._layers) for obj in self._layers[layer])
+
+    def __init__(self):
+        """
+        Creates a new (empty) headless view
+        """
+        self._layers = {}
+        self._contents = {}
+        self._retained = False
+
+    def draw(self,cmd):
+        """
+        Records that the given object was drawn (in layer 0).
+
+        :param cmd: the object drawn
+        :type cmd:  :class:`GObject`
+        """
+        if not cmd in self._contents:
+            self._place(cmd,0)
+
+    def add(self,obj,layer=0):
+        """
+        Adds the given object to a layer of this view, if it is not there.
+
+        :param obj: the object to add
+        :type obj:  :class:`GObject`
+
+        :param layer: the layer to add it to
+        :type layer:  ``int``
+        """
+        assert type(layer) == int, 'layer %s is not an int' % repr(layer)
+        if not obj in self._contents:
+            self._place(obj,layer)
+
+    def remove(self,obj):
+        """
+        Removes the given object from this view, if it is there.
+
+        :param obj: the object to remove
+        :type obj:  :class:`GObject`
+        """
+        layer = self._contents.pop(obj,None)
+        if not layer is None:
+            del self._layers[layer][obj]
+
+    def clear(self):
+        """
+        Clears the contents of the view.
+        """
+        self._layers.clear()
+        self._contents.clear()
+
+    def _place(self,obj,layer):
+        """
+        Adds the given object to the top of a layer.
+        """
+        self._layers.setdefault(layer,{})[obj] = None
+        self._contents[obj] = layer
+
+
+# #mark -
+
+class Sound(object):
+    """
+    A headless (silent) sound.
+
+    The sound file is never loaded, and playing it does nothing.  The sound bank only
+    records the number of voices of each file.  However, if a mixer is set (see 
+    :func:`mixer.set_mixer`) when a sound is made, the sound is played by the mixer, 
+    exactly as with the Kivy version.
+    """
+    # Class attribute for the number of voices of a sound (if not preloaded)
+    VOICES = 4
+
+    # Class attribute mapping each sound file to its number of voices
+    BANK = {}
+
+    @property
+    def volume(self):
+        """
+        The current sound volume.
+
+        **Invariant**: Must float in the range 0..1.
+        """
+        return self._volume
+
+    @volume.setter
+    def volume(self,value):
+        assert type(value) in [int, float] and value >= 0 and value <= 1, \
+            'value %s is not a valid volume' % repr(value)
+        self._volume = value
+        if not self._mixer is None:
+            for voice in self._active:
+                self._mixer.set_volume(voice,value)
+
+    @property
+    def source(self):
+        """
+        The source file for this sound.
+
+        **Invariant**: Must be a nonempty string.
+        """
+        return self._source
+
+    @property
+    def playing(self):
+        """
+        Whether or not the sound is currently playing (always False without a mixer).
+
+        **Invariant**: Must be a boolean.
+        """
+        if not self._mixer is None:
+            return any(self._mixer.is_playing(voice) for voice in self._active)
+        return False
+
+    @property
+    def voices(self):
+        """
+        The number of voices shared by every sound for this file (or the voice cap of
+        the mixer).
+
+        **Invariant**: Must be an int > 0.
+        """
+        if not self._mixer is None:
+            return self._mixer.voices
+        return Sound.BANK.get(self._source,Sound.VOICES)
+
+    def __init__(self,source):
+        """
+        Creates a new silent sound, or a sound played by the mixer.
+
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
+        """
+        self._mixer = get_mixer()
+        if self._mixer is None:
+            Sound.preload(source)
+        else:
+            self._mixer.load(source)
+        self._source = source
+        self._volume = 1
+        self._active = []
+
+    def play(self,loop=False):
+        """
+        Plays this sound (does nothing without a mixer).
+
+        :param loop: Whether or not to loop the sound
+        :type loop:  ``bool``
+        """
+        if not self._mixer is None:
+            self._active = [v for v in self._active if self._mixer.is_playing(v)]
+            self._active.append(self._mixer.play(self._source,self._volume,loop))
+
+    def stop(self):
+        """
+        Stops this sound (does nothing without a mixer).
+        """
+        if not self._mixer is None:
+            for voice in self._active:
+                self._mixer.stop(voice)
+            self._active = []
+
+    @classmethod
+    def preload(cls,source,voices=None):
+        """
+        Returns: The number of voices for the given sound file, adding it if necessary
+
+        If a mixer is set, the file is decoded by the mixer instead, and this returns the
+        voice cap of the mixer.
+
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
+
+        :param voices: The number of voices (:attr:`VOICES` if None)
+        :type voices:  ``int`` > 0 or None
+        """
+        if source in cls.BANK:
+            return cls.BANK[source]
+        if not get_mixer() is None:
+            get_mixer().load(source)
+            return get_mixer().voices
+        assert type(source) == str and source != '', 'source %s is not a sound file' % repr(source)
+        voices = cls.VOICES if voices is None else voices
+        assert type(voices) == int and voices > 0, '%s is not a valid voice count' % repr(voices)
+        cls.BANK[source] = voices
+        return voices
+
+    @classmethod
+    def unload(cls,source):
+        """
+        Removes the given sound file from the sound bank.
+
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
+        """
+        assert type(source) == str, '%s is not a valid sound name' % repr(source)
+        cls.BANK.pop(source,None)
+
+
+class SoundLibrary(object):
+    """
+    A headless dictionary that maps keys to Sound objects.
+    """
+
+    def __init__(self):
+        """
+        Creates a new, empty sound library.
+        """
+        self._data = {}
+
+    def __len__(self):
+        """
+        :return: The number of sounds in this library.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._data)
+
+    def __getitem__(self, key):
+        """
+        :return: The object for the given sound name.
+        :rtype:  :class:`Sound`
+        """
+        return self._data[key]
+
+    def __setitem__(self, key, filename):
+        """
+        Creates a sound object from the file filename and assigns it the given name.
+        """
+        self._data[key] = Sound(filename)
+
+    def __delitem__(self, key):
+        """
+        Deletes the Sound object for the given sound name.
+        """
+        del self._data[key]
+
+    def __iter__(self):
+        """
+        :return: The iterator for this sound dictionary.
+        :rtype:  ``iterable``
+        """
+        return iter(self._data.keys())
+
+    def keys(self):
+        """
+        :return: The keys for this sound dictionary.
+        :rtype:  ``iterable``
+        """
+        return self._data.keys()
+
+
+# #mark -
+
+class GameApp(GameLoop):
+    """
+    A headless controller class for a simple game application.
+
+    Subclasses override :meth:`start`, :meth:`update` and :meth:`draw` exactly as with
+    the Kivy version.  Instead of opening a window, the method :meth:`run` processes a
+    fixed number of animation frames as fast as possible, each ``1/fps`` seconds long.
+    Every frame runs the same loop as the Kivy version (see :class:`loop.GameLoop`).
+    """
+    # Class attribute for tracking textures (always empty when headless)
+    TEXTURE_CACHE = {}
+
+    # Class attribute for the texture atlas (always None when headless)
+    ATLAS = None
+
+    # Resource folders (set when the application is created)
+    fonts  = None
+    sounds = None
+    images = None
+
+    @property
+    def fps(self):
+        """
+        The number of frames-per-second that the simulation pretends to run at.
+
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._fps
+
+    @fps.setter
+    def fps(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._fps = value
+
+    @classmethod
+    def is_image(cls,name):
+        """
+        Checks if ``name`` refers to an image file in the **Images** folder
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        if type(name) != str or cls.images is None:
+            return False
+        return os.path.exists(os.path.join(cls.images,name))
+
+    @classmethod
+    def is_font(cls,name):
+        """
+        Checks if ``name`` refers to a font file in the **Fonts** folder
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        if type(name) != str or cls.fonts is None:
+            return False
+        return os.path.exists(os.path.join(cls.fonts,name))
+
+    @classmethod
+    def is_sound(cls,name):
+        """
+        Checks if ``name`` refers to a sound file in the **Sounds** folder
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        if type(name) != str or cls.sounds is None:
+            return False
+        return os.path.exists(os.path.join(cls.sounds,name))
+
+    @classmethod
+    def load_texture(cls,name):
+        """
+        Returns: None, as there are no textures when headless
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        return None
+
+    @classmethod
+    def unload_texture(cls,name):
+        """
+        Returns: None, as there are no textures when headless
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        return None
+
+    @classmethod
+    def build_atlas(cls,names=None,width=2048):
+        """
+        Returns: None, as there are no textures to pack when headless
+
+        :param names: The file names to pack (or None)
+        :type names:  ``list`` of ``str`` or None
+
+        :param width: The width of the atlas texture
+        :type width:  ``int`` > 0
+        """
+        return None
+
+    def __init__(self,**keywords):
+        """
+        Creates, but does not start, a new headless game.
+
+        This accepts the same keywords as the Kivy version (including ``retained``,
+        ``atlas``, ``step``, ``max_steps``, ``profile``, ``overlay``, ``async_audio``,
+        ``mixer``, ``record_input`` and ``play_input``), plus the keyword ``script`` which
+        is passed to the :class:`GInput` handler.  The sounds are silent, so
+        ``async_audio`` has no effect, but they may be mixed to a file (or discarded)
+        with ``mixer``: with ``mixer=True``, the mix goes to a :class:`mixer.NullSink`
+        instead of the audio device.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._configure(keywords)
+        self._view = GView()
+        self._view.retained = self._retained
+        self._input = GInput(keywords.pop('script', None))
+        self._start_input()
+        self._started = False
+
+    def run(self,frames=1):
+        """
+        Processes the given number of animation frames.
+
+        The game is started the first time this method is called.  Every frame advances
+        the input script and then calls :meth:`update` and :meth:`draw` with a time step
+        of ``1/fps`` seconds.
+
+        :param frames: the number of frames to process
+        :type frames:  ``int`` >= 0
+        """
+        assert type(frames) == int and frames >= 0, '%s is not a valid frame count' % repr(frames)
+        if not self._started:
+            self._started = True
+            self.start()
+        for _ in range(frames):
+            self._input.advance()
+            self._refresh(1.0/self._fps)
+
+    def stop(self):
+        """
+        Stops the game.
+
+        There is no window to close, so this only writes the profile statistics to a
+        file, if requested, writes the input recording (if any), and closes the mixer
+        (if any).
+        """
+        self._shutdown()
+
+    def start(self):
+        """
+        Initializes the game state, creating a new game.
+        """
+        pass
+
+    def update(self,dt):
+        """
+        Updates the state of the game one animation frame.
+
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        pass
+
+    def draw(self):
+        """
+        Draws the game objects on the (headless) screen.
+        """
+        pass
+
+    def _new_text(self,**keywords):
+        """
+        Returns a new :class:`GText` made with the given keywords.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        return GText(**keywords)
+
+    def _setpaths(self):
+        """
+        Sets the resource paths to the application directory.
+        """
+        import inspect
+        path = os.path.abspath(inspect.getfile(self.__class__))
+        path = os.path.dirname(path)
+        GameApp.fonts  = str(os.path.join(path, 'Fonts'))
+        GameApp.sounds = str(os.path.join(path, 'Sounds'))
+        GameApp.images = str(os.path.join(path, 'Images'))
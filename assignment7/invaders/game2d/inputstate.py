@@ -0,0 +1,534 @@
+"""
+The input state shared by the input handlers of every backend.
+
+This module provides :class:`InputState`, the base class of both the Kivy
+:class:`GInput` and the headless one.  It keeps the keys and the touch that are held
+down, the events that arrive between two frames, and the per-frame sets made from
+them, and it records and plays back :class:`InputRecording` objects.  It does not
+import Kivy.  A backend only has to turn its own events into calls to the hidden
+methods :meth:`InputState._key_down`, :meth:`InputState._key_up`,
+:meth:`InputState._touch_down` and :meth:`InputState._touch_up`.
+
+The touch is kept in game coordinates (not in pixels), so a recording plays back the
+same way on every backend and every display.
+"""
+from time import perf_counter
+
+from .recording import InputRecording
+
+
+class InputState(object):
+    """
+    The keyboard and mouse state of an input handler.
+
+    The handler keeps every key and touch event (with the time it happened) that
+    arrives between two frames.  At the start of each frame, these events are turned
+    into the sets :attr:`pressed_this_frame` and :attr:`released_this_frame`.  Use them
+    to react to a key press once, instead of comparing :attr:`key_count` with that of
+    the last frame.  A tap that is shorter than a frame is in both sets, even though
+    :meth:`is_key_down` never sees it.
+
+    The input of every frame may be recorded with :meth:`start_recording`, and a
+    recording may be played back in place of the keyboard and mouse with :meth:`play`
+    (see module :mod:`recording`).
+
+    You should never make an `InputState` directly.  Subclasses must implement the
+    method :meth:`_point`, and may implement the methods that enable and disable the
+    keyboard and mouse.
+    """
+
+    # MUTABLE ATTRIBUTES
+    @property
+    def touch_enabled(self):
+        """
+        Whether the touch (mouse) interface is currently enabled.
+
+        Setting this value to False will disable all mouse clicks or drags. The value is
+        True by default.
+
+        **Invariant**: Must be a bool
+        """
+        return self._touch_enabled
+
+    @touch_enabled.setter
+    def touch_enabled(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        if value and not self._touch_enabled:
+            self._enable_touch()
+        elif not value and self._touch_enabled:
+            self._disable_touch()
+        self._touch_enabled = value
+
+    @property
+    def keyboard_enabled(self):
+        """
+        Whether the keyboard interface is currently enabled.
+
+        Setting this value to False will disable all key presses. The value is
+        True by default.
+
+        **Invariant**: Must be a bool
+        """
+        return self._keyboard_enabled
+
+    @keyboard_enabled.setter
+    def keyboard_enabled(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        if value and not self._keyboard_enabled:
+            self._enable_keyboard()
+        elif not value and self._keyboard_enabled:
+            self._disable_keyboard()
+        self._keyboard_enabled = value
+
+
+    # IMMUTABLE ATTRIBUTES
+    @property
+    def touch(self):
+        """
+        The current (x,y) coordinate of the mouse, if pressed.
+
+        This method only returns coordinates if the mouse button is pressed. If the mouse
+        button is not pressed it returns None. The origin (0,0) corresponds to the bottom
+        left corner of the application window.
+
+        There is currently no way to get the location of the mouse when the button is not
+        pressed.  This a limitation of Kivy.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be either a ``Point2`` or None (if there is no touch).
+        """
+        if self._touch is None:
+            return None
+
+        return self._point(self._touch[0],self._touch[1])
+
+    @property
+    def key_count(self):
+        """
+        The number of keys currently held down.
+
+        This attribute is a quick way to check whether the user has pressed any keys.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0."""
+        return len(self._keystate)
+
+    @property
+    def keys(self):
+        """
+        The list of keys that are currently held down.
+
+        Using this attribute is much slower than the method :meth:`is_key_down`.  You
+        should use that method when you want to test a specific key. This attribute is
+        primarily for debugging.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a list of strings (possibly empty)
+        """
+        return tuple(self._keystate)
+
+    @property
+    def pressed_this_frame(self):
+        """
+        The keys that were pressed since the last frame.
+
+        A key held down is only pressed once, even if the keyboard repeats it.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a frozenset of strings (possibly empty)
+        """
+        return self._pressed
+
+    @property
+    def released_this_frame(self):
+        """
+        The keys that were released since the last frame.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a frozenset of strings (possibly empty)
+        """
+        return self._released
+
+    @property
+    def touch_pressed_this_frame(self):
+        """
+        Whether the mouse was pressed since the last frame.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a bool
+        """
+        return self._touch_pressed
+
+    @property
+    def touch_released_this_frame(self):
+        """
+        Whether the mouse was released since the last frame.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a bool
+        """
+        return self._touch_released
+
+    @property
+    def events(self):
+        """
+        The events that arrived since the last frame, in order.
+
+        Each event is a tuple ``(time, kind, key)``, where ``time`` is the value of
+        ``time.perf_counter()`` when the event arrived, ``kind`` is one of ``'key_down'``,
+        ``'key_up'``, ``'touch_down'`` and ``'touch_up'``, and ``key`` is the name of the
+        key (or None for a touch event).
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a tuple of event tuples (possibly empty)
+        """
+        return self._frame_events
+
+    @property
+    def recording(self):
+        """
+        The recording that the input of each frame is added to, if any.
+
+        **Immutable**: Use :meth:`start_recording` and :meth:`stop_recording` instead.
+
+        **Invariant**: Must be an :class:`InputRecording` or None
+        """
+        return self._recording
+
+    @property
+    def playing(self):
+        """
+        Whether a recording is being played back.
+
+        While a recording is played back, the keyboard and mouse are ignored.
+
+        **Immutable**: Use :meth:`play` instead.
+
+        **Invariant**: Must be a bool
+        """
+        return not self._playback is None
+
+
+    # BUILT-IN METHODS
+    def __init__(self):
+        """
+        Creates a new input state with no keys or touch held down.
+        """
+        self._touch = None
+        self._lasttouch = None
+        self._touch_enabled = True
+        self._keyboard_enabled = True
+        self._keystate = set()
+
+        self._events = []
+        self._frame_events = ()
+        self._pressed = frozenset()
+        self._released = frozenset()
+        self._touch_pressed = False
+        self._touch_released = False
+
+        self._recording = None
+        self._playback = None
+
+
+    # PUBLIC METHODS
+    def is_key_down(self,key):
+        """
+        Checks wether the key is currently held down.
+
+        The key is a string describing the key pressed.  For example, to determine
+        whether the right-arrow key is pressed, use the method call::
+
+            input.is_key_down('right')
+
+        Similarly the method call::
+
+            input.is_key_down('w')
+
+        will indicate whether the W key is pressed.
+
+        For a complete list of key names, see the
+        `Kivy documentation <http://kivy.org/docs/_modules/kivy/core/window.html>`_.
+
+        :param key: the key to test
+        :type key:  ``str``
+
+        :return: True if ``key`` is currently held down
+        :rtype:  ``bool``
+        """
+        return key in self._keystate
+
+    def is_touch_down(self):
+        """
+        Checks wether the mouse is currently held down.
+
+        If this method returns True, the attribute `touch` is guaranteed to not be
+        None.
+
+        :return: True if the mouse is currently held down; False otherwise
+        :rtype:  ``bool``
+        """
+        return not self._touch is None
+
+    def start_recording(self,recording=None):
+        """
+        Starts adding the input of every frame to a recording.
+
+        :param recording: the recording to add to (a new one if None)
+        :type recording:  :class:`InputRecording` or None
+
+        :return: the recording
+        :rtype:  :class:`InputRecording`
+        """
+        if recording is None:
+            recording = InputRecording()
+        assert isinstance(recording,InputRecording), '%s is not an InputRecording' % repr(recording)
+        self._recording = recording
+        return recording
+
+    def stop_recording(self):
+        """
+        Stops recording the input.
+
+        :return: the recording that was stopped, or None if there was none
+        :rtype:  :class:`InputRecording` or None
+        """
+        recording = self._recording
+        self._recording = None
+        return recording
+
+    def play(self,recording):
+        """
+        Plays back a recording in place of the keyboard and mouse.
+
+        Each frame takes the next frame of the recording.  Once the recording runs out,
+        every key and the mouse are released, and the keyboard and mouse are used again.
+        If ``recording`` is None, any playback is stopped at once.
+
+        :param recording: the recording to play
+        :type recording:  :class:`InputRecording`, any iterable of frames, or None
+        """
+        self._playback = None if recording is None else iter(recording)
+
+
+    # HIDDEN METHODS
+    def _point(self,x,y):
+        """
+        Returns the point (x,y) as the ``Point2`` class of the backend.
+
+        :param x: the horizontal coordinate
+        :type x:  ``float``
+
+        :param y: the vertical coordinate
+        :type y:  ``float``
+        """
+        raise NotImplementedError('%s does not make points' % repr(self.__class__))
+
+    def _enable_touch(self):
+        """
+        Enables touch events for this input handler (nothing by default)
+        """
+        pass
+
+    def _disable_touch(self):
+        """
+        Disables touch events for this input handler, forgetting the touch
+        """
+        self._touch = None
+
+    def _enable_keyboard(self):
+        """
+        Enables keyboard events for this input handler (nothing by default)
+        """
+        pass
+
+    def _disable_keyboard(self):
+        """
+        Disables keyboard events for this input handler, forgetting the keys held down
+        """
+        self._keystate = set()
+
+    def _key_down(self,key,now=None):
+        """
+        Holds down the given key, adding an event if it was not held down already.
+
+        :param key: the key pressed
+        :type key:  ``str``
+
+        :param now: the time of the event (the current time if None)
+        :type now:  ``float`` or None
+        """
+        if self._keyboard_enabled and not key in self._keystate:
+            self._keystate.add(key)
+            self._events.append((perf_counter() if now is None else now,'key_down',key))
+
+    def _key_up(self,key,now=None):
+        """
+        Releases the given key, adding an event if it was held down.
+
+        :param key: the key released
+        :type key:  ``str``
+
+        :param now: the time of the event (the current time if None)
+        :type now:  ``float`` or None
+        """
+        if key in self._keystate:
+            self._keystate.discard(key)
+            self._events.append((perf_counter() if now is None else now,'key_up',key))
+
+    def _set_keys(self,keys,now=None):
+        """
+        Sets the keys held down to exactly those in ``keys``, adding the events.
+
+        :param keys: the keys to hold down
+        :type keys:  collection of ``str``
+
+        :param now: the time of the events (the current time if None)
+        :type now:  ``float`` or None
+        """
+        keys = set(keys) if self._keyboard_enabled else set()
+        if keys != self._keystate:
+            now = perf_counter() if now is None else now
+            for key in sorted(self._keystate-keys):
+                self._events.append((now,'key_up',key))
+            for key in sorted(keys-self._keystate):
+                self._events.append((now,'key_down',key))
+            self._keystate = keys
+
+    def _touch_down(self,x,y,now=None):
+        """
+        Presses (or drags) the mouse at (x,y), adding an event if it was not pressed.
+
+        :param x: the horizontal coordinate in game coordinates
+        :type x:  ``int`` or ``float``
+
+        :param y: the vertical coordinate in game coordinates
+        :type y:  ``int`` or ``float``
+
+        :param now: the time of the event (the current time if None)
+        :type now:  ``float`` or None
+        """
+        if not self._touch_enabled:
+            return
+        if self._touch is None:
+            self._events.append((perf_counter() if now is None else now,'touch_down',None))
+        self._touch = (x,y)
+        self._lasttouch = self._touch
+
+    def _touch_up(self,now=None):
+        """
+        Releases the mouse, adding an event if it was pressed.
+
+        :param now: the time of the event (the current time if None)
+        :type now:  ``float`` or None
+        """
+        if not self._touch is None:
+            self._events.append((perf_counter() if now is None else now,'touch_up',None))
+        self._touch = None
+
+    def _next_frame(self,dt=None):
+        """
+        Returns: the time step for ``update``, after turning the events since the last
+        frame into the sets for this frame.
+
+        This is called by :class:`GameApp` before every call to ``update``.  It takes
+        time in proportion to the number of events, not the number of keys.  If there
+        are several updates in one frame, only the first one sees the events.
+
+        If a recording is played back, its next frame is applied first, and the time step
+        of that frame (if it has one) is returned in place of ``dt``.  If the input is
+        recorded, the frame is added to the recording last, with the time step.
+
+        :param dt: the time step the game would pass to ``update``
+        :type dt:  ``int`` or ``float`` > 0, or None
+        """
+        if not self._playback is None:
+            step = self._play_frame()
+            if not step is None:
+                dt = step
+        events = self._events
+        if events:
+            pressed = set()
+            released = set()
+            self._touch_pressed = self._touch_released = False
+            for (_, kind, key) in events:
+                if kind == 'key_down':
+                    pressed.add(key)
+                elif kind == 'key_up':
+                    released.add(key)
+                elif kind == 'touch_down':
+                    self._touch_pressed = True
+                else:
+                    self._touch_released = True
+            self._frame_events = tuple(events)
+            self._pressed = frozenset(pressed)
+            self._released = frozenset(released)
+            self._events = []
+        elif self._frame_events:
+            self._frame_events = ()
+            self._pressed = self._released = frozenset()
+            self._touch_pressed = self._touch_released = False
+        if not self._recording is None:
+            self._record_frame(dt)
+        return dt
+
+    def _record_frame(self,dt):
+        """
+        Adds the input of this frame to the recording.
+
+        The events of the frame are recorded in order, apart from the keys held down,
+        so that a key released and pressed again (or a tap of the mouse) within the
+        frame is kept.  The touch is the last mouse position of the frame, even if the
+        mouse was released again, so that a tap plays back at the same place.
+
+        :param dt: the time step the game passes to ``update``
+        :type dt:  ``int`` or ``float`` > 0, or None
+        """
+        events = tuple((kind,key) for (_, kind, key) in self._frame_events)
+        touch = self._touch
+        if touch is None and (self._touch_pressed or self._touch_released):
+            touch = self._lasttouch
+        self._recording.append(frozenset(self._keystate),events,touch,dt)
+
+    def _play_frame(self):
+        """
+        Returns: the time step of the next frame of the recording being played, after
+        setting the keys and the mouse to that frame.
+
+        The events of the frame happen first, in order, as if they came from the keyboard
+        and mouse.  Then the keys held down and the mouse are set to those of the frame,
+        adding any events that this takes (only a frame made by hand needs them).  The
+        time step is None if the frame does not have one, or the recording ran out.
+        """
+        try:
+            held, events, touch, dt = next(self._playback)
+        except StopIteration:
+            self._playback = None
+            held, events, touch, dt = (), (), None, None
+        now = perf_counter()
+        down = not touch is None
+        for kind, key in events:
+            if kind == 'key_down':
+                self._key_down(key,now)
+            elif kind == 'key_up':
+                self._key_up(key,now)
+            elif kind == 'touch_down':
+                self._touch_down(touch[0],touch[1],now)
+                down = True
+            else:
+                self._touch_up(now)
+                down = False
+        self._set_keys(held,now)
+        if down:
+            self._touch_down(touch[0],touch[1],now)
+        else:
+            self._touch_up(now)
+        return dt
@@ -0,0 +1,297 @@
+"""
+The frame loop shared by the game applications of every backend.
+
+This module provides :class:`GameLoop`, a base class of both the Kivy :class:`GameApp`
+and the headless one.  It reads the keywords that both accept, and it processes one
+animation frame at a time: it clears the view, collects the input and calls ``update``
+(once, or once per fixed time step), calls ``draw``, draws the profile overlay, and
+hands the sounds of the frame to the audio thread and the mixer.
+Each of these sections is timed with :func:`profiler.section`, so the profile is the
+same on every backend.  A backend only has to call :meth:`GameLoop._refresh` once per
+frame, with the time of that frame.
+
+This module does not depend on Kivy.
+"""
+from .timestep import Timestep
+from .profiler import Profiler, set_profiler, section
+from .dispatch import set_async, flush_sounds
+from .mixer import make_mixer, get_mixer, set_mixer
+from .recording import load_input
+
+
+class GameLoop(object):
+    """
+    The state and the frame loop of a game application.
+
+    You should never make a `GameLoop` directly.  Subclasses must call
+    :meth:`_configure` when they are created, set the attributes ``_view`` and
+    ``_input`` (and then call :meth:`_start_input`) before the first frame, and
+    implement :meth:`_setpaths` and :meth:`_new_text`.
+    """
+    # Class attribute for whether the keyword ``mixer=True`` plays on the audio device
+    # (or else discards the audio)
+    AUDIO_DEVICE = False
+
+    # Class attribute for the layer of the profile overlay in a retained view (above the
+    # layers of the game)
+    OVERLAY_LAYER = 1000
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def step(self):
+        """
+        The fixed time step (in seconds) passed to :meth:`update`, if any.
+
+        If this value is None, the game does not use a fixed time step, and :meth:`update`
+        is called once per frame with the actual time since the last frame.
+
+        **Invariant**: Must be None or a float > 0.
+        """
+        return None if self._timestep is None else self._timestep.step
+
+    @property
+    def alpha(self):
+        """
+        The fraction of a time step that has elapsed since the last call to :meth:`update`.
+
+        This value is meant to be used in :meth:`draw` to interpolate between the previous
+        and the current game state.  It is always 0 if the game does not use a fixed time
+        step.
+
+        **Invariant**: Must be a float in the range [0,1).
+        """
+        return 0.0 if self._timestep is None else self._timestep.alpha
+
+    @property
+    def width(self):
+        """
+        The window width
+
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._gwidth
+
+    @property
+    def height(self):
+        """
+        The window height
+
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._gheight
+
+    @property
+    def view(self):
+        """
+        The game view.
+
+        Use the `draw` method  in this attribute to display any :class:`GObject` instance
+        on the screen.  See the class :class:`GView` for more information.
+
+        **Invariant**: Must be instance of :class:`GView`.
+        """
+        return self._view
+
+    @property
+    def input(self):
+        """
+        The game input handler.
+
+        Use this attribute to get information about the mouse and keyboard.  See the
+        class :class:`GInput` for more information.
+
+        **Invariant**: Must be instance of :class:`GInput`
+        """
+        return self._input
+
+    @property
+    def frames(self):
+        """
+        The number of animation frames processed so far.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frames
+
+    @property
+    def profiler(self):
+        """
+        The frame time profiler, if this game is being profiled.
+
+        The profiler times the sections ``clear``, ``update``, ``draw``, ``audio`` and
+        ``frame`` of every animation frame, as well as any sections timed with
+        :func:`section` or :func:`profiled`.  See the module :mod:`profiler` for more
+        information.
+
+        **Invariant**: Must be instance of :class:`Profiler` or None.
+        """
+        return self._profiler
+
+
+    # HIDDEN METHODS
+    def _configure(self,keywords):
+        """
+        Reads (and removes) the keywords shared by every backend.
+
+        These are ``width``, ``height``, ``fps``, ``step``, ``max_steps``, ``retained``,
+        ``atlas``, ``profile``, ``overlay``, ``async_audio``, ``mixer``, ``record_input``
+        and ``play_input``.  See :class:`GameApp` for what they do.  This also sets the
+        resource paths, the profiler and the mixer.
+
+        If the input is recorded or played back and ``step`` is not given, the game uses
+        a fixed time step of ``1/fps`` seconds, so that ``update`` never sees the
+        variable time of a frame.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        w = keywords.pop('width', 0.0)
+        h = keywords.pop('height', 0.0)
+        f = keywords.pop('fps', 60.0)
+        t = keywords.pop('step', None)
+        m = keywords.pop('max_steps', 5)
+        r = keywords.pop('retained', False)
+        a = keywords.pop('atlas', False)
+        p = keywords.pop('profile', False)
+        o = keywords.pop('overlay', False)
+        s = keywords.pop('async_audio', False)
+        x = keywords.pop('mixer', None)
+        ri = keywords.pop('record_input', None)
+        pi = keywords.pop('play_input', None)
+
+        assert type(w) in [int,float], 'width %s is not a number' % repr(w)
+        assert type(h) in [int,float], 'height %s is not a number' % repr(h)
+        assert type(f) in [int,float], 'fps %s is not a number' % repr(f)
+        assert ri is None or type(ri) == str, 'record_input %s is not a file name' % repr(ri)
+        assert f > 0, 'fps %s is not positive' % repr(f)
+        if t is None and (not ri is None or not pi is None):
+            # A recording only plays back exactly if every update has the same step
+            t = 1.0/f
+
+        self._gwidth = w
+        self._gheight = h
+        self._fps = f
+        self._timestep = None if t is None else Timestep(t,m)
+        self._frames = 0
+        self._retained = r
+        self._atlas = a
+        self._async_audio = bool(s)
+        self._profiler = Profiler() if p or o else None
+        self._profile_file = p if type(p) == str else None
+        self._overlay = None
+        self._overlay_on = o
+        self._overlay_frames = 0
+        self._record_file = ri
+        self._playback = load_input(pi) if type(pi) == str else pi
+        self._view = None
+        self._input = None
+        set_profiler(self._profiler)
+        self._setpaths()
+        self._mixer = make_mixer(x,self.sounds,self.AUDIO_DEVICE)
+        set_mixer(self._mixer)
+
+    def _start_input(self):
+        """
+        Starts playing back and recording the input, if requested.
+
+        This must be called once the input handler is made.
+        """
+        if not self._playback is None:
+            self._input.play(self._playback)
+        if not self._record_file is None:
+            self._input.start_recording()
+
+    def _refresh(self,dt):
+        """
+        Processes a single animation frame.
+
+        This method a callback-proxy for the methods `update` and `draw`.  It handles
+        important issues behind the scenes, particularly with clearing the window.
+
+        With a fixed time step, `update` is called once for every whole step that has
+        elapsed (up to ``max_steps``), and then `draw` is called once.  If the view is
+        retained, it is not cleared beforehand.  Before
+        each call to `update`, the input events since the last one are collected (see
+        :attr:`GInput.pressed_this_frame`); if a recording is played back, `update` is
+        given the time step of its frame instead.  Finally, the sounds of the frame are handed
+        to the audio thread, if there is one, and the mixer (if any) is advanced by
+        ``dt``, unless it is clocked by the audio device.  If the game is being profiled,
+        each of these sections is timed.
+
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        with section('frame'):
+            with section('clear'):
+                if not self._view.retained:
+                    self._view.clear()
+            with section('update'):
+                if self._timestep is None:
+                    self.update(self._input._next_frame(dt))
+                else:
+                    for _ in range(self._timestep.advance(dt)):
+                        self.update(self._input._next_frame(self._timestep.step))
+            with section('draw'):
+                self.draw()
+                if self._overlay_on:
+                    self._draw_overlay()
+            with section('audio'):
+                flush_sounds()
+                if not self._mixer is None:
+                    self._mixer.advance(dt)
+        self._frames += 1
+
+    def _draw_overlay(self):
+        """
+        Draws the profile statistics in the top left corner of the view.
+
+        The statistics are drawn with a :class:`GText`, and the text is only changed
+        every 30 frames, so the texture is only rendered again when it changes.  In a
+        retained view, the text is added once, in a layer above those of the game.
+        """
+        if self._overlay is None:
+            self._overlay = self._new_text(text=' ',font_size=12,linecolor='yellow',
+                                           fillcolor=[0,0,0,0.5])
+        if self._overlay_frames % 30 == 0:
+            lines = []
+            for name, stats in self._profiler.summary().items():
+                lines.append('%s  %.2f / %.2f / %.2f ms' %
+                             (name,stats['p50'],stats['p90'],stats['p99']))
+            self._overlay.text = '\n'.join(lines) if lines else ' '
+            self._overlay.left = 4
+            self._overlay.top = self.height-4
+        self._overlay_frames += 1
+        if self._view.retained:
+            self._view.add(self._overlay,self.OVERLAY_LAYER)
+        else:
+            self._overlay.draw(self._view)
+
+    def _shutdown(self):
+        """
+        Writes the profile statistics and the input recording to files, if requested, and
+        stops the audio thread and the mixer.
+        """
+        if not self._profile_file is None:
+            self._profiler.dump(self._profile_file)
+        if not self._record_file is None and not self._input.recording is None:
+            self._input.stop_recording().save(self._record_file)
+        set_async(False)
+        if not self._mixer is None:
+            self._mixer.close()
+            if get_mixer() is self._mixer:
+                set_mixer(None)
+
+    def _setpaths(self):
+        """
+        Sets the resource paths to the application directory.
+        """
+        raise NotImplementedError('%s does not set its paths' % repr(self.__class__))
+
+    def _new_text(self,**keywords):
+        """
+        Returns a new :class:`GText` of the backend, made with the given keywords.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        raise NotImplementedError('%s does not make text' % repr(self.__class__))
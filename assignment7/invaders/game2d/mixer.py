@@ -0,0 +1,807 @@
+"""
+A software mixer for 2D game sounds.
+
+By default, every :class:`Sound` plays on players made by the audio backend, and some
+backends limit how many of these may play at once.  A :class:`Mixer` replaces them.  It
+decodes each WAV file once into a NumPy buffer of PCM samples, and mixes every active
+voice into fixed-size blocks, which it writes to a single output stream (a sink).
+
+A mixer is used by :class:`Sound` once it is set with :func:`set_mixer`.  This is done
+for you by :class:`GameApp` if it is created with the keyword ``mixer``.
+
+A sink is any object with the methods ``start(rate,channels)``, ``write(block)`` (where
+``block`` is a float32 array with one row per frame and one column per channel, in the
+range -1..1), and ``close()``.  Most sinks are pushed to: the game calls
+:meth:`Mixer.advance` every frame with the time of the frame, and the mixer writes the
+audio for that time (:class:`GameApp` does this too).  A sink that also has the method
+``attach(mixer)`` pulls the blocks itself, with :meth:`Mixer.pull`, whenever its device
+needs them.  The mix is then clocked by the device, and :meth:`Mixer.advance` does
+nothing.  This module provides four sinks:
+
+* :class:`DeviceSink` plays the audio on a sound card (pulled by the device)
+* :class:`NullSink` discards the audio (for headless runs and benchmarks)
+* :class:`WaveSink` writes the audio to a 16-bit WAV file
+* :class:`StreamSink` writes 16-bit PCM bytes to any stream with a ``write`` method,
+  such as a pipe to an audio player
+
+When more voices are playing than the voice cap allows, the oldest voice is stopped.
+
+This module does not depend on Kivy, so it is shared by the headless backend.  The
+mixer requires NumPy, but NumPy is only imported when a mixer is created.
+"""
+import os.path
+import struct
+import threading
+
+# The mixer used by every Sound, if any
+_MIXER = None
+
+
+def get_mixer():
+    """
+    Returns: the mixer used by every :class:`Sound`, or None if they use the backend
+    """
+    return _MIXER
+
+
+def set_mixer(mixer):
+    """
+    Sets the mixer used by every :class:`Sound`.
+
+    This is done for you by :class:`GameApp`.  Sounds made before a mixer is set do not
+    use it.
+
+    :param mixer: the mixer to use
+    :type mixer:  :class:`Mixer` or None
+    """
+    global _MIXER
+    assert mixer is None or isinstance(mixer,Mixer), '%s is not a Mixer' % repr(mixer)
+    _MIXER = mixer
+
+
+def make_mixer(value,folder,device=False):
+    """
+    Returns: the mixer for the keyword ``mixer`` of :class:`GameApp`, or None
+
+    If ``value`` is True, the mixer plays on a :class:`DeviceSink` if ``device`` is True,
+    and writes to a :class:`NullSink` otherwise.  If it is a file name, the mixer writes
+    to a :class:`WaveSink` for that file.  If it is a mixer, that mixer is used (with the
+    given folder, if it has none).  Every WAV file in the folder is decoded before the
+    mixer is returned.
+
+    :param value: the value of the keyword
+    :type value:  ``bool``, ``str``, :class:`Mixer` or None
+
+    :param folder: the **Sounds** folder of the game
+    :type folder:  ``str``
+
+    :param device: whether a mixer made for True plays on the audio device
+    :type device:  ``bool``
+    """
+    if isinstance(value,Mixer):
+        mixer = value
+        if mixer.folder is None:
+            mixer.folder = folder
+    elif type(value) == str:
+        mixer = Mixer(folder,sink=WaveSink(value))
+    elif value:
+        mixer = Mixer(folder,sink=DeviceSink() if device else None)
+    else:
+        return None
+    mixer.load_all()
+    return mixer
+
+
+def read_wav(filename,rate=None,channels=None):
+    """
+    Returns: the samples of a WAV file as a float32 array, in the range -1..1
+
+    The array has one row per frame and one column per channel.  Only uncompressed PCM
+    (8, 16, 24 or 32 bits) and 32-bit float files are supported.  If ``rate`` is given,
+    the samples are resampled (linearly) to that rate.  If ``channels`` is given, a mono
+    file is copied to every channel, and a file with more channels is mixed down to
+    mono or truncated.
+
+    :param filename: the WAV file to read
+    :type filename:  ``str``
+
+    :param rate: the sample rate of the result (that of the file if None)
+    :type rate:  ``int`` > 0 or None
+
+    :param channels: the number of channels of the result (that of the file if None)
+    :type channels:  ``int`` > 0 or None
+    """
+    import numpy as np
+    with open(filename,'rb') as file:
+        data = file.read()
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise IOError('Module game2d cannot read the file %s' % repr(filename))
+
+    fmt = None
+    samples = None
+    pos = 12
+    while pos+8 <= len(data):
+        tag, size = struct.unpack_from('<4sI',data,pos)
+        body = data[pos+8:pos+8+size]
+        if tag == b'fmt ':
+            fmt = body
+        elif tag == b'data':
+            samples = body
+        pos += 8+size+(size & 1)
+    if fmt is None or samples is None or len(fmt) < 16:
+        raise IOError('Module game2d cannot read the file %s' % repr(filename))
+
+    code, nchannels, nrate, _, align, bits = struct.unpack_from('<HHIIHH',fmt,0)
+    if code == 0xFFFE and len(fmt) >= 26:
+        # WAVE_FORMAT_EXTENSIBLE keeps the real format code in its subformat
+        code = struct.unpack_from('<H',fmt,24)[0]
+    if align == 0 or nchannels == 0:
+        raise IOError('Module game2d cannot read the WAV format of %s' % repr(filename))
+    samples = samples[:len(samples)-len(samples) % align]
+    if code == 3 and bits == 32:
+        result = np.frombuffer(samples,dtype='<f4').astype(np.float32)
+    elif code == 1 and bits == 8:
+        result = (np.frombuffer(samples,dtype=np.uint8).astype(np.float32)-128)/128
+    elif code == 1 and bits == 16:
+        result = np.frombuffer(samples,dtype='<i2').astype(np.float32)/32768
+    elif code == 1 and bits == 24:
+        raw = np.frombuffer(samples,dtype=np.uint8).reshape(-1,3).astype(np.int32)
+        value = raw[:,0] | (raw[:,1] << 8) | (raw[:,2] << 16)
+        value = np.where(value >= 1 << 23,value-(1 << 24),value)
+        result = value.astype(np.float32)/(1 << 23)
+    elif code == 1 and bits == 32:
+        result = np.frombuffer(samples,dtype='<i4').astype(np.float32)/(1 << 31)
+    else:
+        raise IOError('Module game2d cannot read the WAV format of %s' % repr(filename))
+    result = result.reshape(-1,nchannels)
+
+    if not channels is None and channels != nchannels:
+        if nchannels == 1:
+            result = np.repeat(result,channels,axis=1)
+        elif channels == 1:
+            result = result.mean(axis=1,keepdims=True)
+        else:
+            result = result[:,:channels]
+            if result.shape[1] < channels:
+                extra = np.repeat(result[:,-1:],channels-result.shape[1],axis=1)
+                result = np.concatenate((result,extra),axis=1)
+    if not rate is None and rate != nrate and len(result) > 0:
+        size = max(1,int(round(len(result)*rate/nrate)))
+        old = np.arange(len(result))
+        new = np.arange(size)*(nrate/rate)
+        result = np.stack([np.interp(new,old,result[:,c]) for c in range(result.shape[1])],
+                          axis=1)
+    return np.ascontiguousarray(result,dtype=np.float32)
+
+
+# #mark -
+class Mixer(object):
+    """
+    A class to mix sounds in software, and write them to a sink.
+
+    Each call to :meth:`play` starts a new voice, identified by an int.  A voice plays
+    the buffer of a sound file from the start, at its own volume, until the buffer ends
+    (or forever, if it loops) or it is stopped.  At most :attr:`voices` voices play at
+    once; starting another one stops the voice that was started the longest time ago.
+
+    The mixer does not keep time by itself.  If the sink is pushed to, each call to
+    :meth:`advance` mixes enough blocks to cover the given time, and writes them to the
+    sink.  Any time left over (less than a block) is carried to the next call.  If the
+    sink pulls the blocks (see :attr:`pulled`), it calls :meth:`pull` from its own
+    thread, so the voices are guarded by a lock, which the game thread only holds to
+    start, stop or change a voice.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def folder(self):
+        """
+        The folder that sound names are relative to.
+
+        **Invariant**: Must be a ``str`` or None (names are paths).
+        """
+        return self._folder
+
+    @folder.setter
+    def folder(self,value):
+        assert value is None or type(value) == str, '%s is not a valid folder' % repr(value)
+        self._folder = value
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def rate(self):
+        """
+        The sample rate of the mix, in frames per second.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._rate
+
+    @property
+    def channels(self):
+        """
+        The number of channels of the mix.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._channels
+
+    @property
+    def block(self):
+        """
+        The number of frames in each mixed block.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._block
+
+    @property
+    def voices(self):
+        """
+        The most voices that may play at once.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._cap
+
+    @property
+    def active(self):
+        """
+        The number of voices playing.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return len(self._active)
+
+    @property
+    def sink(self):
+        """
+        The sink that the mixed blocks are written to.
+
+        **Invariant**: Must be an object with ``start``, ``write`` and ``close``.
+        """
+        return self._sink
+
+    @property
+    def pulled(self):
+        """
+        Whether the sink pulls the blocks itself, so that :meth:`advance` does nothing.
+
+        **Invariant**: Must be a ``bool``.
+        """
+        return self._pulled
+
+    @property
+    def time(self):
+        """
+        The time of the audio written to the sink so far, in seconds.
+
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._frames/self._rate
+
+    # BUILT-IN METHODS
+    def __init__(self,folder=None,rate=44100,channels=2,block=512,voices=32,sink=None):
+        """
+        Creates a new mixer with no sounds loaded.
+
+        :param folder: the folder that sound names are relative to
+        :type folder:  ``str`` or None
+
+        :param rate: the sample rate of the mix
+        :type rate:  ``int`` > 0
+
+        :param channels: the number of channels of the mix
+        :type channels:  ``int`` > 0
+
+        :param block: the number of frames in each mixed block
+        :type block:  ``int`` > 0
+
+        :param voices: the most voices that may play at once
+        :type voices:  ``int`` > 0
+
+        :param sink: the sink for the mixed blocks (a :class:`NullSink` if None)
+        :type sink:  an object with ``start``, ``write`` and ``close`` (and possibly
+                     ``attach``), or None
+        """
+        import numpy as np
+        assert type(rate) == int and rate > 0, '%s is not a valid rate' % repr(rate)
+        assert type(channels) == int and channels > 0, '%s is not a valid channel count' % repr(channels)
+        assert type(block) == int and block > 0, '%s is not a valid block size' % repr(block)
+        assert type(voices) == int and voices > 0, '%s is not a valid voice count' % repr(voices)
+        self.folder = folder
+        self._rate = rate
+        self._channels = channels
+        self._block = block
+        self._cap = voices
+        self._sink = NullSink() if sink is None else sink
+        self._buffers = {}
+        self._active = []
+        self._next = 0
+        self._frames = 0
+        self._owed = 0.0
+        self._out = np.zeros((block,channels),dtype=np.float32)
+        self._lock = threading.Lock()
+        self._pulled = hasattr(self._sink,'attach')
+        if self._pulled:
+            self._sink.attach(self)
+        self._sink.start(rate,channels)
+
+    def __contains__(self,name):
+        """
+        :return: True if the sound file ``name`` is loaded; False otherwise
+        :rtype:  ``bool``
+        """
+        return name in self._buffers
+
+    # PUBLIC METHODS
+    def load(self,name):
+        """
+        Returns: the buffer for the given sound file, decoding it if necessary
+
+        :param name: the sound file, relative to :attr:`folder`
+        :type name:  ``str``
+        """
+        buffer = self._buffers.get(name)
+        if buffer is None:
+            path = name if self._folder is None else os.path.join(self._folder,name)
+            buffer = read_wav(path,self._rate,self._channels)
+            self._buffers[name] = buffer
+        return buffer
+
+    def load_all(self):
+        """
+        Decodes every WAV file in :attr:`folder` that is not loaded yet.
+        """
+        assert not self._folder is None, 'this mixer has no folder'
+        for name in sorted(os.listdir(self._folder)):
+            if name.lower().endswith('.wav'):
+                self.load(name)
+
+    def play(self,name,volume=1.0,loop=False):
+        """
+        Returns: a new voice playing the given sound file
+
+        :param name: the sound file, relative to :attr:`folder`
+        :type name:  ``str``
+
+        :param volume: the volume of the voice
+        :type volume:  ``float`` in the range 0..1
+
+        :param loop: whether the voice loops forever
+        :type loop:  ``bool``
+        """
+        buffer = self.load(name)
+        with self._lock:
+            if len(self._active) >= self._cap:
+                del self._active[0]
+            voice = _Voice(self._next,buffer,volume,loop)
+            self._next += 1
+            self._active.append(voice)
+        return voice.ident
+
+    def stop(self,voice=None):
+        """
+        Stops a voice, or every voice if ``voice`` is None.
+
+        Stopping a voice that is not playing does nothing.
+
+        :param voice: the voice to stop
+        :type voice:  ``int`` or None
+        """
+        with self._lock:
+            if voice is None:
+                self._active = []
+            else:
+                self._active = [v for v in self._active if v.ident != voice]
+
+    def is_playing(self,voice):
+        """
+        Returns: True if the given voice is playing; False otherwise
+
+        :param voice: the voice to check
+        :type voice:  ``int``
+        """
+        with self._lock:
+            return any(v.ident == voice for v in self._active)
+
+    def set_volume(self,voice,volume):
+        """
+        Sets the volume of a voice, if it is playing.
+
+        :param voice: the voice to change
+        :type voice:  ``int``
+
+        :param volume: the new volume
+        :type volume:  ``float`` in the range 0..1
+        """
+        with self._lock:
+            for v in self._active:
+                if v.ident == voice:
+                    v.volume = volume
+
+    def mix(self):
+        """
+        Returns: the next block of the mix, as a float32 array in the range -1..1
+
+        This moves every voice forward by one block, and removes the voices that end.
+        The block is not written to the sink, and the array is reused by the next call.
+        """
+        with self._lock:
+            return self._mix()
+
+    def pull(self):
+        """
+        Returns: the next block of the mix, for a sink that pulls the blocks itself
+
+        This is :meth:`mix`, but it also counts the block in :attr:`time`.  It is meant
+        to be called by the sink, from the thread of its device.
+        """
+        with self._lock:
+            self._frames += self._block
+            return self._mix()
+
+    def advance(self,seconds):
+        """
+        Returns: the number of blocks written to the sink
+
+        This mixes and writes as many blocks as fit in the given time, together with
+        any time left over from the last call.  If the sink pulls the blocks itself,
+        this does nothing (and returns 0), as the device keeps the time instead.
+
+        :param seconds: the time to advance the mix
+        :type seconds:  ``int`` or ``float`` >= 0
+        """
+        if self._pulled:
+            return 0
+        self._owed += seconds*self._rate
+        blocks = int(self._owed // self._block)
+        self._owed -= blocks*self._block
+        for _ in range(blocks):
+            self._sink.write(self.mix())
+            self._frames += self._block
+        return blocks
+
+    def close(self):
+        """
+        Stops every voice and closes the sink.
+        """
+        with self._lock:
+            self._active = []
+        self._sink.close()
+
+    # HIDDEN METHODS
+    def _mix(self):
+        """
+        Returns: the next block of the mix (the lock must be held)
+        """
+        import numpy as np
+        out = self._out
+        out.fill(0)
+        size = self._block
+        alive = []
+        for voice in self._active:
+            buffer = voice.buffer
+            length = len(buffer)
+            pos = 0
+            while pos < size and length > 0:
+                count = min(size-pos,length-voice.pos)
+                if voice.volume == 1:
+                    out[pos:pos+count] += buffer[voice.pos:voice.pos+count]
+                else:
+                    out[pos:pos+count] += voice.volume*buffer[voice.pos:voice.pos+count]
+                voice.pos += count
+                pos += count
+                if voice.pos >= length:
+                    if not voice.loop:
+                        break
+                    voice.pos = 0
+            if voice.pos < length or (voice.loop and length > 0):
+                alive.append(voice)
+        self._active = alive
+        np.clip(out,-1,1,out=out)
+        return out
+
+
+# #mark -
+class _Voice(object):
+    """
+    A sound buffer being played by a mixer.
+    """
+    __slots__ = ('ident','buffer','pos','volume','loop')
+
+    def __init__(self,ident,buffer,volume,loop):
+        """
+        :param ident: the number identifying this voice
+        :type ident:  ``int``
+
+        :param buffer: the samples to play
+        :type buffer:  float32 array
+
+        :param volume: the volume of this voice
+        :type volume:  ``float`` in the range 0..1
+
+        :param loop: whether this voice loops forever
+        :type loop:  ``bool``
+        """
+        self.ident = ident
+        self.buffer = buffer
+        self.pos = 0
+        self.volume = volume
+        self.loop = loop
+
+
+# #mark -
+def _to_pcm16(block):
+    """
+    Returns: the given block as little-endian 16-bit PCM bytes
+
+    :param block: the samples to convert
+    :type block:  float32 array in the range -1..1
+    """
+    return (block*32767).astype('<i2').tobytes()
+
+
+class DeviceSink(object):
+    """
+    A sink that plays the mix on an audio device.
+
+    The device asks for a block whenever it needs one, on its own thread, and this sink
+    answers with :meth:`Mixer.pull`.  So the mix is clocked by the device, not by the
+    frames of the game, and a slow frame does not make the audio stutter or drift.
+
+    This sink requires the package ``sounddevice`` (and so PortAudio), which is only
+    imported when the sink is started.
+    """
+
+    @property
+    def device(self):
+        """
+        The device played on (the default output device if None).
+
+        **Invariant**: Must be an ``int``, a ``str`` or None.
+        """
+        return self._device
+
+    def __init__(self,device=None):
+        """
+        Creates a new sink for the given device.
+
+        :param device: the device to play on, as a ``sounddevice`` index or name
+        :type device:  ``int``, ``str`` or None
+        """
+        self._device = device
+        self._mixer = None
+        self._stream = None
+
+    def attach(self,mixer):
+        """
+        Makes this sink pull its blocks from the given mixer.
+
+        :param mixer: the mixer to pull from
+        :type mixer:  :class:`Mixer`
+        """
+        self._mixer = mixer
+
+    def start(self,rate,channels):
+        """
+        Opens an output stream on the device, and starts it.
+
+        :param rate: the sample rate of the mix
+        :type rate:  ``int`` > 0
+
+        :param channels: the number of channels of the mix
+        :type channels:  ``int`` > 0
+        """
+        assert not self._mixer is None, 'this sink is not attached to a mixer'
+        try:
+            import sounddevice
+        except ImportError:
+            raise ImportError('Module game2d needs the package sounddevice to play the mixer')
+        self._stream = sounddevice.OutputStream(samplerate=rate,channels=channels,
+                                                dtype='float32',blocksize=self._mixer.block,
+                                                device=self._device,callback=self._callback)
+        self._stream.start()
+
+    def write(self,block):
+        """
+        Does nothing, as the device pulls the blocks itself.
+
+        :param block: the block to write
+        :type block:  float32 array
+        """
+        pass
+
+    def close(self):
+        """
+        Stops and closes the output stream.
+        """
+        if self._stream is None:
+            return
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+
+    def _callback(self,outdata,frames,time,status):
+        """
+        Fills the buffer of the device with the next block of the mix.
+
+        The stream is opened with the block size of the mixer, so the device always asks
+        for exactly one block.
+
+        :param outdata: the buffer of the device
+        :type outdata:  float32 array
+
+        :param frames: the number of frames in the buffer
+        :type frames:  ``int``
+
+        :param time: the timing of the buffer (unused)
+        :param status: the underflow and overflow flags of the stream (unused)
+        """
+        outdata[:] = self._mixer.pull()
+
+
+class NullSink(object):
+    """
+    A sink that discards the mix, but counts its frames.
+    """
+
+    @property
+    def frames(self):
+        """
+        The number of frames written so far.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frames
+
+    def __init__(self):
+        """
+        Creates a new null sink.
+        """
+        self._frames = 0
+
+    def start(self,rate,channels):
+        """
+        Prepares this sink for a mix (does nothing).
+
+        :param rate: the sample rate of the mix
+        :type rate:  ``int`` > 0
+
+        :param channels: the number of channels of the mix
+        :type channels:  ``int`` > 0
+        """
+        pass
+
+    def write(self,block):
+        """
+        Counts the frames of a block.
+
+        :param block: the block to write
+        :type block:  float32 array
+        """
+        self._frames += len(block)
+
+    def close(self):
+        """
+        Closes this sink (does nothing).
+        """
+        pass
+
+
+class WaveSink(object):
+    """
+    A sink that writes the mix to a 16-bit WAV file.
+
+    The file is only complete once the sink is closed.
+    """
+
+    @property
+    def filename(self):
+        """
+        The file written by this sink.
+
+        **Invariant**: Must be a ``str``.
+        """
+        return self._filename
+
+    def __init__(self,filename):
+        """
+        Creates a new sink for the given file.
+
+        :param filename: the WAV file to write
+        :type filename:  ``str``
+        """
+        assert type(filename) == str, '%s is not a valid file name' % repr(filename)
+        self._filename = filename
+        self._file = None
+        self._size = 0
+
+    def start(self,rate,channels):
+        """
+        Opens the file, and writes a header for the given format.
+
+        :param rate: the sample rate of the mix
+        :type rate:  ``int`` > 0
+
+        :param channels: the number of channels of the mix
+        :type channels:  ``int`` > 0
+        """
+        self._file = open(self._filename,'wb')
+        self._file.write(struct.pack('<4sI4s4sIHHIIHH4sI',b'RIFF',36,b'WAVE',b'fmt ',16,1,
+                                     channels,rate,rate*channels*2,channels*2,16,b'data',0))
+        self._size = 0
+
+    def write(self,block):
+        """
+        Writes a block to the file.
+
+        :param block: the block to write
+        :type block:  float32 array
+        """
+        data = _to_pcm16(block)
+        self._file.write(data)
+        self._size += len(data)
+
+    def close(self):
+        """
+        Fills in the sizes in the header, and closes the file.
+        """
+        if self._file is None:
+            return
+        self._file.seek(4)
+        self._file.write(struct.pack('<I',36+self._size))
+        self._file.seek(40)
+        self._file.write(struct.pack('<I',self._size))
+        self._file.close()
+        self._file = None
+
+
+class StreamSink(object):
+    """
+    A sink that writes the mix as 16-bit PCM bytes to a stream.
+
+    The stream may be any object with a ``write`` method taking bytes, such as a binary
+    file, a pipe to an audio player, or a ``sounddevice.RawOutputStream``.
+    """
+
+    def __init__(self,stream,close=False):
+        """
+        Creates a new sink for the given stream.
+
+        :param stream: the stream to write to
+        :type stream:  an object with a ``write`` method
+
+        :param close: whether to close the stream when the sink is closed
+        :type close:  ``bool``
+        """
+        self._stream = stream
+        self._close = close
+
+    def start(self,rate,channels):
+        """
+        Prepares this sink for a mix (does nothing; the stream must match the format).
+
+        :param rate: the sample rate of the mix
+        :type rate:  ``int`` > 0
+
+        :param channels: the number of channels of the mix
+        :type channels:  ``int`` > 0
+        """
+        pass
+
+    def write(self,block):
+        """
+        Writes a block to the stream.
+
+        :param block: the block to write
+        :type block:  float32 array
+        """
+        self._stream.write(_to_pcm16(block))
+
+    def close(self):
+        """
+        Closes the stream, if requested.
+        """
+        if self._close:
+            self._stream.close()
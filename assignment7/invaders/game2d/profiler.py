@@ -0,0 +1,264 @@
+"""
+Frame time profiling for 2D games.
+
+This module measures where the time of each animation frame goes.  A :class:`Profiler`
+keeps the most recent times of a number of named sections, and reports rolling
+percentiles of them.  When the keyword ``profile`` is given to :class:`GameApp`, the
+application times the standard sections of every frame:
+
+* ``clear``: clearing the view (or nothing, if the view is retained)
+* ``update``: every call to :meth:`GameApp.update` in the frame
+* ``draw``: the call to :meth:`GameApp.draw` (and the profile overlay)
+* ``frame``: the whole frame
+
+Any other code may time its own sections with :func:`section`, or by decorating a
+function or method with :func:`profiled`.  These use the profiler of the running game,
+and do (almost) nothing when no game is being profiled.  For example::
+
+    class Wave(object):
+
+        @profiled('Wave._movea')
+        def _movea(self,dt):
+            ...
+
+The percentiles may be shown on screen (the keyword ``overlay`` of :class:`GameApp`),
+and are written to a CSV or JSON file when the game stops, if ``profile`` is a file name.
+
+This module does not depend on Kivy, so it is shared by the headless backend.
+"""
+from time import perf_counter as _clock
+from collections import deque as _deque
+from functools import wraps as _wraps
+
+# The profiler of the running game, if it is being profiled
+_ACTIVE = None
+
+
+def get_profiler():
+    """
+    Returns: the profiler of the running game, or None if it is not being profiled
+    """
+    return _ACTIVE
+
+
+def set_profiler(profiler):
+    """
+    Sets the profiler used by :func:`section` and :func:`profiled`.
+
+    This is done for you by :class:`GameApp`.
+
+    :param profiler: the profiler to use
+    :type profiler:  :class:`Profiler` or None
+    """
+    global _ACTIVE
+    assert profiler is None or isinstance(profiler,Profiler), '%s is not a Profiler' % repr(profiler)
+    _ACTIVE = profiler
+
+
+def section(name):
+    """
+    Returns: a context manager that times its body as the section ``name``
+
+    If no game is being profiled, the body is not timed.
+
+    :param name: the name of the section
+    :type name:  ``str``
+    """
+    return _Section(_ACTIVE,name)
+
+
+def profiled(name=None):
+    """
+    Returns: a decorator that times every call of a function as the section ``name``
+
+    If ``name`` is None, the section is named after the function.  If no game is being
+    profiled, the function is called directly.
+
+    :param name: the name of the section
+    :type name:  ``str`` or None
+    """
+    def decorator(func):
+        label = func.__qualname__ if name is None else name
+
+        @_wraps(func)
+        def wrapper(*args,**keywords):
+            if _ACTIVE is None:
+                return func(*args,**keywords)
+            start = _clock()
+            try:
+                return func(*args,**keywords)
+            finally:
+                _ACTIVE.record(label,_clock()-start)
+        return wrapper
+    return decorator
+
+
+# #mark -
+class Profiler(object):
+    """
+    A class to collect rolling statistics of named section times.
+
+    Each section keeps the times of its last :attr:`window` samples.  The statistics of a
+    section are its sample count, mean, maximum and the percentiles in
+    :attr:`PERCENTILES`, all over that window.  A section is created the first time it
+    is recorded.
+    """
+    # The percentiles reported for each section
+    PERCENTILES = (50,90,99)
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def window(self):
+        """
+        The number of recent samples kept for each section.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._window
+
+    @property
+    def sections(self):
+        """
+        The names of the sections recorded so far, in the order they were first seen.
+
+        **Invariant**: Must be a list of ``str``.
+        """
+        return list(self._samples)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,window=300):
+        """
+        Creates a new profiler with no sections.
+
+        :param window: the number of recent samples kept for each section
+        :type window:  ``int`` > 0
+        """
+        assert type(window) == int and window > 0, '%s is not a valid window' % repr(window)
+        self._window = window
+        self._samples = {}
+
+    def __str__(self):
+        """
+        :return: A readable table of the statistics of every section (in milliseconds).
+        :rtype:  ``str``
+        """
+        lines = ['%-20s %8s %8s %8s %8s' % ('section','mean','p50','p90','p99')]
+        for name, stats in self.summary().items():
+            lines.append('%-20s %8.3f %8.3f %8.3f %8.3f' %
+                         (name[-20:],stats['mean'],stats['p50'],stats['p90'],stats['p99']))
+        return '\n'.join(lines)
+
+
+    # PUBLIC METHODS
+    def record(self,name,seconds):
+        """
+        Adds a sample to the section ``name``.
+
+        :param name: the name of the section
+        :type name:  ``str``
+
+        :param seconds: the time taken by the section
+        :type seconds:  ``float`` >= 0
+        """
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = _deque(maxlen=self._window)
+            self._samples[name] = samples
+        samples.append(seconds)
+
+    def section(self,name):
+        """
+        Returns: a context manager that times its body as the section ``name``
+
+        :param name: the name of the section
+        :type name:  ``str``
+        """
+        return _Section(self,name)
+
+    def reset(self):
+        """
+        Removes every sample (and section) from this profiler.
+        """
+        self._samples.clear()
+
+    def stats(self,name):
+        """
+        Returns: a dictionary of the statistics of the section ``name``, in milliseconds
+
+        The keys are ``'count'``, ``'mean'``, ``'max'`` and one key for each percentile
+        (such as ``'p90'``).  Percentiles use the nearest-rank method.
+
+        :param name: the name of a recorded section
+        :type name:  ``str``
+        """
+        samples = sorted(self._samples[name])
+        count = len(samples)
+        result = {'count': count,
+                  'mean': 1000*sum(samples)/count,
+                  'max': 1000*samples[-1]}
+        for pct in self.PERCENTILES:
+            rank = max(0,-(-pct*count//100)-1)
+            result['p%d' % pct] = 1000*samples[rank]
+        return result
+
+    def summary(self):
+        """
+        Returns: a dictionary mapping each section name to its :meth:`stats`
+        """
+        return {name: self.stats(name) for name in self._samples}
+
+    def dump(self,filename):
+        """
+        Writes the :meth:`summary` to a file.
+
+        The file is JSON if ``filename`` ends in ``.json``, and CSV otherwise (with one
+        row per section).  All times are in milliseconds.
+
+        :param filename: the file to write
+        :type filename:  ``str``
+        """
+        summary = self.summary()
+        if filename.lower().endswith('.json'):
+            import json
+            with open(filename,'w') as file:
+                json.dump(summary,file,indent=2)
+        else:
+            import csv
+            keys = ['count','mean']+['p%d' % pct for pct in self.PERCENTILES]+['max']
+            with open(filename,'w',newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(['section']+keys)
+                for name, stats in summary.items():
+                    writer.writerow([name]+[stats[key] for key in keys])
+
+
+# #mark -
+class _Section(object):
+    """
+    A context manager that records the time of its body in a profiler.
+
+    If the profiler is None, nothing is recorded.
+    """
+
+    def __init__(self,profiler,name):
+        """
+        :param profiler: the profiler to record in
+        :type profiler:  :class:`Profiler` or None
+
+        :param name: the name of the section
+        :type name:  ``str``
+        """
+        self._profiler = profiler
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        if not self._profiler is None:
+            self._start = _clock()
+        return self
+
+    def __exit__(self,*exc):
+        if not self._profiler is None:
+            self._profiler.record(self._name,_clock()-self._start)
+        return False
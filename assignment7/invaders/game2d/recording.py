@@ -0,0 +1,287 @@
+"""
+Input recordings for 2D games.
+
+An :class:`InputRecording` stores the input of a game one frame at a time (one frame
+for every call to ``update``).  Each frame is a tuple ``(held, events, touch, dt)``: the
+keys held down at the start of ``update``, the key and mouse events since the last
+frame, in order, the last mouse position of the frame (or None if the mouse was not
+pressed at all), and the time step passed to ``update`` (or None if it is not known).
+Each event is a pair ``(kind, key)``, as in :attr:`GInput.events` but without the time.
+The events are kept apart from the keys held down, so that a key released and pressed
+again within a frame (or a tap of the mouse) plays back as it happened.
+
+A :class:`GInput` records into a recording after :meth:`GInput.start_recording`, and
+plays a recording back, in place of the keyboard and mouse, after :meth:`GInput.play`.
+:class:`GameApp` does both for you with the keywords ``record_input`` and
+``play_input``, and it then passes the recorded time step of each frame to ``update``.
+With a fixed seed for any random numbers, a recording plays a game back exactly, so it
+can be used to benchmark ``update`` or to test a game without a window.
+
+Frames are run length encoded, both in memory and in a file.  The file format is a
+run length encoded log, which is shared with the replays of Alien Invaders (see
+:func:`encode_log`).  The header has no extra fields, and each run is
+
+    number of frames (uint32), number of held keys (uint16), number of events (uint16),
+    flags (uint8), then the index of each held key (uint16), each event as its kind
+    (uint8, an index into EVENT_KINDS) and the index of its key (uint16, NO_KEY for a
+    mouse event), the touch position (two float64) if bit 0 of the flags is set, and
+    the time step (float64) if bit 1 of the flags is set
+
+This module does not depend on Kivy, so it is shared by the headless backend.
+"""
+import struct
+
+# The magic bytes and version at the start of every file
+_MAGIC = b'G2IN'
+_VERSION = 3
+_RUN = struct.Struct('<IHHB')
+_EVENT = struct.Struct('<BH')
+_TOUCH = struct.Struct('<dd')
+_STEP = struct.Struct('<d')
+
+# The kinds of events, in the order of their codes in a file
+EVENT_KINDS = ('key_down','key_up','touch_down','touch_up')
+
+# The key index of a mouse event in a file
+NO_KEY = 0xFFFF
+
+# The header of every log: magic bytes, version and number of names
+_LOG = struct.Struct('<4sBH')
+
+
+def append_run(runs,frame):
+    """
+    Adds a frame to the end of a list of runs.
+
+    Each run is a ``[count, frame]`` list.  If ``frame`` is equal to the frame of the
+    last run, that run is extended; otherwise a new run is started.
+
+    :param runs: the runs to add to
+    :type runs:  ``list`` of ``[int, frame]`` lists
+
+    :param frame: the frame to add
+    :type frame:  any value that can be compared with ``==``
+    """
+    if runs and runs[-1][1] == frame:
+        runs[-1][0] += 1
+    else:
+        runs.append([1,frame])
+
+
+def encode_log(magic,version,names,head,runs):
+    """
+    Returns: a run length encoded log as bytes
+
+    A log is a header, followed by the runs packed one after another.  The header is
+    the magic bytes, the version (uint8), the number of names (uint16), each name as a
+    length-prefixed UTF-8 string, and then the packed extra fields of the format (if
+    any).  The runs of each format refer to the names by their index.
+
+    :param magic: the magic bytes of the format
+    :type magic:  ``bytes`` of length 4
+
+    :param version: the version of the format
+    :type version:  ``int`` in 0..255
+
+    :param names: the names the runs refer to (such as key names)
+    :type names:  ``list`` of ``str``
+
+    :param head: the packed extra fields of the header
+    :type head:  ``bytes``
+
+    :param runs: the packed runs
+    :type runs:  iterable of ``bytes``
+    """
+    chunks = [_LOG.pack(magic,version,len(names))]
+    for name in names:
+        data = name.encode('utf-8')
+        chunks.append(struct.pack('<B',len(data))+data)
+    chunks.append(head)
+    chunks.extend(runs)
+    return b''.join(chunks)
+
+
+def decode_log(data,magic,version):
+    """
+    Returns: the names of a log made by :func:`encode_log`, and the position after them
+
+    The extra fields of the header (if any) start at the returned position, followed by
+    the runs.  An AssertionError is raised if the magic bytes or the version differ.
+
+    :param data: the log
+    :type data:  ``bytes``
+
+    :param magic: the magic bytes of the format
+    :type magic:  ``bytes`` of length 4
+
+    :param version: the version of the format
+    :type version:  ``int`` in 0..255
+    """
+    found, release, count = _LOG.unpack_from(data,0)
+    assert found == magic, 'data is not a %s log' % repr(magic)
+    assert release == version, '%s log version %s is not supported' % (repr(magic),release)
+    pos = _LOG.size
+    names = []
+    for _ in range(count):
+        size = data[pos]
+        names.append(data[pos+1:pos+1+size].decode('utf-8'))
+        pos += 1+size
+    return names, pos
+
+
+def load_input(filename):
+    """
+    Returns: the recording in the given file
+
+    :param filename: the file to read
+    :type filename:  ``str``
+    """
+    with open(filename,'rb') as file:
+        return InputRecording.decode(file.read())
+
+
+# #mark -
+class InputRecording(object):
+    """
+    A class to store the input of a game one frame at a time.
+
+    A recording acts as a sequence of ``(held, events, touch, dt)`` frames, where ``held``
+    is a frozenset of key names, ``events`` is a tuple of ``(kind, key)`` pairs, ``touch``
+    is an (x,y) tuple or None, and ``dt`` is a float or None.
+    """
+
+    # BUILT-IN METHODS
+    def __init__(self,frames=()):
+        """
+        Creates a new recording with the given frames.
+
+        :param frames: the frames of the recording
+        :type frames:  iterable of ``(held, events, touch, dt)`` tuples
+        """
+        self._runs = []
+        for held, events, touch, dt in frames:
+            self.append(held,events,touch,dt)
+
+    def __len__(self):
+        """
+        :return: The number of frames in this recording.
+        :rtype:  ``int`` >= 0
+        """
+        return sum(run[0] for run in self._runs)
+
+    def __iter__(self):
+        """
+        :return: An iterator over the frames of this recording.
+        :rtype:  ``iterable``
+        """
+        for count, frame in self._runs:
+            for _ in range(count):
+                yield frame
+
+    def __eq__(self,other):
+        """
+        :return: True if ``other`` is a recording with the same frames.
+        :rtype:  ``bool``
+        """
+        return isinstance(other,InputRecording) and self._runs == other._runs
+
+    # PUBLIC METHODS
+    def append(self,held,events=(),touch=None,dt=None):
+        """
+        Adds a frame to the end of this recording.
+
+        When the frame is played back, its events happen first, in order, and then the
+        keys held down are set to ``held`` (so a frame made by hand may leave out the
+        events that only press or release the keys in ``held``).
+
+        :param held: the keys held down in the frame
+        :type held:  collection of ``str``
+
+        :param events: the key and mouse events since the last frame, in order
+        :type events:  iterable of ``(kind, key)`` pairs, where ``kind`` is in
+                       :data:`EVENT_KINDS` and ``key`` is a ``str`` (None for the mouse)
+
+        :param touch: the last mouse position in the frame, or None if the mouse was not
+                      pressed at all
+        :type touch:  a pair of numbers or None
+
+        :param dt: the time step passed to ``update``, or None if it is not known
+        :type dt:  ``int`` or ``float`` > 0, or None
+        """
+        if not touch is None:
+            touch = (float(touch[0]),float(touch[1]))
+        if not dt is None:
+            dt = float(dt)
+        events = tuple((kind,key) for kind, key in events)
+        for kind, key in events:
+            assert kind in EVENT_KINDS, '%s is not an event kind' % repr(kind)
+            assert (key is None) == kind.startswith('touch'), '%s is not a key for %s' % (repr(key),kind)
+            assert kind != 'touch_down' or not touch is None, 'a touch_down needs a touch position'
+        append_run(self._runs,(frozenset(held),events,touch,dt))
+
+    def encode(self):
+        """
+        Returns: this recording as bytes, in the format described in this module
+        """
+        names = set()
+        for _, (held, events, _, _) in self._runs:
+            names.update(held)
+            names.update(key for _, key in events if not key is None)
+        names = sorted(names)
+        index = {name: pos for (pos, name) in enumerate(names)}
+        kinds = {kind: pos for (pos, kind) in enumerate(EVENT_KINDS)}
+        chunks = []
+        for count, (held, events, touch, dt) in self._runs:
+            flags = (touch is not None) | ((dt is not None) << 1)
+            chunks.append(_RUN.pack(count,len(held),len(events),flags))
+            keys = [index[key] for key in sorted(held)]
+            chunks.append(struct.pack('<%dH' % len(keys),*keys))
+            for kind, key in events:
+                chunks.append(_EVENT.pack(kinds[kind],NO_KEY if key is None else index[key]))
+            if not touch is None:
+                chunks.append(_TOUCH.pack(*touch))
+            if not dt is None:
+                chunks.append(_STEP.pack(dt))
+        return encode_log(_MAGIC,_VERSION,names,b'',chunks)
+
+    @classmethod
+    def decode(cls,data):
+        """
+        Returns: the recording stored in the given bytes
+
+        :param data: a recording made by :meth:`encode`
+        :type data:  ``bytes``
+        """
+        names, pos = decode_log(data,_MAGIC,_VERSION)
+        result = cls()
+        while pos < len(data):
+            frames, nheld, nevents, flags = _RUN.unpack_from(data,pos)
+            pos += _RUN.size
+            keys = struct.unpack_from('<%dH' % nheld,data,pos)
+            pos += 2*nheld
+            events = []
+            for _ in range(nevents):
+                kind, key = _EVENT.unpack_from(data,pos)
+                pos += _EVENT.size
+                events.append((EVENT_KINDS[kind],None if key == NO_KEY else names[key]))
+            touch = None
+            if flags & 1:
+                touch = _TOUCH.unpack_from(data,pos)
+                pos += _TOUCH.size
+            dt = None
+            if flags & 2:
+                dt = _STEP.unpack_from(data,pos)[0]
+                pos += _STEP.size
+            held = frozenset(names[key] for key in keys)
+            result._runs.append([frames,(held,tuple(events),touch,dt)])
+        return result
+
+    def save(self,filename):
+        """
+        Writes this recording to a file.
+
+        :param filename: the file to write
+        :type filename:  ``str``
+        """
+        with open(filename,'wb') as file:
+            file.write(self.encode())
@@ -3,12 +3,21 @@ Sound classes for 2D game support.
 
 This classes wrap the Kivy audio interface, making it simpler for students to use.
 
+By default, :meth:`Sound.play` and :meth:`Sound.stop` call the audio backend at once,
+in the middle of the animation frame.  After ``set_async(True)``, they only record a
+request, which is played on a separate audio thread at the end of the frame (see 
+module :mod:`dispatch`).
+
+Alternatively, the sounds may be mixed in software by a :class:`mixer.Mixer` (see 
+module :mod:`mixer`), in which case they do not use the backend at all.
+
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
+import threading
 from kivy.core.audio import SoundLoader
-from .app import GameApp
-
+from .mixer import get_mixer
+from .dispatch import get_async, set_async, flush_sounds, get_dispatcher
 
 class Sound(object):
     """
@@ -19,30 +28,59 @@ class Sound(object):
     platforms. In order for Kivy to find a WAV or MP3 file, you should put it in the
     **Sounds** directory.  Sounds in that folder can be referenced directly by name.
     
-    When a sound is played, it cannot be played again until it finishes, or is stopped.  
-    This means that if you want multiple, simultaneous sound effects from the same WAV 
-    file.you will need to create multiple Sound objects.
+    Every sound file is loaded once per process, into a pool of :attr:`VOICES` players
+    kept in the class attribute :attr:`BANK`.  All Sound objects for the same file share
+    this pool, so creating a Sound for a file that is already in the bank does not touch
+    the disk.  Each call to :meth:`play` uses a voice that is not playing, so the same 
+    effect may be played again before it finishes.  If every voice is busy, the voice 
+    that was started the longest time ago is stopped and reused.  Use :meth:`preload` to 
+    load a sound before the game needs it, with a different number of voices.
+    
+    If a mixer is set (see :func:`mixer.set_mixer`) when a sound is made, the sound is
+    played by the mixer instead, and the bank is not used.
+    
+    With asynchronous audio, the voices are played and stopped on the audio thread, 
+    while the game thread may read :attr:`playing`, set :attr:`volume` or unload a 
+    file at the same time.  So every access to the bank, to the voices and to the 
+    voices a sound is playing on holds the class attribute :attr:`LOCK`.
     """
     # This class is a simply replacement for the built-in Kivy Sound class.  It is a
     # little better with error handling, since GStreamer appears to be quite unreliable.
     
+    # Class attribute for the number of voices of a sound (if not preloaded)
+    VOICES = 4
+    
+    # Class attribute mapping each sound file to its voices (least recently played first)
+    BANK = {}
+    
+    # Class attribute guarding the bank and the voices against the audio thread
+    LOCK = threading.Lock()
+    
     # MUTABLE PROPERTIES
     @property
     def volume(self):
         """
         The current sound volume.
         
-        1 means full volume, 0 means mute.  The default value is 1.
+        1 means full volume, 0 means mute.  The default value is 1.  The volume is
+        given to a voice whenever this sound plays on it.
         
         **Invariant**: Must float in the range 0..1.
         """
-        return self._sound.volume
+        return self._volume
     
     @volume.setter
     def volume(self,value):
         assert type(value) in [int, float] and value >= 0 and value <= 1, \
             'value %s is not a valid volume' % repr(value)
-        self._sound.volume = value
+        self._volume = value
+        if self._mixer is None:
+            with Sound.LOCK:
+                for voice in self._active:
+                    voice.volume = value
+        else:
+            for voice in self._active:
+                self._mixer.set_volume(voice,value)
     
     # IMMUTABLE PROPERTIES
     @property
@@ -59,48 +97,176 @@ class Sound(object):
     @property
     def playing(self):
         """
-        Whether or not the sound is currently playing.
+        Whether or not the sound is currently playing (on any voice).
         
         **Immutable**: This value cannot be changed.  You should use the :meth:`play` 
         and :meth:`stop` methods to alter its value.
         
         **Invariant**: Must be a boolean.
         """ 
-        return self._sound.state == 'play'
+        if not self._mixer is None:
+            return any(self._mixer.is_playing(voice) for voice in self._active)
+        with Sound.LOCK:
+            return any(voice.state == 'play' for voice in self._active)
+    
+    @property
+    def voices(self):
+        """
+        The number of voices shared by every sound for this file.
+        
+        If the sound is played by a mixer, this is the voice cap of the mixer (which is
+        shared by every sound).
+        
+        **Immutable**: This value cannot be changed after the sound is loaded.
+        
+        **Invariant**: Must be an int > 0.
+        """ 
+        if not self._mixer is None:
+            return self._mixer.voices
+        return len(self._voices)
     
     def __init__(self,source):
         """
         Creates a new sound from a file.
         
+        If the file is not in the sound bank yet, it is loaded with :attr:`VOICES` 
+        voices.  Otherwise, this sound shares the voices in the bank.  If a mixer is set,
+        the file is decoded by the mixer instead (unless it already has been).
+        
         :param source: The string providing the name of a sound file
         :type source:  ``str``
         """
-        from .app import GameApp
-        assert GameApp.is_sound(source), 'source %s is not a sound file' % repr(source)
         self._source = source
-        self._sound  = SoundLoader.load(source)
-        if self._sound is None:
-            raise IOError('Module game2d cannot read the file %s' % repr(source))
+        self._mixer = get_mixer()
+        if self._mixer is None:
+            self._voices = Sound.preload(source)
+        else:
+            self._mixer.load(source)
+            self._voices = []
+        self._volume = 1
+        self._active = []
     
     def play(self,loop=False):
         """
         Plays this sound.
         
-        The sound will play until completion, or interrupted by the user.
+        The sound will play until completion, or interrupted by the user.  It is played on
+        the first free voice, or else on the voice that started playing the longest time 
+        ago.  If audio is asynchronous (see :func:`set_async`), this only records a 
+        request for the audio thread.  If the sound is played by a mixer, it starts a new
+        voice of the mixer.
         
         :param loop: Whether or not to loop the sound
         :type loop:  ``bool``
         """
-        self._sound.loop = loop
-        self._sound.play()
+        if not self._mixer is None:
+            self._active = [v for v in self._active if self._mixer.is_playing(v)]
+            self._active.append(self._mixer.play(self._source,self._volume,loop))
+        elif get_dispatcher() is None:
+            self._play(loop)
+        else:
+            get_dispatcher().request(self,'play',loop)
 
     def stop(self):
         """
         Stops this sound.
         
-        This will stop the sound immediately, even if it is looping.
+        This will stop the sound immediately on every voice it is playing on, even if it
+        is looping.  If audio is asynchronous, the sound stops at the end of the frame.
+        """
+        if not self._mixer is None:
+            for voice in self._active:
+                self._mixer.stop(voice)
+            self._active = []
+        elif get_dispatcher() is None:
+            self._stop()
+        else:
+            get_dispatcher().request(self,'stop')
+    
+    def _play(self,loop):
+        """
+        Plays this sound on a voice (in the calling thread).
+        
+        :param loop: Whether or not to loop the sound
+        :type loop:  ``bool``
+        """
+        with Sound.LOCK:
+            voices = self._voices
+            for voice in voices:
+                if voice.state != 'play':
+                    break
+            else:
+                voice = voices[0]
+                voice.stop()
+            voices.remove(voice)
+            voices.append(voice)
+            voice.volume = self._volume
+            voice.loop = loop
+            voice.play()
+            active = [v for v in self._active if v.state == 'play' and v is not voice]
+            active.append(voice)
+            self._active = active
+
+    def _stop(self):
+        """
+        Stops every voice this sound is playing on (in the calling thread).
+        """
+        with Sound.LOCK:
+            for voice in self._active:
+                voice.stop()
+            self._active = []
+    
+    @classmethod
+    def preload(cls,source,voices=None):
+        """
+        Returns: The voices for the given sound file, loading them if necessary
+        
+        The ``source`` must refer to a file in the **Sounds** folder.  If the file is 
+        already in the sound bank, its voices are returned as they are.  Otherwise, the
+        file is loaded once for each voice, and the voices are put in the bank.  If a
+        mixer is set, the file is decoded by the mixer instead, and this returns an empty
+        list.
+        
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
+        
+        :param voices: The number of voices (:attr:`VOICES` if None)
+        :type voices:  ``int`` > 0 or None
+        """
+        with cls.LOCK:
+            if source in cls.BANK:
+                return cls.BANK[source]
+        if not get_mixer() is None:
+            get_mixer().load(source)
+            return []
+        from .app import GameApp
+        assert GameApp.is_sound(source), 'source %s is not a sound file' % repr(source)
+        voices = cls.VOICES if voices is None else voices
+        assert type(voices) == int and voices > 0, '%s is not a valid voice count' % repr(voices)
+        pool = []
+        for _ in range(voices):
+            voice = SoundLoader.load(source)
+            if voice is None:
+                raise IOError('Module game2d cannot read the file %s' % repr(source))
+            pool.append(voice)
+        with cls.LOCK:
+            return cls.BANK.setdefault(source,pool)
+    
+    @classmethod
+    def unload(cls,source):
+        """
+        Removes the voices for the given sound file from the sound bank.
+        
+        Any voices still playing are stopped.  Sound objects made before this call keep
+        their voices; new ones load the file again.
+        
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
         """
-        self._sound.stop()
+        assert type(source) == str, '%s is not a valid sound name' % repr(source)
+        with cls.LOCK:
+            for voice in cls.BANK.pop(source,[]):
+                voice.stop()
 
 
 # #mark -
@@ -0,0 +1,109 @@
+"""
+Fixed time step support for 2D games.
+
+This module provides the accumulator behind the fixed time step mode of
+:class:`GameApp`.  In that mode, the game logic always advances in steps of the same
+length, no matter how fast frames are rendered.  This makes the game logic deterministic,
+and makes speeds that are measured "per update" independent of the frame rate.
+
+This module does not depend on Kivy, so it is shared by the headless backend.
+"""
+
+
+class Timestep(object):
+    """
+    An accumulator that converts frame times into a whole number of fixed steps.
+
+    Every animation frame, call :meth:`advance` with the time since the last frame.  It
+    returns the number of fixed steps to simulate.  Leftover time is carried over to
+    the next frame, and is available as :attr:`alpha`, the fraction of a step that has
+    elapsed since the last one.  This value can be used to interpolate when drawing.
+
+    To avoid a "spiral of death" (where a slow frame causes more steps, which causes a
+    slower frame, and so on), at most :attr:`limit` steps are taken in a single frame.
+    Any time beyond that is dropped.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def step(self):
+        """
+        The length of a single step in seconds.
+
+        **Invariant**: Must be a float > 0.
+        """
+        return self._step
+
+    @property
+    def limit(self):
+        """
+        The maximum number of steps taken in a single frame.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._limit
+
+    @property
+    def alpha(self):
+        """
+        The fraction of a step that has elapsed since the last step.
+
+        **Invariant**: Must be a float in the range [0,1).
+        """
+        return self._accum/self._step
+
+    @property
+    def dropped(self):
+        """
+        The total time (in seconds) discarded because a frame hit the step limit.
+
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._dropped
+
+    # BUILT-IN METHODS
+    def __init__(self,step,limit=5):
+        """
+        Creates a new accumulator with the given step length.
+
+        :param step: the length of a single step in seconds
+        :type step:  ``int`` or ``float`` > 0
+
+        :param limit: the maximum number of steps in a single frame
+        :type limit:  ``int`` > 0
+        """
+        assert type(step) in [int,float] and step > 0, '%s is not a valid step' % repr(step)
+        assert type(limit) == int and limit > 0, '%s is not a valid step limit' % repr(limit)
+        self._step  = float(step)
+        self._limit = limit
+        self._accum = 0.0
+        self._dropped = 0.0
+
+    # PUBLIC METHODS
+    def advance(self,dt):
+        """
+        Returns the number of steps to take after ``dt`` more seconds have elapsed.
+
+        :param dt: time in seconds since the last frame
+        :type dt:  ``int`` or ``float`` >= 0
+        """
+        assert type(dt) in [int,float] and dt >= 0, '%s is not a valid time' % repr(dt)
+        self._accum += dt
+        count = int(self._accum // self._step)
+        if count > self._limit:
+            count = self._limit
+        self._accum -= count*self._step
+        if self._accum >= self._step:
+            # Drop the whole steps we did not have time for, keeping the remainder
+            keep = self._accum % self._step
+            if keep >= self._step:
+                keep = 0.0
+            self._dropped += self._accum-keep
+            self._accum = keep
+        return count
+
+    def reset(self):
+        """
+        Discards any accumulated time.
+        """
+        self._accum = 0.0
@@ -0,0 +1,46 @@
+"""
+Validation levels for 2D game support.
+
+Every property setter in this package checks its argument with an assert.  This is very
+helpful while writing a game, but the checks are run every time an attribute like ``x``
+is set, which adds up when there are many objects on screen.  Running Python with ``-O``
+removes them, but it also removes every other assert in the program.
+
+This module provides a switch for just the checks in this package.  In ``'strict'`` mode
+(the default) every setter validates its argument.  In ``'fast'`` mode the setters that
+are used every animation frame (position, size, scale, angle, colors and sprite frames)
+skip validation, and simply trust their arguments.  Nothing else changes.
+
+The initial level may be set with the environment variable ``GAME2D_VALIDATION``.
+
+This module does not depend on Kivy, so it is shared by the headless backend.
+"""
+from os import environ as _environ
+
+# The validation levels
+LEVELS = ('strict','fast')
+
+# True if hot-path setters should validate their arguments
+STRICT = _environ.get('GAME2D_VALIDATION','strict') != 'fast'
+
+
+def get_validation():
+    """
+    Returns: the current validation level, either ``'strict'`` or ``'fast'``
+    """
+    return 'strict' if STRICT else 'fast'
+
+
+def set_validation(level):
+    """
+    Sets the validation level for property setters.
+
+    The level takes effect immediately, for every object (including those that have
+    already been created).
+
+    :param level: the validation level
+    :type level:  one of ``'strict'`` or ``'fast'``
+    """
+    global STRICT
+    assert level in LEVELS, '%s is not a valid validation level' % repr(level)
+    STRICT = level == 'strict'
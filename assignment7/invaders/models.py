@@ -74,19 +74,7 @@ class Ship(GSprite):
         Precondition: bolt is a Bolt object
         """
         if(bolt != None):
-            list = [bolt.x, bolt.y]
-            width = BOLT_WIDTH/2
-            height = BOLT_HEIGHT/2
-            if self.contains([list[0] + width, list[1]+height]):
-                return True
-            elif self.contains([list[0] - width, list[1]+height]):
-                return True
-            elif self.contains([list[0] + width, list[1]-height]):
-                return True
-            elif self.contains([list[0] + width, list[1]-height]):
-                return True
-            else:
-                return False
+            return self.intersects(bolt)
 
     # COROUTINE METHOD TO ANIMATE THE SHIP
     def _animate_ship(self,dt):
@@ -142,19 +130,7 @@ class Alien(GImage):
         Parameter: the laser bolts from the ship currently on screen
         Precondition: bolt is a Bolt object
         """
-        list = [bolt.x, bolt.y]
-        width = BOLT_WIDTH/2
-        height = BOLT_HEIGHT/2
-        if self.contains([list[0] + width, list[1]+height]):
-            return True
-        elif self.contains([list[0] - width, list[1]+height]):
-            return True
-        elif self.contains([list[0] + width, list[1]-height]):
-            return True
-        elif self.contains([list[0] + width, list[1]-height]):
-            return True
-        else:
-            return False
+        return self.intersects(bolt)
 
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
 
@@ -186,6 +162,8 @@ class Bolt(GRectangle):
     # Invariant: _velocity is an int or float
 
     # LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+    # Attribute _pooled: whether the bolt is waiting in a BoltPool to be reused
+    # Invariant: _pooled is a bool
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getVel(self):
@@ -201,6 +179,7 @@ class Bolt(GRectangle):
             self._velocity = BOLT_SPEED
         else:
             self._velocity = -BOLT_SPEED
+        self._pooled = False
         self._isPlayerBolt()
 
     def _isPlayerBolt(self):
@@ -212,6 +191,134 @@ class Bolt(GRectangle):
         else:
             return False
 
+    def _relaunch(self, x, y, where):
+        '''
+        Moves a used bolt to (x,y) and fires it again
+
+        Only the position and velocity change, so the canvas instructions
+        for this bolt are reused as they are.
+
+        Parameter x: The horizontal center of the bolt
+        Precondition: x is an int or float
+
+        Parameter y: The vertical center of the bolt
+        Precondition: y is an int or float
+
+        Parameter where: True if the bolt is fired by the player
+        Precondition: where is a boolean
+        '''
+        self.x = x
+        self.y = y
+        self._pooled = False
+        if(where == True):
+            self._velocity = BOLT_SPEED
+        else:
+            self._velocity = -BOLT_SPEED
+
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
 
 # IF YOU NEED ADDITIONAL MODEL CLASSES, THEY GO HERE
+class BoltPool(object):
+    """
+    A class to recycle Bolt objects.
+
+    Making a Bolt also makes all of its canvas instructions, and a bolt only
+    lives for a second or so.  Instead of throwing bolts away, Wave gives them
+    back to the pool with release.  The next call to acquire relaunches one of
+    these bolts instead of making a new one.  Once the pool has as many bolts
+    as are ever on screen at once, firing no longer allocates anything.
+
+    Every bolt in a pool has the same size and colors.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _free: the bolts that are not on screen
+    # Invariant: _free is a list of Bolt objects, possibly empty
+    #
+    # Attribute _made: the number of bolts this pool has made
+    # Invariant: _made is an int >= len(_free)
+    #
+    # Attribute _width: the width of every bolt
+    # Invariant: _width is an int or float > 0
+    #
+    # Attribute _height: the height of every bolt
+    # Invariant: _height is an int or float > 0
+    #
+    # Attribute _fillcolor: the fill color of every bolt
+    # Invariant: _fillcolor is a valid color
+    #
+    # Attribute _linecolor: the line color of every bolt
+    # Invariant: _linecolor is a valid color
+
+    # GETTERS
+    def getFree(self):
+        '''
+        Returns the number of bolts waiting to be reused
+        '''
+        return len(self._free)
+
+    def getMade(self):
+        '''
+        Returns the number of bolts this pool has made
+        '''
+        return self._made
+
+    # INITIALIZER
+    def __init__(self, width=BOLT_WIDTH, height=BOLT_HEIGHT,
+                 fillcolor='red', linecolor='black'):
+        '''
+        Initializes an empty pool of bolts with the given size and colors
+
+        Parameter width: The width of every bolt
+        Precondition: width is an int or float > 0
+
+        Parameter height: The height of every bolt
+        Precondition: height is an int or float > 0
+
+        Parameter fillcolor: The fill color of every bolt
+        Precondition: fillcolor is a valid color
+
+        Parameter linecolor: The line color of every bolt
+        Precondition: linecolor is a valid color
+        '''
+        assert type(width) in [int,float] and width > 0
+        assert type(height) in [int,float] and height > 0
+        self._free = []
+        self._made = 0
+        self._width = width
+        self._height = height
+        self._fillcolor = fillcolor
+        self._linecolor = linecolor
+
+    # PUBLIC METHODS
+    def acquire(self, x, y, where):
+        '''
+        Returns a bolt at (x,y), reusing a free bolt if there is one
+
+        Parameter x: The horizontal center of the bolt
+        Precondition: x is an int or float
+
+        Parameter y: The vertical center of the bolt
+        Precondition: y is an int or float
+
+        Parameter where: True if the bolt is fired by the player
+        Precondition: where is a boolean
+        '''
+        if len(self._free) == 0:
+            self._made += 1
+            return Bolt(x,y,self._width,self._height,
+                        self._fillcolor,self._linecolor,where)
+        bolt = self._free.pop()
+        bolt._relaunch(x,y,where)
+        return bolt
+
+    def release(self, bolt):
+        '''
+        Gives a bolt that is no longer on screen back to the pool
+
+        Parameter bolt: The bolt to recycle
+        Precondition: bolt is a Bolt from this pool that is not already free
+        '''
+        assert isinstance(bolt, Bolt)
+        assert not bolt._pooled
+        bolt._pooled = True
+        self._free.append(bolt)
@@ -0,0 +1,295 @@
+"""
+Replay module for Alien Invaders
+
+This module records a single wave of the game so that it can be played back
+exactly.  A wave is completely determined by the seed of its random number
+generator, its starting score and lives, and the input and time step given to
+every call of Wave.update.  A ReplayRecorder stores these in a compact binary
+log, and a ReplayPlayer feeds the log back through a new Wave.
+
+The log only stores the keys that Wave reads (REPLAY_KEYS).  Frames are run
+length encoded, so a long stretch with the same keys held down and the same
+time step takes the same space as a single frame.
+
+A log is in the run length encoded format of the input recordings of game2d
+(see encode_log in game2d/recording.py), with the magic bytes b'AIRP'.  The
+names of the log are the keys, and the rest of the header and each run are:
+
+    header: seed (int64), score (int64), lives (uint8)
+    run:    number of frames (uint32), key mask (uint8), dt (float64)
+
+Bit i of the key mask is set if key i is held down.  The top bit of the mask
+(RESPAWN_FLAG) marks a frame where the ship was respawned (Wave._respawn)
+before Wave.update was called.
+
+This module only uses the parts of game2d that do not depend on Kivy, so
+replays can be played back by the headless backend.
+"""
+from consts import *
+from game2d.recording import append_run, encode_log, decode_log
+import struct
+
+# The keys read by Wave, in the order of the bits of the key mask
+REPLAY_KEYS = ('left','right','up')
+
+# The bit of the key mask marking a frame that starts with a respawn
+RESPAWN_FLAG = 0x80
+
+# The magic bytes and version at the start of every log
+_MAGIC = b'AIRP'
+_VERSION = 2
+_HEADER = struct.Struct('<qqB')
+_RUN = struct.Struct('<IBd')
+
+
+class ReplayInput(object):
+    """
+    A class to stand in for GInput when a wave is played back.
+
+    Wave only asks whether keys are held down, so this class only needs the
+    set of keys held down in the current frame.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _keys: the keys held down in the current frame
+    # Invariant: _keys is a tuple of strings
+
+    # GETTERS
+    @property
+    def key_count(self):
+        '''
+        The number of keys held down in the current frame
+        '''
+        return len(self._keys)
+
+    @property
+    def keys(self):
+        '''
+        The keys held down in the current frame
+        '''
+        return self._keys
+
+    # INITIALIZER
+    def __init__(self, keys=()):
+        '''
+        Initializes the input with the given keys held down
+
+        Parameter keys: The keys held down
+        Precondition: keys is a tuple of strings
+        '''
+        self._keys = tuple(keys)
+
+    # PUBLIC METHODS
+    def is_key_down(self, key):
+        '''
+        Returns True if key is held down in the current frame
+
+        Parameter key: The key to check
+        Precondition: key is a string
+        '''
+        return key in self._keys
+
+
+class ReplayRecorder(object):
+    """
+    A class to record the input and time step of every frame of a wave.
+
+    Call record just before every call of Wave.update, with the same input and
+    dt, and call respawn whenever Wave._respawn is called.  The log is
+    returned by getData, or written to a file by save.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _seed: the seed of the wave being recorded
+    # Invariant: _seed is an int
+    #
+    # Attribute _score: the score at the start of the wave
+    # Invariant: _score is an int
+    #
+    # Attribute _lives: the lives at the start of the wave
+    # Invariant: _lives is an int >= 0
+    #
+    # Attribute _keys: the keys to record
+    # Invariant: _keys is a tuple of at most 7 strings
+    #
+    # Attribute _runs: the runs recorded so far, as [count, (mask, dt)] lists
+    # Invariant: _runs is a list; consecutive runs differ in mask or dt
+    #
+    # Attribute _respawn: whether the next frame starts with a respawn
+    # Invariant: _respawn is a boolean
+
+    # GETTERS
+    def getSeed(self):
+        '''
+        Returns the seed of the wave being recorded
+        '''
+        return self._seed
+
+    def getFrames(self):
+        '''
+        Returns the number of frames recorded so far
+        '''
+        return sum(run[0] for run in self._runs)
+
+    def getData(self):
+        '''
+        Returns the log recorded so far as bytes
+        '''
+        head = _HEADER.pack(self._seed, self._score, self._lives)
+        runs = [_RUN.pack(count, mask, dt) for count, (mask, dt) in self._runs]
+        return encode_log(_MAGIC, _VERSION, list(self._keys), head, runs)
+
+    # INITIALIZER
+    def __init__(self, wave, keys=REPLAY_KEYS):
+        '''
+        Initializes a recorder for a wave that has not been updated yet
+
+        Parameter wave: The wave to record
+        Precondition: wave is a Wave object with its starting score and lives
+
+        Parameter keys: The keys to record
+        Precondition: keys is a tuple of at most 7 strings
+        '''
+        assert type(keys) == tuple and len(keys) <= 7
+        self._seed = wave._getSeed()
+        self._score = wave._getScore()
+        self._lives = wave._getLives()
+        self._keys = keys
+        self._runs = []
+        self._respawn = False
+
+    # PUBLIC METHODS
+    def record(self, input, dt):
+        '''
+        Records the input and time step of a single frame
+
+        Parameter input: The user input for this frame
+        Precondition: input is an instance of GInput (or ReplayInput)
+
+        Parameter dt: The time in seconds since the last call to update
+        Precondition: dt is an int or float
+        '''
+        mask = RESPAWN_FLAG if self._respawn else 0
+        for bit in range(len(self._keys)):
+            if input.is_key_down(self._keys[bit]):
+                mask |= 1 << bit
+        self._respawn = False
+        append_run(self._runs, (mask, float(dt)))
+
+    def respawn(self):
+        '''
+        Records that the ship is respawned before the next frame
+        '''
+        self._respawn = True
+
+    def save(self, filename):
+        '''
+        Writes the log recorded so far to a file
+
+        Parameter filename: The file to write
+        Precondition: filename is a string naming a writable file
+        '''
+        with open(filename, 'wb') as file:
+            file.write(self.getData())
+
+
+class ReplayPlayer(object):
+    """
+    A class to play back a log made by ReplayRecorder.
+
+    Iterating over a player gives an (input, dt, respawn) triple for every
+    frame, where input is a ReplayInput.  The method play does all of this on
+    a wave, and makeWave creates a wave in the same starting state as the one
+    recorded.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _seed: the seed of the recorded wave
+    # Invariant: _seed is an int
+    #
+    # Attribute _score: the score at the start of the recorded wave
+    # Invariant: _score is an int
+    #
+    # Attribute _lives: the lives at the start of the recorded wave
+    # Invariant: _lives is an int >= 0
+    #
+    # Attribute _keys: the recorded keys
+    # Invariant: _keys is a tuple of strings
+    #
+    # Attribute _runs: the recorded runs, as (count, mask, dt) tuples
+    # Invariant: _runs is a list of tuples
+
+    # GETTERS
+    def getSeed(self):
+        '''
+        Returns the seed of the recorded wave
+        '''
+        return self._seed
+
+    def getFrames(self):
+        '''
+        Returns the number of recorded frames
+        '''
+        return sum(run[0] for run in self._runs)
+
+    # INITIALIZER
+    def __init__(self, data):
+        '''
+        Initializes a player for the given log
+
+        Parameter data: The log to play back
+        Precondition: data is a bytes object made by ReplayRecorder.getData
+        '''
+        keys, pos = decode_log(data, _MAGIC, _VERSION)
+        self._seed, self._score, self._lives = _HEADER.unpack_from(data, pos)
+        self._keys = tuple(keys)
+        self._runs = list(_RUN.iter_unpack(data[pos+_HEADER.size:]))
+
+    def __iter__(self):
+        '''
+        Yields an (input, dt, respawn) triple for every recorded frame
+        '''
+        for count, mask, dt in self._runs:
+            input = ReplayInput([self._keys[bit] for bit in range(len(self._keys))
+                                 if mask & (1 << bit)])
+            respawn = mask & RESPAWN_FLAG != 0
+            for _ in range(count):
+                yield (input, dt, respawn)
+
+    # PUBLIC METHODS
+    def makeWave(self, **keywords):
+        '''
+        Returns a new wave in the same starting state as the recorded one
+
+        Parameter keywords: Any other arguments for the Wave initializer
+        Precondition: keywords are valid keyword arguments for Wave
+        '''
+        from wave import Wave
+        wave = Wave(seed=self._seed, **keywords)
+        wave._setScore(self._score)
+        wave._setLives(self._lives)
+        return wave
+
+    def play(self, wave=None):
+        '''
+        Feeds every recorded frame through Wave.update, and returns the wave
+
+        Parameter wave: The wave to update (a new one from makeWave if None)
+        Precondition: wave is a Wave object in the recorded starting state,
+        or None
+        '''
+        if wave is None:
+            wave = self.makeWave()
+        for input, dt, respawn in self:
+            if respawn:
+                wave._respawn()
+            wave.update(input, dt)
+        return wave
+
+
+def load(filename):
+    '''
+    Returns a ReplayPlayer for the log in the given file
+
+    Parameter filename: The file to read
+    Precondition: filename is a string naming a log made by ReplayRecorder
+    '''
+    with open(filename, 'rb') as file:
+        return ReplayPlayer(file.read())
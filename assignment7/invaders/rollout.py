@@ -0,0 +1,248 @@
+"""
+Rollout module for Alien Invaders
+
+This module plays many complete games of Alien Invaders without a window, and
+spreads them over every CPU core.  Each game is played the same way as in
+Invaders: a new wave (with the same score and lives) whenever the aliens are
+all dead, a respawn after every lost life, and game over when the lives run
+out or the aliens reach the defense line.  The keys for each frame come from a
+policy, a function that looks at the wave and returns the keys to hold down.
+
+A game is determined by its seed, its policy and its configuration.  The seed
+gives the seed of every wave and the random numbers of the policy.  The
+configuration is a dictionary of values to use in place of those in consts.py,
+such as {'ALIEN_ROWS': 3, 'ALIEN_SPEED': 0.5}.  This makes it easy to sweep
+over different settings, as in
+
+    for result in sweep([{'ALIEN_SPEED': 1.0}, {'ALIEN_SPEED': 0.5}], 100):
+        print(result)
+
+The games are played in worker processes, and each result is sent back over
+a pipe as soon as its game is over.  A result is a dictionary with the keys
+'index', 'seed', 'config', 'score', 'lives', 'waves' (the waves cleared) and
+'frames' (the frames survived).
+
+The workers always use the headless version of game2d.  Run this module as a
+script to time a batch of games:
+
+    python rollout.py --games 32 --processes 4
+"""
+import os
+import random
+import multiprocessing
+
+# The most frames in a single game (about 15 minutes at 60 fps)
+MAX_FRAMES = 60*60*15
+
+# The modules that import the constants in consts.py (with from consts import *)
+_MODULES = ('consts','models','spatial','formation','wave','app')
+
+# The original values of every constant changed by a configuration
+_DEFAULTS = {}
+
+
+def randomPolicy(wave, rng):
+    '''
+    Returns the keys for a player that always fires and wanders at random
+
+    Parameter wave: The wave being played
+    Precondition: wave is a Wave object
+
+    Parameter rng: The random numbers of the game
+    Precondition: rng is a random.Random object
+    '''
+    return rng.choice((('left','up'),('right','up'),('up',)))
+
+
+def playGame(seed, config=None, policy=randomPolicy, maxframes=MAX_FRAMES,
+             dt=1/60, index=None):
+    '''
+    Returns the result of a complete game, played in this process
+
+    This process must use the headless version of game2d, unless a window
+    has already been made.
+
+    Parameter seed: The seed of the game
+    Precondition: seed is an int
+
+    Parameter config: The values to use in place of those in consts.py
+    Precondition: config is a dictionary mapping names in consts.py to values,
+    or None
+
+    Parameter policy: The function giving the keys for each frame
+    Precondition: policy is a function taking a Wave and a random.Random, and
+    returning a sequence of key names
+
+    Parameter maxframes: The most frames to play
+    Precondition: maxframes is an int > 0
+
+    Parameter dt: The time step of every frame
+    Precondition: dt is an int or float > 0
+
+    Parameter index: A number to identify the game in the result
+    Precondition: index is any value
+    '''
+    configure(config)
+    from wave import Wave
+    from models import BoltPool
+    from replay import ReplayInput
+
+    rng = random.Random(seed)
+    pool = BoltPool()
+    wave = Wave(pool=pool, seed=rng.randrange(2**32))
+    frames = 0
+    cleared = 0
+    while frames < maxframes:
+        if wave._getPaused():
+            if wave._getLives() == 0:
+                break
+            wave._respawn()
+        wave.update(ReplayInput(policy(wave, rng)), dt)
+        frames += 1
+        if wave._allAlienDead():
+            cleared += 1
+            if wave._getLives() == 0:
+                break
+            score = wave._getScore()
+            lives = wave._getLives()
+            wave._clearBolts()
+            wave = Wave(pool=pool, seed=rng.randrange(2**32))
+            wave._setScore(score)
+            wave._setLives(lives)
+        elif wave._alienReachDline():
+            break
+
+    return {'index': index, 'seed': seed, 'config': config,
+            'score': wave._getScore(), 'lives': wave._getLives(),
+            'waves': cleared, 'frames': frames}
+
+
+def run(games, processes=None, chunksize=1):
+    '''
+    Plays the given games in worker processes, yielding each result as its
+    game is over
+
+    The results are in the order that the games finish, not the order they
+    are given; use the 'index' of each result to match them up.  If processes
+    is 1, the games are played in this process instead.
+
+    Parameter games: The games to play
+    Precondition: games is an iterable of dictionaries of keyword arguments
+    for playGame
+
+    Parameter processes: The number of workers (one per CPU if None)
+    Precondition: processes is an int > 0 or None
+
+    Parameter chunksize: The number of games sent to a worker at a time
+    Precondition: chunksize is an int > 0
+    '''
+    if processes == 1:
+        _startWorker()
+        for game in games:
+            yield _playKeywords(game)
+        return
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes, initializer=_startWorker) as workers:
+        for result in workers.imap_unordered(_playKeywords, games, chunksize):
+            yield result
+
+
+def sweep(configs, games, seed=0, processes=None, **keywords):
+    '''
+    Plays games games with every configuration, yielding each result as its
+    game is over
+
+    Every configuration is played with the same seeds, so the results of the
+    configurations can be compared game by game.  The 'index' of each result
+    is the pair (configuration number, game number).
+
+    Parameter configs: The configurations to play
+    Precondition: configs is a sequence of dictionaries mapping names in
+    consts.py to values
+
+    Parameter games: The number of games for each configuration
+    Precondition: games is an int >= 0
+
+    Parameter seed: The seed that picks the seeds of the games
+    Precondition: seed is an int
+
+    Parameter processes: The number of workers (one per CPU if None)
+    Precondition: processes is an int > 0 or None
+
+    Parameter keywords: Any other arguments for playGame
+    Precondition: keywords are valid keyword arguments for playGame
+    '''
+    rng = random.Random(seed)
+    seeds = [rng.randrange(2**32) for _ in range(games)]
+    jobs = []
+    for pos in range(len(configs)):
+        for game in range(games):
+            job = dict(keywords)
+            job.update(seed=seeds[game], config=configs[pos], index=(pos,game))
+            jobs.append(job)
+    return run(jobs, processes)
+
+
+def configure(config):
+    '''
+    Changes the constants of every game module to match config
+
+    Any constant changed by an earlier configuration, but not by this one, is
+    put back to its value in consts.py.  This is done for each game by
+    playGame, but may be used on its own to make a Wave with other settings.
+
+    Parameter config: The values to use in place of those in consts.py
+    Precondition: config is a dictionary mapping names in consts.py to values,
+    or None
+    '''
+    import sys
+    import consts
+    config = {} if config is None else config
+    for name in config:
+        assert hasattr(consts, name), '%s is not a constant in consts.py' % name
+        if not name in _DEFAULTS:
+            _DEFAULTS[name] = getattr(consts, name)
+    for name in _DEFAULTS:
+        value = config[name] if name in config else _DEFAULTS[name]
+        for module in _MODULES:
+            if module in sys.modules and hasattr(sys.modules[module], name):
+                setattr(sys.modules[module], name, value)
+
+
+def _startWorker():
+    '''
+    Selects the headless version of game2d for this process
+    '''
+    os.environ['GAME2D_HEADLESS'] = '1'
+
+
+def _playKeywords(keywords):
+    '''
+    Returns the result of playGame with the given keyword arguments
+
+    Parameter keywords: The arguments for playGame
+    Precondition: keywords is a dictionary of valid keyword arguments
+    '''
+    return playGame(**keywords)
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    import time
+    parser = argparse.ArgumentParser(description='Time a batch of games')
+    parser.add_argument('--games', type=int, default=32)
+    parser.add_argument('--processes', type=int, default=None)
+    options = parser.parse_args()
+    # consts.py reads numbers from the command line, so hide these options
+    sys.argv = sys.argv[:1]
+    games = options.games
+    start = time.perf_counter()
+    results = list(sweep([{}], games, processes=options.processes))
+    elapsed = time.perf_counter()-start
+    frames = sum(result['frames'] for result in results)
+    print('%d games, %d frames in %.1fs (%.0f frames/s)' %
+          (games, frames, elapsed, frames/elapsed))
+    print('mean score %.1f, mean waves cleared %.2f' %
+          (sum(result['score'] for result in results)/games,
+           sum(result['waves'] for result in results)/games))
@@ -0,0 +1,177 @@
+"""
+Spatial hashing module for Alien Invaders
+
+This module contains a uniform grid that Wave uses as a broadphase for its
+collision checks.  Instead of testing every bolt against every alien, Wave
+only tests a bolt against the aliens stored in the grid cells that the bolt
+overlaps.  The exact (narrowphase) test is still done by the models.
+
+The grid stores keys, such as (row,col) pairs, and not the objects themselves.
+Hence this module does not need to import anything other than consts.py.
+"""
+from consts import *
+import math
+
+
+class SpatialHash(object):
+    """
+    A class representing a uniform grid of cells over the game window.
+
+    Every key in the grid has an axis-aligned box.  The key is stored in each
+    cell that this box overlaps.  To find the keys that may overlap another box,
+    use the method query.  It only looks at the cells overlapped by that box.
+
+    When the box for a key changes, use the method move.  It only touches the
+    cells when the key actually changes cells, so moving a key a few pixels is
+    usually just a dictionary lookup.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _width: the width of a single grid cell
+    # Invariant: _width is an int or float > 0
+    #
+    # Attribute _height: the height of a single grid cell
+    # Invariant: _height is an int or float > 0
+    #
+    # Attribute _cells: the keys stored in each occupied cell
+    # Invariant: _cells is a dict mapping (int,int) cell pairs to nonempty sets
+    #
+    # Attribute _spans: the range of cells occupied by each key
+    # Invariant: _spans is a dict mapping keys to (c0,r0,c1,r1) tuples of ints
+
+    # INITIALIZER
+    def __init__(self, width, height):
+        '''
+        Initializes an empty grid with cells of the given size
+
+        Parameter width: The width of a grid cell
+        Precondition: width is an int or float > 0
+
+        Parameter height: The height of a grid cell
+        Precondition: height is an int or float > 0
+        '''
+        assert type(width) in [int,float] and width > 0
+        assert type(height) in [int,float] and height > 0
+        self._width = width
+        self._height = height
+        self._cells = {}
+        self._spans = {}
+
+    def __len__(self):
+        '''
+        Returns the number of keys stored in this grid
+        '''
+        return len(self._spans)
+
+    def __contains__(self, key):
+        '''
+        Returns True if key is stored in this grid
+        '''
+        return key in self._spans
+
+    # PUBLIC METHODS
+    def insert(self, key, left, bottom, right, top):
+        '''
+        Adds key to every cell overlapped by the given box
+
+        If key is already in the grid, this is the same as calling move.
+
+        Parameter key: The key to store
+        Precondition: key is hashable and can be compared to other keys
+
+        Parameter left, bottom, right, top: The edges of the box
+        Precondition: each edge is an int or float, left <= right, bottom <= top
+        '''
+        if key in self._spans:
+            self.move(key, left, bottom, right, top)
+            return
+        span = self._span(left, bottom, right, top)
+        self._spans[key] = span
+        self._add(key, span)
+
+    def move(self, key, left, bottom, right, top):
+        '''
+        Updates the cells for key after its box has changed
+
+        Parameter key: The key to move
+        Precondition: key is stored in this grid
+
+        Parameter left, bottom, right, top: The new edges of the box
+        Precondition: each edge is an int or float, left <= right, bottom <= top
+        '''
+        span = self._span(left, bottom, right, top)
+        old = self._spans[key]
+        if span != old:
+            self._discard(key, old)
+            self._spans[key] = span
+            self._add(key, span)
+
+    def remove(self, key):
+        '''
+        Removes key from the grid, if it is present
+
+        Parameter key: The key to remove
+        Precondition: key is hashable
+        '''
+        if key in self._spans:
+            self._discard(key, self._spans.pop(key))
+
+    def clear(self):
+        '''
+        Removes every key from the grid
+        '''
+        self._cells.clear()
+        self._spans.clear()
+
+    def query(self, left, bottom, right, top):
+        '''
+        Returns a sorted list of the keys in the cells overlapped by the box
+
+        The result is a superset of the keys whose boxes overlap the given box.
+        The keys are sorted so that callers see them in a predictable order
+        (for (row,col) keys, this is row-major order).
+
+        Parameter left, bottom, right, top: The edges of the box
+        Precondition: each edge is an int or float, left <= right, bottom <= top
+        '''
+        c0, r0, c1, r1 = self._span(left, bottom, right, top)
+        found = set()
+        for c in range(c0, c1+1):
+            for r in range(r0, r1+1):
+                cell = self._cells.get((c,r))
+                if cell:
+                    found.update(cell)
+        return sorted(found)
+
+    # HELPER METHODS
+    def _span(self, left, bottom, right, top):
+        '''
+        Returns the (c0,r0,c1,r1) range of cells overlapped by the box
+        '''
+        return (math.floor(left/self._width), math.floor(bottom/self._height),
+                math.floor(right/self._width), math.floor(top/self._height))
+
+    def _add(self, key, span):
+        '''
+        Adds key to every cell in span
+        '''
+        c0, r0, c1, r1 = span
+        for c in range(c0, c1+1):
+            for r in range(r0, r1+1):
+                cell = self._cells.get((c,r))
+                if cell is None:
+                    self._cells[(c,r)] = {key}
+                else:
+                    cell.add(key)
+
+    def _discard(self, key, span):
+        '''
+        Removes key from every cell in span, dropping any cell left empty
+        '''
+        c0, r0, c1, r1 = span
+        for c in range(c0, c1+1):
+            for r in range(r0, r1+1):
+                cell = self._cells.get((c,r))
+                if cell is not None:
+                    cell.discard(key)
+                    if not cell:
+                        del self._cells[(c,r)]
@@ -0,0 +1,527 @@
+"""
+Vectorized simulator module for Alien Invaders
+
+This module contains a simulator that plays many independent waves at once,
+for training automated players.  Instead of a Wave with its own Ship, Alien
+and Bolt objects, every part of every wave is a row of a NumPy array, and each
+call of step advances all of the waves together.
+
+The rules are those of Wave.update with ALIEN_ARRAYS on: the ship moves and
+fires one bolt at a time, the aliens march back and forth every ALIEN_SPEED
+seconds (dropping ALIEN_V_WALK at each edge), a random bottom alien fires
+after a random number (1 to BOLT_RATE) of marches, bolts move BOLT_SPEED
+each frame, and aliens are scored by row.  Even the quirks of Wave are kept:
+only the first bolt on screen is checked against the ship, and the bolt after
+one that leaves the screen does not move that frame.  The only difference is
+that the random numbers come from NumPy, so a wave here does not follow the
+same random sequence as a Wave with the same seed.  The script
+benchmarks/parity.py gives both the same random draws, and checks that they
+play every frame the same way.
+
+The interface is modelled on the vector environments of gym.  Every wave is
+in its own episode, which ends when the aliens are all dead, they reach the
+defense line, or the ship runs out of lives.  A lost life is followed by a
+respawn at the start of the next step, like pressing 'C' in Invaders.
+
+This module does not depend on Kivy or game2d, but it requires NumPy.
+"""
+from consts import *
+import numpy as np
+
+
+class VecWave(object):
+    """
+    A class to simulate many waves of Alien Invaders at once.
+
+    Call reset to start every wave, and then step with one action per wave.
+    An action is an index into ACTIONS, the keys held down for that frame.
+    Each call of step returns (observations, rewards, dones, info) like a gym
+    vector environment:
+
+        observations: a float32 array with one row of OBS_SIZE values per wave
+        rewards:      the points scored by each wave this step
+        dones:        True for each wave whose episode ended this step
+        info:         a dictionary with the final 'score' and 'lives' of each
+                      wave, and whether it was 'cleared' of aliens
+
+    A wave that is done is reset straight away, so its observation is the
+    start of its next episode.
+
+    An observation is the ship position and lives, the alien formation offset,
+    the alive mask of the formation (row by row), and then MAX_BOLTS bolts as
+    (x, y, player, live), in the order they were fired.
+    """
+    # The keys held down for each action
+    ACTIONS = ((), ('left',), ('right',), ('up',), ('left','up'), ('right','up'))
+
+    # The most bolts on screen in a single wave; any more are not fired
+    MAX_BOLTS = 16
+
+    # The number of values in the observation of a single wave
+    OBS_SIZE = 5+ALIEN_ROWS*ALIENS_IN_ROW+4*MAX_BOLTS
+
+    # HIDDEN ATTRIBUTES:
+    # Attribute _num: the number of waves
+    # Invariant: _num is an int > 0
+    #
+    # Attribute _dt: the time step of every frame
+    # Invariant: _dt is a float > 0
+    #
+    # Attribute _rng: the random numbers for every wave
+    # Invariant: _rng is a NumPy Generator
+    #
+    # Attribute _basex: the starting horizontal position of each column
+    # Invariant: _basex is a 1d float array of length ALIENS_IN_ROW
+    #
+    # Attribute _basey: the starting vertical position of each row
+    # Invariant: _basey is a 1d float array of length ALIEN_ROWS
+    #
+    # Attribute _points: the score of an alien in each row
+    # Invariant: _points is a 1d int array of length ALIEN_ROWS
+    #
+    # Attribute _alive: whether each alien of each wave is alive
+    # Invariant: _alive is a bool array of shape (_num,ALIEN_ROWS,ALIENS_IN_ROW)
+    #
+    # Attribute _dx: the horizontal offset of each formation
+    # Invariant: _dx is a float array of length _num
+    #
+    # Attribute _dy: the vertical offset of each formation
+    # Invariant: _dy is a float array of length _num
+    #
+    # Attribute _right: whether each formation is marching to the right
+    # Invariant: _right is a bool array of length _num
+    #
+    # Attribute _time: the time since the last march of each formation
+    # Invariant: _time is a float array of length _num
+    #
+    # Attribute _steps: the marches since each formation last fired
+    # Invariant: _steps is an int array of length _num
+    #
+    # Attribute _numsteps: the marches before each formation fires again
+    # Invariant: _numsteps is an int array of length _num, with values from 1
+    # to BOLT_RATE
+    #
+    # Attribute _shipx: the horizontal position of each ship
+    # Invariant: _shipx is a float array of length _num
+    #
+    # Attribute _paused: whether each wave has lost its ship (there is a ship
+    # exactly when the wave is not paused)
+    # Invariant: _paused is a bool array of length _num
+    #
+    # Attribute _explode: whether each ship has been hit
+    # Invariant: _explode is a bool array of length _num
+    #
+    # Attribute _animating: whether each ship is exploding
+    # Invariant: _animating is a bool array of length _num
+    #
+    # Attribute _deathtime: the time each ship has been exploding
+    # Invariant: _deathtime is a float array of length _num
+    #
+    # Attribute _lives: the lives left in each wave
+    # Invariant: _lives is an int array of length _num
+    #
+    # Attribute _score: the score of each wave
+    # Invariant: _score is an int array of length _num
+    #
+    # Attribute _boltx: the horizontal position of each bolt
+    # Invariant: _boltx is a float array of shape (_num,MAX_BOLTS)
+    #
+    # Attribute _bolty: the vertical position of each bolt
+    # Invariant: _bolty is a float array of shape (_num,MAX_BOLTS)
+    #
+    # Attribute _boltp: whether each bolt was fired by the player
+    # Invariant: _boltp is a bool array of shape (_num,MAX_BOLTS)
+    #
+    # Attribute _nbolts: the number of bolts in each wave; the bolts of a wave
+    # are the first _nbolts entries of its row, in the order they were fired
+    # Invariant: _nbolts is an int array of length _num, from 0 to MAX_BOLTS
+
+    # GETTERS
+    def getNum(self):
+        '''
+        Returns the number of waves
+        '''
+        return self._num
+
+    def getScore(self):
+        '''
+        Returns a copy of the score of each wave
+        '''
+        return self._score.copy()
+
+    def getLives(self):
+        '''
+        Returns a copy of the lives left in each wave
+        '''
+        return self._lives.copy()
+
+    # INITIALIZER
+    def __init__(self, num, dt=1/60, seed=None):
+        '''
+        Initializes num waves, which must be reset before they are stepped
+
+        Parameter num: The number of waves
+        Precondition: num is an int > 0
+
+        Parameter dt: The time step of every frame
+        Precondition: dt is an int or float > 0
+
+        Parameter seed: The seed for the random numbers (a random one if None)
+        Precondition: seed is an int >= 0 or None
+        '''
+        assert type(num) == int and num > 0
+        assert type(dt) in [int,float] and dt > 0
+        self._num = num
+        self._dt = dt
+        self._rng = np.random.default_rng(seed)
+
+        col = np.arange(ALIENS_IN_ROW)
+        row = np.arange(ALIEN_ROWS)
+        self._basex = (ALIEN_H_SEP+ALIEN_WIDTH+ALIEN_H_SEP+
+                       col*(ALIEN_H_SEP+ALIEN_WIDTH)).astype(float)
+        self._basey = (GAME_HEIGHT-ALIEN_CEILING-
+                       row*(ALIEN_HEIGHT+ALIEN_V_SEP)).astype(float)
+        self._points = np.where(row % ALIENS_IN_ROW == 0, ALIENS_IN_ROW,
+                                row % ALIENS_IN_ROW)*10
+
+        shape = (num, ALIEN_ROWS, ALIENS_IN_ROW)
+        self._alive = np.ones(shape, dtype=bool)
+        self._dx = np.zeros(num)
+        self._dy = np.zeros(num)
+        self._right = np.ones(num, dtype=bool)
+        self._time = np.zeros(num)
+        self._steps = np.zeros(num, dtype=int)
+        self._numsteps = np.ones(num, dtype=int)
+        self._shipx = np.zeros(num)
+        self._paused = np.zeros(num, dtype=bool)
+        self._explode = np.zeros(num, dtype=bool)
+        self._animating = np.zeros(num, dtype=bool)
+        self._deathtime = np.zeros(num)
+        self._lives = np.zeros(num, dtype=int)
+        self._score = np.zeros(num, dtype=np.int64)
+        self._boltx = np.zeros((num, self.MAX_BOLTS))
+        self._bolty = np.zeros((num, self.MAX_BOLTS))
+        self._boltp = np.zeros((num, self.MAX_BOLTS), dtype=bool)
+        self._nbolts = np.zeros(num, dtype=int)
+
+    # PUBLIC METHODS
+    def reset(self):
+        '''
+        Starts a new episode in every wave, and returns the observations
+        '''
+        self._resetWaves(np.ones(self._num, dtype=bool))
+        return self.observe()
+
+    def step(self, actions):
+        '''
+        Advances every wave by one frame, and returns the results
+
+        The result is the tuple (observations, rewards, dones, info)
+        described in the class specification.
+
+        Parameter actions: The action of each wave
+        Precondition: actions is a sequence of _num ints, indices of ACTIONS
+        '''
+        actions = np.asarray(actions)
+        assert actions.shape == (self._num,)
+        left = (actions == 1) | (actions == 4)
+        right = (actions == 2) | (actions == 5)
+        up = actions >= 3
+        before = self._score.copy()
+
+        # A lost life respawns the ship, as in Invaders._continueGame
+        respawn = self._paused & (self._lives > 0)
+        self._paused[respawn] = False
+        self._explode[respawn] = False
+        self._shipx[respawn] = GAME_WIDTH/2
+
+        active = ~self._animating
+        self._moveShips(active & ~self._paused, left, right)
+        self._updateAliens(active)
+        self._fireShips(up & ~self._paused)
+        self._moveBolts()
+        self._shipCollisions()
+        self._alienCollisions()
+        self._animateShips()
+
+        cleared = ~self._alive.any(axis=(1,2))
+        dones = cleared | self._reachedLine() | (self._paused & (self._lives == 0))
+        info = {'score': self._score.copy(), 'lives': self._lives.copy(),
+                'cleared': cleared}
+        rewards = (self._score-before).astype(np.float32)
+        if dones.any():
+            self._resetWaves(dones)
+        return (self.observe(), rewards, dones, info)
+
+    def observe(self):
+        '''
+        Returns the observations of every wave as a float32 array
+        '''
+        live = np.arange(self.MAX_BOLTS) < self._nbolts[:,None]
+        bolts = np.stack([self._boltx, self._bolty, self._boltp, live], axis=2)
+        return np.concatenate([
+            np.stack([self._shipx, ~self._paused, self._lives,
+                      self._dx, self._dy], axis=1),
+            self._alive.reshape(self._num, -1),
+            np.where(live[:,:,None], bolts, 0).reshape(self._num, -1)],
+            axis=1).astype(np.float32)
+
+    # HELPER METHODS
+    def _resetWaves(self, mask):
+        '''
+        Starts a new episode in each wave where mask is True
+
+        Parameter mask: The waves to reset
+        Precondition: mask is a bool array of length _num
+        '''
+        count = int(mask.sum())
+        self._alive[mask] = True
+        self._dx[mask] = 0.0
+        self._dy[mask] = 0.0
+        self._right[mask] = True
+        self._time[mask] = 0.0
+        self._steps[mask] = 0
+        self._numsteps[mask] = self._rng.integers(1, BOLT_RATE+1, size=count)
+        self._shipx[mask] = GAME_WIDTH/2
+        self._paused[mask] = False
+        self._explode[mask] = False
+        self._animating[mask] = False
+        self._deathtime[mask] = 0.0
+        self._lives[mask] = SHIP_LIVES
+        self._score[mask] = 0
+        self._nbolts[mask] = 0
+
+    def _moveShips(self, mask, left, right):
+        '''
+        Moves the ships where mask is True, as in Wave._move
+
+        Parameter mask: The waves whose ship can move
+        Precondition: mask is a bool array of length _num
+
+        Parameter left: Whether each wave is moving left
+        Precondition: left is a bool array of length _num
+
+        Parameter right: Whether each wave is moving right
+        Precondition: right is a bool array of length _num
+        '''
+        go = mask & left & (self._shipx > SHIP_WIDTH/2)
+        self._shipx[go] -= SHIP_MOVEMENT
+        go = mask & right & (self._shipx < GAME_WIDTH-SHIP_WIDTH/2)
+        self._shipx[go] += SHIP_MOVEMENT
+
+    def _updateAliens(self, mask):
+        '''
+        Advances the alien timers where mask is True, marching and firing if
+        it is time, as in Wave._updateAlien
+
+        Parameter mask: The waves whose aliens can move
+        Precondition: mask is a bool array of length _num
+        '''
+        wait = mask & (self._time < ALIEN_SPEED)
+        self._time[wait] += self._dt
+        march = mask & ~wait & self._alive.any(axis=(1,2))
+        if not march.any():
+            return
+        self._time[march] = 0
+
+        # The edge columns, as in Wave._movea
+        cols = self._alive.any(axis=1)
+        last = ALIENS_IN_ROW-1-np.argmax(cols[:,::-1], axis=1)
+        first = np.argmax(cols, axis=1)
+        lastx = self._basex[last]+self._dx
+        firstx = self._basex[first]+self._dx
+        right = march & self._right
+        left = march & ~self._right
+        stepr = right & (lastx + ALIEN_H_WALK + ALIEN_WIDTH/2 < GAME_WIDTH)
+        stepl = left & (firstx - ALIEN_H_WALK - ALIEN_WIDTH/2 > 0)
+        drop = (right & ~stepr) | (left & ~stepl)
+        self._dx[stepr] += ALIEN_H_WALK
+        self._dx[stepl] -= ALIEN_H_WALK
+        self._dy[drop] -= ALIEN_V_WALK
+        self._right[drop] = ~self._right[drop]
+
+        # Firing, as in Wave._firealiens
+        fire = march & (self._steps == self._numsteps)
+        self._steps[march & ~fire] += 1
+        self._steps[fire] = 0
+        if fire.any():
+            self._fireAliens(fire, cols)
+
+    def _fireAliens(self, mask, cols):
+        '''
+        Fires a bolt from a random bottom alien where mask is True, as in
+        Wave._alientofire
+
+        Parameter mask: The waves that fire
+        Precondition: mask is a bool array of length _num
+
+        Parameter cols: Whether each column of each wave has a live alien
+        Precondition: cols is a bool array of shape (_num,ALIENS_IN_ROW)
+        '''
+        waves = np.nonzero(mask)[0]
+        count = len(waves)
+        live = cols[waves]
+        pick = (self._rng.random(count)*live.sum(axis=1)).astype(int)
+        col = np.argmax(np.cumsum(live, axis=1) > pick[:,None], axis=1)
+        column = self._alive[waves,:,col]
+        row = ALIEN_ROWS-1-np.argmax(column[:,::-1], axis=1)
+        self._addBolts(waves, self._basex[col]+self._dx[waves],
+                       self._basey[row]+self._dy[waves], False)
+        self._numsteps[waves] = self._rng.integers(1, BOLT_RATE+1, size=count)
+
+    def _fireShips(self, mask):
+        '''
+        Fires a bolt from the ship where mask is True, unless there is already
+        a player bolt, as in Wave._moveb
+
+        Parameter mask: The waves whose ship fires
+        Precondition: mask is a bool array of length _num
+        '''
+        live = np.arange(self.MAX_BOLTS) < self._nbolts[:,None]
+        mask = mask & ~(self._boltp & live).any(axis=1)
+        waves = np.nonzero(mask)[0]
+        if len(waves) > 0:
+            self._addBolts(waves, self._shipx[waves], SHIP_BOTTOM+SHIP_HEIGHT/2, True)
+
+    def _addBolts(self, waves, x, y, player):
+        '''
+        Adds a bolt to the end of the bolts of each of the given waves
+
+        A wave that already has MAX_BOLTS bolts does not get a new one.
+
+        Parameter waves: The waves to add a bolt to
+        Precondition: waves is an int array of distinct wave indices
+
+        Parameter x: The horizontal position of each new bolt
+        Precondition: x is a float array with one value per wave in waves
+
+        Parameter y: The vertical position of each new bolt
+        Precondition: y is a float or a float array like x
+
+        Parameter player: Whether the bolts are fired by the player
+        Precondition: player is a boolean
+        '''
+        slot = self._nbolts[waves]
+        room = slot < self.MAX_BOLTS
+        waves = waves[room]
+        slot = slot[room]
+        self._boltx[waves,slot] = np.asarray(x)[room]
+        self._bolty[waves,slot] = np.broadcast_to(y, room.shape)[room]
+        self._boltp[waves,slot] = player
+        self._nbolts[waves] += 1
+
+    def _moveBolts(self):
+        '''
+        Moves the bolts and removes those off screen, as in Wave._makeanddelete
+
+        Wave walks through its list of bolts, deleting as it goes, so the
+        bolt after a deleted one is skipped.  This does the same.
+        '''
+        limit = int(self._nbolts.max())
+        gone = np.zeros((self._num, self.MAX_BOLTS), dtype=bool)
+        skip = np.zeros(self._num, dtype=bool)
+        for slot in range(limit):
+            look = (slot < self._nbolts) & ~skip
+            y = self._bolty[:,slot]
+            player = self._boltp[:,slot]
+            off = look & np.where(player, y - BOLT_HEIGHT/2 > GAME_HEIGHT,
+                                  y + BOLT_HEIGHT/2 < 0)
+            move = look & ~off
+            self._bolty[:,slot] = np.where(move, np.where(player, y+BOLT_SPEED,
+                                                          y-BOLT_SPEED), y)
+            gone[:,slot] = off
+            skip = off
+        if gone.any():
+            self._removeBolts(gone)
+
+    def _removeBolts(self, gone):
+        '''
+        Removes the given bolts, keeping the others in order
+
+        Parameter gone: The bolts to remove
+        Precondition: gone is a bool array of shape (_num,MAX_BOLTS), only
+        True for live bolts
+        '''
+        order = np.argsort(gone, axis=1, kind='stable')
+        self._boltx = np.take_along_axis(self._boltx, order, axis=1)
+        self._bolty = np.take_along_axis(self._bolty, order, axis=1)
+        self._boltp = np.take_along_axis(self._boltp, order, axis=1)
+        self._nbolts -= gone.sum(axis=1)
+
+    def _shipCollisions(self):
+        '''
+        Checks the first bolt of each wave against its ship, as in
+        Wave._scollision
+        '''
+        x = self._boltx[:,0]
+        y = self._bolty[:,0]
+        hit = ((self._nbolts > 0) & ~self._boltp[:,0] & ~self._paused &
+               (self._shipx - SHIP_WIDTH/2 < x + BOLT_WIDTH/2) &
+               (x - BOLT_WIDTH/2 < self._shipx + SHIP_WIDTH/2) &
+               (SHIP_BOTTOM - SHIP_HEIGHT/2 < y + BOLT_HEIGHT/2) &
+               (y - BOLT_HEIGHT/2 < SHIP_BOTTOM + SHIP_HEIGHT/2))
+        if hit.any():
+            self._explode[hit] = True
+            gone = np.zeros((self._num, self.MAX_BOLTS), dtype=bool)
+            gone[:,0] = hit
+            self._removeBolts(gone)
+
+    def _alienCollisions(self):
+        '''
+        Checks the player bolt of each wave against its aliens, killing the
+        first alien hit in row-major order, as in Wave._acollision
+        '''
+        live = np.arange(self.MAX_BOLTS) < self._nbolts[:,None]
+        player = self._boltp & live
+        waves = np.nonzero(player.any(axis=1))[0]
+        if len(waves) == 0:
+            return
+        slot = np.argmax(player[waves], axis=1)
+        x = self._boltx[waves,slot]
+        y = self._bolty[waves,slot]
+        ax = self._basex[None,:]+self._dx[waves,None]
+        ay = self._basey[None,:]+self._dy[waves,None]
+        cols = (ax - ALIEN_WIDTH/2 < (x + BOLT_WIDTH/2)[:,None]) & \
+               ((x - BOLT_WIDTH/2)[:,None] < ax + ALIEN_WIDTH/2)
+        rows = (ay - ALIEN_HEIGHT/2 < (y + BOLT_HEIGHT/2)[:,None]) & \
+               ((y - BOLT_HEIGHT/2)[:,None] < ay + ALIEN_HEIGHT/2)
+        hits = (rows[:,:,None] & cols[:,None,:] & self._alive[waves]).reshape(len(waves),-1)
+        hit = hits.any(axis=1)
+        if not hit.any():
+            return
+        waves = waves[hit]
+        slot = slot[hit]
+        row, col = np.divmod(np.argmax(hits[hit], axis=1), ALIENS_IN_ROW)
+        self._alive[waves,row,col] = False
+        self._score[waves] += self._points[row]
+        gone = np.zeros((self._num, self.MAX_BOLTS), dtype=bool)
+        gone[waves,slot] = True
+        self._removeBolts(gone)
+
+    def _animateShips(self):
+        '''
+        Advances the ship explosions, as in the end of Wave.update
+
+        An exploding ship is removed once DEATH_SPEED seconds have passed,
+        pausing the wave and costing a life.
+        '''
+        anim = self._animating
+        self._deathtime[anim] += self._dt
+        done = anim & (self._deathtime >= DEATH_SPEED)
+        start = ~anim & self._explode
+        if done.any():
+            self._animating[done] = False
+            self._paused[done] = True
+            self._nbolts[done] = 0
+            self._lives[done] -= 1
+        self._animating[start] = True
+        self._deathtime[start] = 0.0
+
+    def _reachedLine(self):
+        '''
+        Returns whether the bottom aliens of each wave reached the defense line
+        '''
+        rows = self._alive.any(axis=2)
+        bottom = ALIEN_ROWS-1-np.argmax(rows[:,::-1], axis=1)
+        y = self._basey[bottom]+self._dy
+        return rows.any(axis=1) & (y - ALIEN_HEIGHT/2 < DEFENSE_LINE)
@@ -19,12 +19,25 @@ answer.
 from game2d import *
 from consts import *
 from models import *
+from spatial import *
+from formation import *
 import random
+import struct
 
 # PRIMARY RULE: Wave can only access attributes in models.py via getters/setters
 # Wave is NOT allowed to access anything in app.py (Subcontrollers are not
 # permitted to access anything in their parent. To see why, take CS 3152)
 
+# The layout of a snapshot made by Wave._snapshot: a fixed header, then the
+# alive mask (one byte per alien), the alien positions (only if they are not
+# stored in arrays), the bolts, and finally the state of the random numbers
+_SNAPSHOT_MAGIC = b'AIWS'
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEAD = struct.Struct('<4sBqqiiiddBbdBddBBH')
+_SNAPSHOT_ALIEN = struct.Struct('<dd')
+_SNAPSHOT_BOLT = struct.Struct('<dd?')
+_SNAPSHOT_RANDOM = struct.Struct('<625IBd')
+
 
 class Wave(object):
     """
@@ -118,6 +131,55 @@ class Wave(object):
     # Attribute _alienShoot: stores the sound the bolts make when the alien fires
     # Invariant: _alienShoot is a Sound object
     #
+    # The sounds share the voices in Sound.BANK with those of every other wave,
+    # so making a wave does not load any sound files (after the first one).
+    #
+    # Attribute _grid: the broadphase for bolt-alien collisions, keyed by the
+    # (row,col) position of each live alien in _aliens
+    # Invariant: _grid is a SpatialHash containing exactly the live aliens
+    #
+    # Attribute _formation: the live counts and edges of the alien formation
+    # Invariant: _formation is a Formation object that agrees with _aliens
+    #
+    # Attribute _arrays: the alien positions as NumPy arrays, if enabled.  When
+    # this is not None, the Alien objects are only moved when they are needed
+    # (for drawing or collisions), and _grid uses the base (unshifted) positions
+    # Invariant: _arrays is a FormationArrays object or None
+    #
+    # Attribute _alienBatch: the batch that draws every live alien, if enabled
+    # Invariant: _alienBatch is a GSpriteBatch object or None
+    #
+    # Attribute _boltBatch: the batch that draws every bolt, if enabled
+    # Invariant: _boltBatch is a GSpriteBatch object or None (exactly when
+    # _alienBatch is None)
+    #
+    # Attribute _pool: the pool that bolts are taken from and given back to
+    # Invariant: _pool is a BoltPool object, and no bolt in _bolts is free
+    #
+    # Attribute _seed: the seed of the random number generator of this wave
+    # Invariant: _seed is an int
+    #
+    # Attribute _random: the random number generator for when aliens fire.
+    # Together with the input and dt of every update, it makes a wave repeatable
+    # (see replay.py)
+    # Invariant: _random is a random.Random object seeded with _seed
+    #
+    # Attribute _alienObjects: every alien made for this wave, dead or alive,
+    # so that _restore can bring back aliens without making new ones
+    # Invariant: _alienObjects is a 2d list of Alien objects with the same shape
+    # as _aliens, and every live alien in _aliens is the one in _alienObjects
+    #
+    # Attribute _deathTime: the time the ship has been exploding, so that
+    # _restore can rebuild _animator
+    # Invariant: _deathTime is a float >= 0 (only meaningful if _animator is
+    # not None)
+    #
+    # Attribute _view: the retained view that the objects of this wave are in.
+    # Each object is added to it when it appears and removed when it goes, so
+    # draw does not draw anything (see _setView)
+    # Invariant: _view is a retained GView object, or None if the objects are
+    # drawn by draw
+    #
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def _getPaused(self):
@@ -178,6 +240,18 @@ class Wave(object):
         '''
         return self._ship
 
+    def _getPool(self):
+        '''
+        This returns the self._pool attribute
+        '''
+        return self._pool
+
+    def _getSeed(self):
+        '''
+        This returns the self._seed attribute
+        '''
+        return self._seed
+
     def _setShip(self, newShip):
         '''
         This sets the value of self._ship to newShip
@@ -186,20 +260,38 @@ class Wave(object):
         self._ship = newShip
 
     # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
-    def __init__(self):
+    def __init__(self, arrays=ALIEN_ARRAYS, batch=SPRITE_BATCH, pool=None,
+                 seed=None):
         '''
         Intializes all of the attributes that are listed above
 
         EXTRA CREDIT: Implemented sound
 
+        Parameter arrays: Whether to store the alien positions in NumPy arrays
+        Precondition: arrays is a boolean
+
+        Parameter batch: Whether to draw the aliens and bolts in two batches
+        Precondition: batch is a boolean
+
+        Parameter pool: The pool to take bolts from (a new one if None)
+        Precondition: pool is a BoltPool object or None
+
+        Parameter seed: The seed for the random numbers (a random one if None)
+        Precondition: seed is an int or None
         '''
+        assert type(arrays) == bool
+        assert type(batch) == bool
+        assert pool is None or isinstance(pool, BoltPool)
+        assert seed is None or type(seed) == int
         self._aliens = []
+        self._grid = SpatialHash(ALIEN_WIDTH+ALIEN_H_SEP, ALIEN_HEIGHT+ALIEN_V_SEP)
+        self._formation = Formation(ALIEN_ROWS, ALIENS_IN_ROW)
         self._createAliens()
-        x = GAME_WIDTH/2
-        y = SHIP_BOTTOM
-        width = SHIP_WIDTH
-        height = SHIP_HEIGHT
-        self._ship = Ship(x,y,width,height,source = 'ship-strip.png', frame = 0)
+        self._alienObjects = [list(row) for row in self._aliens]
+        self._arrays = FormationArrays(self._aliens) if arrays else None
+        self._alienBatch = GSpriteBatch() if batch else None
+        self._boltBatch = GSpriteBatch(fillcolor='red') if batch else None
+        self._ship = self._newShip()
         self._dline = GPath(points = [0,DEFENSE_LINE, GAME_WIDTH, DEFENSE_LINE],
         linewidth = 3)
         self._dline.linecolor = 'gray'
@@ -207,14 +299,19 @@ class Wave(object):
         self._movetotheright = True
         self._movetotheleft = True
         self._bolts = []
-        self._numstepsuntilfire = random.randint(1,BOLT_RATE)
+        self._pool = BoltPool() if pool is None else pool
+        self._seed = random.randrange(2**32) if seed is None else seed
+        self._random = random.Random(self._seed)
+        self._numstepsuntilfire = self._random.randint(1,BOLT_RATE)
         self._randomalien = 0
         self._steps = 0
         self._animator = None
+        self._deathTime = 0.0
         self._shipExplode = None
         self._score = 0
         self._lives = SHIP_LIVES
         self._paused = False
+        self._view = None
         self._shipNoise = Sound('blast3.wav')
         self._boltNoise = Sound('pew1.wav')
         self._alienNoise = Sound('pop1.wav')
@@ -241,16 +338,19 @@ class Wave(object):
 
         if not self._animator is None:
             try:
+                self._deathTime += dt
                 self._animator.send(dt)
             except StopIteration:
                 self._animator = None
                 self._shipExplode = True
+                self._hide(self._ship)
                 self._ship = None
-                self._bolts = []
+                self._clearBolts()
                 self._paused = True
                 self._lives -= 1
         elif (self._getExplodeState()):
             self._animator = self._ship._animate_ship(dt)
+            self._deathTime = 0.0
             next(self._animator)
 
     # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
@@ -267,8 +367,26 @@ class Wave(object):
         getters for these attributes or you need to add a draw method to
         class Wave.  We suggest the latter.  See the example subcontroller.py
         from class.
+
+        If the objects are in a retained view (see _setView), they are not
+        drawn again.  They are only brought up to date: the aliens are moved
+        to their positions in the arrays, and the batches are filled.
+
+        Parameter view: The view to draw to
+        Precondition: view is a GView object
         """
+        if self._view is not None:
+            if self._arrays is not None:
+                self._arrays.sync(self._aliens)
+            if self._alienBatch is not None:
+                self._fillBatches()
+            return
+        if self._alienBatch is not None:
+            self._drawBatches(view)
+            return
         if self._aliens != None:
+            if self._arrays is not None:
+                self._arrays.sync(self._aliens)
             for row in range(len(self._aliens)):
                 for col in range(len(self._aliens[0])):
                     if self._aliens[row][col] != None:
@@ -282,7 +400,248 @@ class Wave(object):
                 index = self._bolts[row]
                 index.draw(view)
 
+    # SNAPSHOT METHODS TO SAVE AND RESTORE THE WAVE
+    def _snapshot(self):
+        '''
+        Returns the complete state of this wave as a bytes object
+
+        The snapshot has everything that update reads: the live aliens and
+        their positions, the bolts, the ship (and its explosion), the lives,
+        score, march direction, timers and the state of the random numbers.
+        It does not have the sounds, the bolt pool or the drawing batches,
+        which do not affect the game.  Pass it to _restore to go back to this
+        state, in this wave or in any other wave with the same arrays setting.
+        '''
+        rows = len(self._aliens)
+        cols = len(self._aliens[0])
+        mask = bytearray(rows*cols)
+        positions = []
+        for row in range(rows):
+            for col in range(cols):
+                alien = self._aliens[row][col]
+                if alien != None:
+                    mask[row*cols+col] = 1
+                    if self._arrays is None:
+                        positions.append(_SNAPSHOT_ALIEN.pack(alien.x,alien.y))
+        if self._arrays is None:
+            dx, dy = (0.0, 0.0)
+        else:
+            dx, dy = self._arrays.getOffset()
+
+        flags = ((self._movetotheright << 0) | (self._movetotheleft << 1) |
+                 (self._paused << 2) | ((not self._animator is None) << 3) |
+                 ((not self._ship is None) << 4) | ((self._arrays is None) << 5))
+        explode = -1 if self._shipExplode is None else int(self._shipExplode)
+        shipx = 0.0 if self._ship is None else self._ship.x
+        frame = 0 if self._ship is None else self._ship.frame
+        head = _SNAPSHOT_HEAD.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION,
+            self._seed, self._score, self._lives, self._steps,
+            self._numstepsuntilfire, self._time, self._deathTime, flags,
+            explode, shipx, frame, dx, dy, rows, cols, len(self._bolts))
+
+        bolts = [_SNAPSHOT_BOLT.pack(bolt.x,bolt.y,bolt._isPlayerBolt())
+                 for bolt in self._bolts]
+        version, state, gauss = self._random.getstate()
+        rng = _SNAPSHOT_RANDOM.pack(*state, gauss is not None,
+                                    0.0 if gauss is None else gauss)
+        return b''.join([head, bytes(mask)] + positions + bolts + [rng])
+
+    def _restore(self, data):
+        '''
+        Puts this wave back in the state saved by _snapshot
+
+        The wave keeps its own Alien objects, and takes bolts from its pool,
+        so restoring a snapshot does not make any new objects (except a ship,
+        if the snapshot has a ship and this wave does not).  The objects are
+        only moved; if the aliens are stored in arrays, even that waits until
+        they are next needed.
+
+        Parameter data: The snapshot to restore
+        Precondition: data is a bytes object made by _snapshot, for a wave
+        with the same arrays setting as this one
+        '''
+        (magic, version, seed, score, lives, steps, numsteps, time, deathTime,
+         flags, explode, shipx, frame, dx, dy, rows, cols,
+         nbolts) = _SNAPSHOT_HEAD.unpack_from(data, 0)
+        assert magic == _SNAPSHOT_MAGIC, 'data is not a wave snapshot'
+        assert version == _SNAPSHOT_VERSION, 'snapshot version %s is not supported' % version
+        assert rows == len(self._aliens) and cols == len(self._aliens[0])
+        assert bool(flags & 32) == (self._arrays is None), 'snapshot has a different arrays setting'
+        pos = _SNAPSHOT_HEAD.size
+        mask = data[pos:pos+rows*cols]
+        pos += rows*cols
+        # The objects of the snapshot are added to the view at the end
+        view = self._view
+        self._setView(None)
+
+        self._grid.clear()
+        self._formation = Formation(rows, cols)
+        alive = []
+        for row in range(rows):
+            alive.append([])
+            for col in range(cols):
+                if mask[row*cols+col]:
+                    alien = self._alienObjects[row][col]
+                    if self._arrays is None:
+                        alien.x, alien.y = _SNAPSHOT_ALIEN.unpack_from(data, pos)
+                        pos += _SNAPSHOT_ALIEN.size
+                        box = self._alienBox(alien)
+                    else:
+                        x, y = self._arrays.getBase(row,col)
+                        box = (x-ALIEN_WIDTH/2, y-ALIEN_HEIGHT/2,
+                               x+ALIEN_WIDTH/2, y+ALIEN_HEIGHT/2)
+                    self._aliens[row][col] = alien
+                    self._grid.insert((row,col),*box)
+                    alive[row].append(True)
+                else:
+                    self._aliens[row][col] = None
+                    self._formation.kill(row,col)
+                    alive[row].append(False)
+        if self._arrays is not None:
+            self._arrays.restore(alive,dx,dy)
+
+        self._clearBolts()
+        for _ in range(nbolts):
+            x, y, player = _SNAPSHOT_BOLT.unpack_from(data, pos)
+            pos += _SNAPSHOT_BOLT.size
+            self._acquireBolt(x,y,player)
+
+        if flags & 16:
+            if self._ship is None:
+                self._ship = self._newShip()
+            self._ship.x = shipx
+            self._ship.frame = frame
+        else:
+            self._ship = None
+        self._animator = None
+        self._deathTime = deathTime
+        if flags & 8:
+            # Replaying the elapsed time as one step leaves the coroutine in
+            # the same state, as it only adds up the time it is sent
+            self._animator = self._ship._animate_ship(0)
+            next(self._animator)
+            if deathTime > 0:
+                self._animator.send(deathTime)
+
+        self._seed = seed
+        self._score = score
+        self._lives = lives
+        self._steps = steps
+        self._numstepsuntilfire = numsteps
+        self._time = time
+        self._movetotheright = bool(flags & 1)
+        self._movetotheleft = bool(flags & 2)
+        self._paused = bool(flags & 4)
+        self._shipExplode = None if explode < 0 else bool(explode)
+        state = _SNAPSHOT_RANDOM.unpack_from(data, pos)
+        self._random.setstate((3, state[:625], state[626] if state[625] else None))
+        self._setView(view)
+
+    # RETAINED VIEW METHODS
+    def _setView(self, view):
+        '''
+        Adds the objects of this wave to a retained view, or takes them out
+
+        The objects are first taken out of the view they are in, if any.  While
+        the wave is in a view, each object is added to it when it appears and
+        removed when it goes.  Each kind of object has its own layer (see
+        LAYER_ALIENS in consts.py), so they are drawn in the same order as
+        draw draws them, whenever they appear.
+
+        Parameter view: The view to add the objects to, or None to only take
+        them out
+        Precondition: view is a retained GView object or None
+        '''
+        if self._view is not None:
+            for obj, layer in self._layered():
+                self._view.remove(obj)
+        self._view = view
+        if view is not None:
+            for obj, layer in self._layered():
+                view.add(obj, layer)
+
+    def _layered(self):
+        '''
+        Returns the objects on screen, each with its layer, in the order that
+        draw draws them
+
+        The aliens and the bolts are replaced by their batches, if enabled.
+        '''
+        objects = []
+        if self._alienBatch is not None:
+            objects.append((self._alienBatch, LAYER_ALIENS))
+        else:
+            for row in self._aliens:
+                for alien in row:
+                    if alien != None:
+                        objects.append((alien, LAYER_ALIENS))
+        if self._ship != None:
+            objects.append((self._ship, LAYER_SHIP))
+        objects.append((self._dline, LAYER_DLINE))
+        if self._boltBatch is not None:
+            objects.append((self._boltBatch, LAYER_BOLTS))
+        else:
+            for bolt in self._bolts:
+                objects.append((bolt, LAYER_BOLTS))
+        return objects
+
+    def _show(self, obj, layer):
+        '''
+        Adds obj to the retained view in the given layer, if the wave is in one
+
+        Parameter obj: The object that appeared
+        Precondition: obj is a GObject
+
+        Parameter layer: The layer of obj
+        Precondition: layer is one of the LAYER constants in consts.py
+        '''
+        if self._view is not None:
+            self._view.add(obj, layer)
+
+    def _hide(self, obj):
+        '''
+        Removes obj from the retained view, if the wave is in one
+
+        This does nothing if obj is not in the view (such as an alien that is
+        drawn by a batch).
+
+        Parameter obj: The object that went
+        Precondition: obj is a GObject
+        '''
+        if self._view is not None:
+            self._view.remove(obj)
+
     # HELPER METHODS
+    def _drawBatches(self, view):
+        '''
+        Draws the game objects to the view, with the aliens and bolts batched
+
+        The ship and the defensive line are drawn on their own, as in draw.
+
+        Parameter view: The view to draw to
+        Precondition: view is a GView object
+        '''
+        if self._arrays is not None:
+            self._arrays.sync(self._aliens)
+        self._fillBatches()
+        self._alienBatch.draw(view)
+        if self._ship != None:
+            self._ship.draw(view)
+        self._dline.draw(view)
+        self._boltBatch.draw(view)
+
+    def _fillBatches(self):
+        '''
+        Copies the live aliens and the bolts into their batches
+        '''
+        live = []
+        for row in self._aliens:
+            for alien in row:
+                if alien != None:
+                    live.append(alien)
+        self._alienBatch.set_objects(live)
+        self._boltBatch.set_objects(self._bolts)
+
     def _createAliens(self):
         '''
         Creates the 2d list alien object
@@ -299,12 +658,14 @@ class Wave(object):
             for col in range(ALIENS_IN_ROW):
                 alien = Alien(x,y,width,height,source=images[(ALIEN_ROWS -index)%3])
                 self._aliens[row].append(alien)
+                self._grid.insert((row,col),*self._alienBox(alien))
                 x = ALIEN_H_SEP + width + x
 
             if(row%2 == 0):
                 index = index + 1
             y = y - height - ALIEN_V_SEP
 
+    @profiled('Wave._makeanddelete')
     def _makeanddelete(self):
         '''
         Goes through the bolt and determines whether to delete it or make it
@@ -315,6 +676,7 @@ class Wave(object):
         while i < len(self._bolts):
             if(self._bolts[i]._isPlayerBolt()):
                 if self._bolts[i].y - (BOLT_HEIGHT/ 2) > GAME_HEIGHT:
+                    self._releaseBolt(self._bolts[i])
                     del self._bolts[i]
                 else:
                     y = self._bolts[i].y
@@ -322,6 +684,7 @@ class Wave(object):
                     self._bolts[i].y = y
             else:
                 if self._bolts[i].y + (BOLT_HEIGHT/ 2)  < 0:
+                    self._releaseBolt(self._bolts[i])
                     del self._bolts[i]
                 else:
                     y = self._bolts[i].y
@@ -356,49 +719,40 @@ class Wave(object):
         if(self._time < ALIEN_SPEED):
             self._time += dt
         else:
-            if(self._firstAlien() != []):
+            if(not self._formation.isEmpty()):
                 self._time = 0
                 self._movea(dt)
                 self._firealiens()
 
-    def _firstAlien(self):
+    def _columnAlien(self,col):
         '''
-        Goes through the entire alien attribute and finds the righmost alien
-        that is not None and remove it from our first list that stores aliens
-        that are not None
+        Returns the bottommost live alien in column col, or None if there is none
+
+        Parameter col: The column to search
+        Precondition: col is a valid column index
         '''
-        first = []
-        right = 0
-        if (len(self._aliens) > 0):
-            for row in range(len(self._aliens)):
-                for col in range(len(self._aliens[row])):
-                    if self._aliens[row][col] != None:
-                        first.append(self._aliens[row][col])
-        if(len(first)>0):
-            for row in range(len(first)):
-                if(first[row] is None and len(first) > 0):
-                    first.remove(first[row])
-        return first
+        for row in range(len(self._aliens)-1,-1,-1):
+            if self._aliens[row][col] != None:
+                self._syncAlien(row,col)
+                return self._aliens[row][col]
+        return None
 
-    def _lastAlien(self):
+    def _syncAlien(self,row,col):
         '''
-        Goes through the entire alien attribute and finds the leftmost
-        alien that is not None and remove it from our last list that stores aliens
-        that are not None
+        Moves the alien at (row,col) to its current position in _arrays
+
+        This does nothing if the positions are not stored in arrays.
+
+        Parameter row: The row of the alien
+        Precondition: row is a valid row index with a live alien
+
+        Parameter col: The column of the alien
+        Precondition: col is a valid column index with a live alien
         '''
-        last = []
-        if (len(self._aliens) > 0):
-            for row in range(len(self._aliens)):
-                for col in range(len(self._aliens[row])):
-                    if self._aliens[row][col] != None:
-                        lastalien = (self._aliens[row][col])
-                        last.append(lastalien)
-        if(len(last)>0):
-            for row in range(len(last)):
-                if(last[row] is None and len(last) > 0):
-                    last.remove(last[row])
-        return last
+        if self._arrays is not None:
+            self._arrays.syncAlien(self._aliens,row,col)
 
+    @profiled('Wave._movea')
     def _movea(self,dt):
         '''
         Moves the aliens based on x and y coordinates
@@ -406,35 +760,51 @@ class Wave(object):
         Parameter dt: The time in seconds since the last call to update.
         Precondition: dt is an int or float
         '''
-        if(not self._lastAlien() == []):
+        if(not self._formation.isEmpty()):
             if self._movetotheright:
                 if (len(self._aliens) > 0):
-                    last = self._firstAlien()
-                    if(last[-1].x + ALIEN_H_WALK + ALIEN_WIDTH/2 < GAME_WIDTH):
-                        for row in range(len(self._aliens)):
-                            for col in range(len(self._aliens[row])):
-                                if self._aliens[row][col] != None:
-                                    self._aliens[row][col].x += ALIEN_H_WALK
+                    last = self._columnAlien(self._formation.getRight())
+                    if(last.x + ALIEN_H_WALK + ALIEN_WIDTH/2 < GAME_WIDTH):
+                        self._shiftAliens(ALIEN_H_WALK,0)
                     else:
-                        for row in range(len(self._aliens)):
-                            for col in range(len(self._aliens[row])):
-                                if self._aliens[row][col] != None:
-                                    self._aliens[row][col].y -= ALIEN_V_WALK
-                                    self._movetotheright = False
+                        self._shiftAliens(0,-ALIEN_V_WALK)
+                        self._movetotheright = False
             elif self._movetotheleft:
                 if (len(self._aliens) > 0):
-                    first = self._lastAlien()
-                    if(first[0].x - ALIEN_H_WALK - ALIEN_WIDTH/2 > 0):
-                        for row in range(len(self._aliens)):
-                            for col in range(len(self._aliens[row])):
-                                if self._aliens[row][col] != None:
-                                    self._aliens[row][col].x -= ALIEN_H_WALK
+                    first = self._columnAlien(self._formation.getLeft())
+                    if(first.x - ALIEN_H_WALK - ALIEN_WIDTH/2 > 0):
+                        self._shiftAliens(-ALIEN_H_WALK,0)
                     else:
-                        for row in range(len(self._aliens)):
-                            for col in range(len(self._aliens[row])):
-                                if self._aliens[row][col] != None:
-                                    self._aliens[row][col].y -= ALIEN_V_WALK
-                                    self._movetotheright = True
+                        self._shiftAliens(0,-ALIEN_V_WALK)
+                        self._movetotheright = True
+
+    def _shiftAliens(self,dx,dy):
+        '''
+        Moves every live alien by (dx,dy) and updates the collision grid
+
+        The grid is updated incrementally; an alien only changes cells when it
+        crosses a cell boundary.  If the positions are stored in arrays, this
+        just shifts the formation offset, and neither the aliens nor the grid
+        are touched.
+
+        Parameter dx: The horizontal distance to move
+        Precondition: dx is an int or float
+
+        Parameter dy: The vertical distance to move
+        Precondition: dy is an int or float
+        '''
+        if self._arrays is not None:
+            self._arrays.shift(dx,dy)
+            return
+        for row in range(len(self._aliens)):
+            for col in range(len(self._aliens[row])):
+                alien = self._aliens[row][col]
+                if alien != None:
+                    if dx != 0:
+                        alien.x += dx
+                    if dy != 0:
+                        alien.y += dy
+                    self._grid.move((row,col),*self._alienBox(alien))
 
     def _moveb(self, input):
         '''
@@ -445,12 +815,7 @@ class Wave(object):
                 if (not self._checkOnePlayerBolt()):
                     x = self._ship.x
                     y = self._ship.y + SHIP_HEIGHT/2
-                    width = BOLT_WIDTH
-                    height = BOLT_HEIGHT
-                    fillcolor = 'red'
-                    linecolor = "black"
-                    bolt = Bolt(x,y,width,height,fillcolor,linecolor, True)
-                    self._bolts.append(bolt)
+                    self._acquireBolt(x,y,True)
                     self._boltNoise.play()
 
     def _checkOnePlayerBolt(self):
@@ -467,6 +832,63 @@ class Wave(object):
 
         return False
 
+    def _clearBolts(self):
+        '''
+        Removes every bolt from the screen, giving them back to the pool
+        '''
+        for bolt in self._bolts:
+            self._releaseBolt(bolt)
+        self._bolts = []
+
+    def _acquireBolt(self, x, y, player):
+        '''
+        Takes a bolt from the pool, and adds it to the screen at (x,y)
+
+        Parameter x: The x coordinate of the bolt
+        Precondition: x is an int or float
+
+        Parameter y: The y coordinate of the bolt
+        Precondition: y is an int or float
+
+        Parameter player: Whether the player fired the bolt
+        Precondition: player is a boolean
+        '''
+        bolt = self._pool.acquire(x,y,player)
+        self._bolts.append(bolt)
+        if self._boltBatch is None:
+            self._show(bolt, LAYER_BOLTS)
+
+    def _releaseBolt(self, bolt):
+        '''
+        Gives a bolt back to the pool, and removes it from the view
+
+        The caller removes the bolt from _bolts.
+
+        Parameter bolt: The bolt to release
+        Precondition: bolt is a Bolt object in _bolts
+        '''
+        self._hide(bolt)
+        self._pool.release(bolt)
+
+    def _respawn(self):
+        '''
+        Unpauses the wave with a new ship after the old one was destroyed
+        '''
+        self._paused = False
+        self._shipExplode = False
+        self._ship = self._newShip()
+        self._show(self._ship, LAYER_SHIP)
+
+    def _newShip(self):
+        '''
+        Returns a new ship at its starting position
+        '''
+        x = GAME_WIDTH/2
+        y = SHIP_BOTTOM
+        width = SHIP_WIDTH
+        height = SHIP_HEIGHT
+        return Ship(x,y,width,height,source='ship-strip.png',frame=0)
+
     def _firealiens(self):
         '''
         Determines whether the alien can fire bases on self._numstepsuntilfire
@@ -482,67 +904,90 @@ class Wave(object):
         Chooses which alien to fire randomly and after a random amount of steps
         '''
         if (self._steps == self._numstepsuntilfire):
-            colsnotNone = []
-            for row in range(len(self._aliens)):
-                for col in range(len(self._aliens[row])):
-                    if(self._aliens[row][col] != None):
-                        if(col not in colsnotNone):
-                            colsnotNone.append(col)
+            colsnotNone = self._formation.getColumns()
 
-            col = random.choice(colsnotNone)
+            col = self._random.choice(colsnotNone)
 
-            bottom = 0
-            for x in range(ALIEN_ROWS):
-                if(self._aliens[x][col] != None):
-                    bottom = self._aliens[x][col]
+            bottom = self._columnAlien(col)
 
             self._randomalien = bottom
             x = bottom.x
             y = bottom.y
-            width = BOLT_WIDTH
-            height = BOLT_HEIGHT
-            fillcolor = 'red'
-            linecolor = "black"
-            self._bolts.append(Bolt(x,y,width,height,fillcolor,linecolor, False))
-            self._numstepsuntilfire = random.randint(1,BOLT_RATE)
+            self._acquireBolt(x,y,False)
+            self._numstepsuntilfire = self._random.randint(1,BOLT_RATE)
             self._alienShoot.play()
 
     def _findBottomMost(self):
         """
-        Finds the bottommost alien
+        Finds the bottommost alien, or 0 if every alien is dead
         """
-        bottom = 0
-        for row in range(len(self._aliens)):
-            for col in range(len(self._aliens[row])):
-                if(not self._aliens[row][col] is None):
-                    bottom = self._aliens[row][col]
-        return bottom
+        row = self._formation.getBottom()
+        if row is None:
+            return 0
+        for col in range(len(self._aliens[row])-1,-1,-1):
+            if(not self._aliens[row][col] is None):
+                self._syncAlien(row,col)
+                return self._aliens[row][col]
 
     # HELPER METHODS FOR COLLISION DETECTION
+    @profiled('Wave._acollision')
     def _acollision(self):
         '''
-        Goes through the alien object and finds if an alien collided with a
-        player bolt
+        Goes through the player bolts and finds if one collided with an alien
+
+        The grid narrows the search to the aliens near each bolt.  These aliens
+        are checked in row-major order with Alien._aliencollides, so the alien
+        hit is the same one that a scan of the whole 2d list would find.
         '''
         score_mult = 0
-        temp = None
-        for row in range(len(self._aliens)):
-            for col in range(len(self._aliens[row])):
-                if self._aliens[row][col] != None:
-                    if len(self._bolts) > 0:
-                        for x in range(len(self._bolts)):
-                            if self._bolts[x]._isPlayerBolt():
-                                 temp = self._bolts[x]
-                        if(not temp is None):
-                            if self._aliens[row][col]._aliencollides(temp):
-                                self._alienNoise.play()
-                                self._aliens[row][col] = None
-                                if(row % ALIENS_IN_ROW == 0):
-                                    score_mult = (ALIENS_IN_ROW) * 10
-                                else:
-                                    score_mult = (row % ALIENS_IN_ROW) * 10
-                                self._score += score_mult
-                                self._bolts.remove(temp)
+        for bolt in list(self._bolts):
+            if bolt._isPlayerBolt():
+                for (row, col) in self._grid.query(*self._boltBox(bolt)):
+                    self._syncAlien(row,col)
+                    if self._aliens[row][col]._aliencollides(bolt):
+                        self._alienNoise.play()
+                        self._hide(self._aliens[row][col])
+                        self._aliens[row][col] = None
+                        self._grid.remove((row,col))
+                        self._formation.kill(row,col)
+                        if self._arrays is not None:
+                            self._arrays.kill(row,col)
+                        if(row % ALIENS_IN_ROW == 0):
+                            score_mult = (ALIENS_IN_ROW) * 10
+                        else:
+                            score_mult = (row % ALIENS_IN_ROW) * 10
+                        self._score += score_mult
+                        self._bolts.remove(bolt)
+                        self._releaseBolt(bolt)
+                        break
+
+    def _alienBox(self,alien):
+        '''
+        Returns the (left,bottom,right,top) box of alien for the grid
+
+        Parameter alien: The alien to measure
+        Precondition: alien is an Alien object
+        '''
+        return (alien.x-ALIEN_WIDTH/2, alien.y-ALIEN_HEIGHT/2,
+                alien.x+ALIEN_WIDTH/2, alien.y+ALIEN_HEIGHT/2)
+
+    def _boltBox(self,bolt):
+        '''
+        Returns the (left,bottom,right,top) box of bolt for the grid
+
+        If the alien positions are stored in arrays, the box is shifted back by
+        the formation offset, so that it can be compared with the grid.
+
+        Parameter bolt: The bolt to measure
+        Precondition: bolt is a Bolt object
+        '''
+        x = bolt.x
+        y = bolt.y
+        if self._arrays is not None:
+            dx, dy = self._arrays.getOffset()
+            x -= dx
+            y -= dy
+        return (x-BOLT_WIDTH/2, y-BOLT_HEIGHT/2, x+BOLT_WIDTH/2, y+BOLT_HEIGHT/2)
 
     def _scollision(self):
         '''
@@ -557,6 +1002,7 @@ class Wave(object):
                         if(not temp is None):
                             if self._ship._shipcollides(temp):
                                 self._shipExplode = True
+                                self._releaseBolt(self._bolts[x])
                                 del self._bolts[x]
                                 self._shipNoise.play()
                 x = 0
@@ -584,11 +1030,6 @@ class Wave(object):
 
     def _allAlienDead(self):
         '''
-        Looks throught the alien object and sees if they are all dead
+        Looks at the formation and sees if the aliens are all dead
         '''
-        for row in range(len(self._aliens)):
-            for col in range(len(self._aliens[row])):
-                if(not self._aliens[row][col] is None):
-                    return False
-
-        return True
+        return self._formation.isEmpty()